@@ -0,0 +1,293 @@
+"""
+Suíte de benchmarks do frontend contra a API substituta local
+
+Sobe a `StubApi` (latência, jitter e taxa de erro configuráveis), aponta o
+app para ela e o executa sem navegador com o `AppTest`, medindo:
+
+- tempo de script por interação (primeira renderização, edição do
+  formulário, envio com e sem acerto no cache, volta ao formulário e troca
+  para cada visão), somando os reruns disparados por `st.rerun`;
+- chamadas à API por interação, contadas pela própria API substituta;
+- memória estimada do `session_state` de uma sessão, antes e depois de
+  várias predições (mesma estimativa da visão Diagnóstico);
+- vazão de predições individuais (pelo app e pelo motor de predição) e em
+  lote (`prepare_batch` + `score_batch`, como na aba de lote).
+
+O resultado vai para um JSON em `benchmarks/results/` para comparação com
+`git diff`. O AppTest e as sessões rodam no mesmo processo, então os
+recursos de `st.cache_resource` (cliente HTTP, cache de predições) são
+compartilhados entre elas como no servidor real.
+
+Uso:
+    python benchmarks/frontend_suite.py [--latency 0.05] [--jitter 0.02] [--error-rate 0.0]
+                                        [--submissions 20] [--batch-sizes 100 1000]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+FRONTEND_DIR = os.path.join(ROOT_DIR, "frontend")
+APP_PATH = os.path.join(FRONTEND_DIR, "app.py")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+sys.path[:0] = [FRONTEND_DIR, ROOT_DIR]
+
+from stub_api import StubApi  # noqa: E402
+
+SUBMIT_LABEL = "🔬 Avaliar Risco de Sepse"
+BACK_LABEL = "⬅️ Voltar e Inserir Novos Dados"
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Mediana, p95 e máximo (ms) do tempo de script e média de chamadas por caminho"""
+    durations = [sample["script_s"] for sample in samples]
+    paths = sorted({path for sample in samples for path in sample["api_calls"]})
+    return {
+        "samples": len(samples),
+        "script_median_ms": statistics.median(durations) * 1000,
+        "script_p95_ms": percentile(durations, 0.95) * 1000,
+        "script_max_ms": max(durations) * 1000,
+        "reruns_per_interaction": statistics.mean(sample["reruns"] for sample in samples),
+        "api_calls_per_interaction": {
+            path: statistics.mean(sample["api_calls"].get(path, 0) for sample in samples)
+            for path in paths
+        },
+    }
+
+
+class Session:
+    """Uma sessão do app no AppTest, com cada interação cronometrada"""
+
+    def __init__(self, stub, timeout=120):
+        from streamlit.testing.v1 import AppTest
+
+        self.stub = stub
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.samples = {}
+
+    def interact(self, name, action):
+        """Executa `action(at)` e registra tempo de script, reruns e chamadas à API"""
+        import script_timer
+
+        before = self.stub.counts()
+        position = script_timer.mark()
+        action(self.at)
+        assert not self.at.exception, self.at.exception
+        durations = script_timer.durations_since(position)
+        after = self.stub.counts()
+        sample = {
+            "script_s": sum(durations),
+            "reruns": len(durations),
+            "api_calls": {
+                path: after[path] - before.get(path, 0)
+                for path in after if after[path] != before.get(path, 0)
+            },
+        }
+        self.samples.setdefault(name, []).append(sample)
+        return sample
+
+    def number_input(self, label_prefix):
+        return next(w for w in self.at.number_input if w.label.startswith(label_prefix))
+
+    def button(self, label):
+        return next(b for b in self.at.button if b.label == label)
+
+    def session_state_size(self):
+        """Memória estimada (bytes) de cada chave do session_state"""
+        from metrics import estimate_size
+
+        state = self.at.session_state
+        return {key: estimate_size(state[key]) for key in sorted(state.filtered_state)}
+
+
+def bench_interactions(stub, submissions):
+    """Interações de uma sessão típica e memória do session_state"""
+    session = Session(stub)
+    session.interact("first_render", lambda at: at.run())
+    memory_start = session.session_state_size()
+
+    for i in range(submissions):
+        # Tempo na UTI diferente a cada envio: cada predição é inédita para o cache
+        session.number_input("Tempo na UTI").set_value(48 + i)
+        hr_input = session.number_input("Frequência Cardíaca")
+        session.interact("form_edit", lambda at: hr_input.set_value(80 + i % 40).run())
+        sample = session.interact("submit_new", lambda at: session.button(SUBMIT_LABEL).click().run())
+        if session.at.session_state.prediction_error is not None:
+            # Erro simulado pela API (--error-rate): a página de resultado mostra o erro
+            session.samples["submit_new"].remove(sample)
+            session.samples.setdefault("submit_error", []).append(sample)
+            session.interact("back_to_form", lambda at: session.button(BACK_LABEL).click().run())
+            continue
+        session.interact("back_to_form", lambda at: session.button(BACK_LABEL).click().run())
+        # O formulário volta com os valores padrão: os mesmos dados são digitados de novo
+        session.number_input("Tempo na UTI").set_value(48 + i)
+        session.number_input("Frequência Cardíaca").set_value(80 + i % 40)
+        session.interact("submit_cached", lambda at: session.button(SUBMIT_LABEL).click().run())
+        session.interact("back_to_form", lambda at: session.button(BACK_LABEL).click().run())
+
+    memory_end = session.session_state_size()
+
+    # O painel de monitoramento fica em laço enquanto a atualização automática está ligada
+    session.at.session_state["monitor_auto_refresh"] = False
+    views = session.at.radio(key="active_view").options
+    for view in views[1:] + views[:1]:
+        session.interact(f"view:{view}", lambda at: at.radio(key="active_view").set_value(view).run())
+        session.interact(f"view:{view}", lambda at: at.run())
+
+    interactions = {name: summarize(samples) for name, samples in session.samples.items()}
+    submitted = session.samples.get("submit_new", [])
+    submit_seconds = sum(sample["script_s"] for sample in submitted)
+    total_start, total_end = sum(memory_start.values()), sum(memory_end.values())
+    memory = {
+        "after_first_render_bytes": total_start,
+        "after_submissions_bytes": total_end,
+        "submissions": submissions,
+        "growth_per_submission_bytes": (total_end - total_start) / max(submissions, 1),
+        "by_key_bytes": memory_end,
+    }
+    return interactions, memory, len(submitted) / submit_seconds if submit_seconds else None
+
+
+def make_engine(stub, max_concurrency):
+    """Motor de predição sem cache, para que cada paciente vire uma chamada"""
+    from api_client import ApiClient
+    from config import get_api_client_settings
+    from scoring_engine import ScoringEngine
+
+    client = ApiClient(stub.url, **get_api_client_settings())
+    return ScoringEngine(client, max_concurrency=max_concurrency)
+
+
+def bench_single_throughput(stub, n, max_concurrency):
+    """Predições sequenciais pelo motor (o caminho do formulário, sem Streamlit)"""
+    from history_memory import make_predictions
+
+    engine = make_engine(stub, max_concurrency)
+    patients = [patient_data for _, patient_data, _ in make_predictions(n, seed=7)]
+    before = stub.counts().get("/predict", 0)
+    started = time.perf_counter()
+    failures = sum(not engine.score_one(patient_data)[0] for patient_data in patients)
+    elapsed = time.perf_counter() - started
+    return {
+        "patients": n,
+        "elapsed_s": elapsed,
+        "patients_per_s": n / elapsed,
+        "failures": failures,
+        "api_calls": stub.counts().get("/predict", 0) - before,
+    }
+
+
+def bench_batch_throughput(stub, sizes, chunk_size, max_in_flight, max_concurrency):
+    """Lotes de tamanhos diferentes pelo mesmo caminho da aba de predição em lote"""
+    import pandas as pd
+
+    from batch import prepare_batch, score_batch
+    from history_memory import make_predictions
+
+    engine = make_engine(stub, max_concurrency)
+    rows = []
+    for size in sizes:
+        df = pd.DataFrame([patient_data for _, patient_data, _ in make_predictions(size, seed=size)])
+        chunks = []
+        before = stub.counts().get("/predict", 0)
+        started = time.perf_counter()
+        valid, invalid = prepare_batch(df)
+        prepared = time.perf_counter() - started
+        score_batch(valid, engine, chunks.append, chunk_size=chunk_size, max_in_flight=max_in_flight)
+        elapsed = time.perf_counter() - started
+        results = [item for chunk in chunks for item in chunk]
+        rows.append({
+            "patients": size,
+            "invalid": len(invalid),
+            "prepare_s": prepared,
+            "elapsed_s": elapsed,
+            "patients_per_s": len(valid) / elapsed,
+            "failures": sum(not success for _, success, _ in results),
+            "chunks": len(chunks),
+            "api_calls": stub.counts().get("/predict", 0) - before,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="latência média de /predict (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="variação máxima da latência (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração de predições com erro")
+    parser.add_argument("--error-status", type=int, default=500, help="status HTTP dos erros simulados")
+    parser.add_argument("--submissions", type=int, default=20, help="envios do formulário na sessão")
+    parser.add_argument("--single", type=int, default=50, help="predições sequenciais pelo motor")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "frontend_suite.json"))
+    args = parser.parse_args()
+
+    with StubApi(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                 error_status=args.error_status, seed=args.seed) as stub:
+        # O app lê a configuração ao ser importado pelo AppTest
+        os.environ["SEPSIS_API_URL"] = stub.url
+        os.environ.setdefault("HISTORY_BACKEND", "session")
+        os.environ.setdefault("MONITOR_FEED_PATH", os.path.join(RESULTS_DIR, "missing-vitals.jsonl"))
+
+        import script_timer
+        from config import BATCH_CHUNK_SIZE, BATCH_MAX_IN_FLIGHT, SCORING_MAX_CONCURRENCY
+
+        script_timer.install()
+        interactions, memory, app_submit_rate = bench_interactions(stub, args.submissions)
+        single = bench_single_throughput(stub, args.single, SCORING_MAX_CONCURRENCY)
+        single["app_submissions_per_s"] = app_submit_rate
+        batch = bench_batch_throughput(
+            stub, args.batch_sizes, BATCH_CHUNK_SIZE, BATCH_MAX_IN_FLIGHT, SCORING_MAX_CONCURRENCY
+        )
+        api_calls, api_errors = stub.counts(), stub.errors()
+
+    print(f"{'interação':<32} {'mediana':>9} {'p95':>9} {'reruns':>7}  chamadas à API")
+    for name, stats in interactions.items():
+        calls = ", ".join(f"{path}={value:.2f}" for path, value in stats["api_calls_per_interaction"].items())
+        print(
+            f"{name:<32} {stats['script_median_ms']:>7.1f}ms {stats['script_p95_ms']:>7.1f}ms "
+            f"{stats['reruns_per_interaction']:>7.1f}  {calls or '-'}"
+        )
+    print(
+        f"session_state: {memory['after_first_render_bytes'] / 1024:.1f} KiB após a 1ª renderização, "
+        f"{memory['after_submissions_bytes'] / 1024:.1f} KiB após {memory['submissions']} envios"
+    )
+    print(
+        f"Individual: {single['patients_per_s']:.1f} predições/s pelo motor, "
+        f"{app_submit_rate or 0:.1f} envios/s pelo app"
+    )
+    for row in batch:
+        print(f"Lote de {row['patients']}: {row['patients_per_s']:.1f} pacientes/s ({row['failures']} falhas)")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({
+            "benchmark": "frontend_suite",
+            "python": sys.version.split()[0],
+            "stub": {
+                "latency_s": args.latency,
+                "jitter_s": args.jitter,
+                "error_rate": args.error_rate,
+                "error_status": args.error_status,
+                "seed": args.seed,
+            },
+            "interactions": interactions,
+            "session_memory": memory,
+            "throughput": {"single": single, "batch": batch},
+            "api_calls_total": api_calls,
+            "api_errors_total": api_errors,
+        }, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
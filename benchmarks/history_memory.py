@@ -0,0 +1,136 @@
+"""
+Benchmark de memória do histórico de predições
+
+Compara a representação antiga (lista de dicts em `st.session_state`) com o
+`PredictionHistory` colunar para N predições.
+
+Uso:
+    python benchmarks/history_memory.py [--n 10000]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend"))
+
+from history import PredictionHistory  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def make_predictions(n, seed=42):
+    """Gera N pares (timestamp, patient_data, result) plausíveis"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(n):
+        sbp = rng.randint(80, 180)
+        dbp = rng.randint(40, 110)
+        probability = rng.random()
+        patient_data = {
+            "hr": rng.randint(40, 200),
+            "o2sat": rng.randint(80, 100),
+            "temp": round(rng.uniform(35.0, 42.0), 1),
+            "sbp": sbp,
+            "dbp": dbp,
+            "map": round((sbp + 2 * dbp) / 3, 1),
+            "resp": rng.randint(8, 40),
+            "age": rng.randint(18, 95),
+            "gender": rng.randint(0, 1),
+            "unit1": rng.randint(0, 1),
+            "unit2": rng.randint(0, 1),
+            "hosp_adm_time": rng.randint(0, 500),
+            "iculos": rng.randint(0, 500),
+        }
+        result = {
+            "prediction": probability,
+            "risk_level": "Alto" if probability >= 0.6 else "Moderado" if probability >= 0.3 else "Baixo",
+            "confidence": 0.92,
+        }
+        yield start + timedelta(minutes=i), patient_data, result
+
+
+def measure(build):
+    """Memória retida (bytes) e tempo (s) para construir a estrutura"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    structure = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return structure, retained, elapsed
+
+
+def build_list_of_dicts(predictions):
+    records = []
+    for timestamp, patient_data, result in predictions:
+        records.append({
+            "timestamp": timestamp.isoformat(),
+            "patient_data": patient_data,
+            "result": result
+        })
+    return records
+
+
+def build_columnar(predictions):
+    history = PredictionHistory()
+    for timestamp, patient_data, result in predictions:
+        history.append(patient_data, result, timestamp)
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=10_000, help="número de predições")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "history_memory.json"))
+    args = parser.parse_args()
+
+    # Os dados de entrada são gerados antes da medição para que apenas a
+    # estrutura retida seja contabilizada
+    predictions = [
+        (timestamp, dict(patient_data), dict(result))
+        for timestamp, patient_data, result in make_predictions(args.n)
+    ]
+
+    def fresh():
+        return ((t, dict(p), dict(r)) for t, p, r in predictions)
+
+    _, list_bytes, list_seconds = measure(lambda: build_list_of_dicts(fresh()))
+    history, columnar_bytes, columnar_seconds = measure(lambda: build_columnar(fresh()))
+
+    started = time.perf_counter()
+    history.to_frame()
+    to_frame_seconds = time.perf_counter() - started
+
+    report = {
+        "benchmark": "history_memory",
+        "n": args.n,
+        "list_of_dicts": {"bytes": list_bytes, "build_s": list_seconds},
+        "columnar": {
+            "bytes": columnar_bytes,
+            "array_bytes": history.nbytes,
+            "build_s": columnar_seconds,
+            "to_frame_s": to_frame_seconds,
+        },
+        "reduction": list_bytes / columnar_bytes if columnar_bytes else None,
+    }
+
+    print(f"Predições: {args.n}")
+    print(f"Lista de dicts: {list_bytes / 1024:.0f} KiB")
+    print(f"Colunar:        {columnar_bytes / 1024:.0f} KiB ({history.nbytes / 1024:.0f} KiB em arrays)")
+    print(f"Redução:        {report['reduction']:.1f}x")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark do tempo de rerun ao editar o formulário, conforme o histórico cresce
+
+Com a navegação por estado apenas a visão ativa é executada. O custo que as
+abas (st.tabs) adicionavam a cada edição do formulário é estimado somando ao
+rerun do formulário o rerun da visão de histórico e descontando o rerun de
+uma visão trivial (Sobre), que contém apenas o "esqueleto" comum da página.
+
+Uso:
+    python benchmarks/lazy_views.py [--sizes 0 100 1000 10000] [--repeats 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BENCH_DIR, "..", "frontend", "app.py")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "frontend"))
+
+# Nenhuma chamada à API é feita ao editar o formulário; a verificação de
+# saúde em segundo plano falha rapidamente contra uma porta fechada
+os.environ.setdefault("SEPSIS_API_URL", "http://127.0.0.1:9")
+os.environ.setdefault("HISTORY_BACKEND", "session")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from history import PredictionHistory  # noqa: E402
+from history_memory import make_predictions  # noqa: E402
+import script_timer  # noqa: E402
+
+
+def timed_runs(action, repeats):
+    """Executa `action` `repeats` vezes e retorna a mediana do tempo de script (s)"""
+    samples = []
+    for i in range(repeats):
+        action(i)
+        samples.append(script_timer.last_duration())
+    return statistics.median(samples)
+
+
+def bench_size(n, repeats):
+    history = PredictionHistory()
+    for timestamp, patient_data, result in make_predictions(n):
+        history.append(patient_data, result, timestamp)
+
+    at = AppTest.from_file(APP_PATH, default_timeout=300)
+    at.session_state["history"] = history
+    at.run()
+
+    def edit_form(i):
+        hr_input = next(w for w in at.number_input if w.label.startswith("Frequência Cardíaca"))
+        hr_input.set_value(80 + i % 5 + 1).run()
+
+    def switch_to(view):
+        at.radio(key="active_view").set_value(view).run()
+        return lambda i: at.run()
+
+    form_rerun = timed_runs(edit_form, repeats)
+    history_rerun = timed_runs(switch_to("📊 Histórico"), repeats)
+    about_rerun = timed_runs(switch_to("ℹ️ Sobre"), repeats)
+    assert not at.exception, at.exception
+
+    return {
+        "predictions": n,
+        "form_rerun_s": form_rerun,
+        "history_view_rerun_s": history_rerun,
+        "about_view_rerun_s": about_rerun,
+        "eager_form_rerun_estimate_s": form_rerun + history_rerun - about_rerun,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 100, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "lazy_views.json"))
+    args = parser.parse_args()
+
+    script_timer.install()
+    rows = []
+    print(f"{'predições':>10} {'formulário':>12} {'c/ abas (est.)':>15} {'redução':>8}")
+    for n in args.sizes:
+        row = bench_size(n, args.repeats)
+        rows.append(row)
+        reduction = row["eager_form_rerun_estimate_s"] / row["form_rerun_s"]
+        print(
+            f"{n:>10} {row['form_rerun_s'] * 1000:>10.1f}ms "
+            f"{row['eager_form_rerun_estimate_s'] * 1000:>13.1f}ms {reduction:>7.1f}x"
+        )
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"benchmark": "lazy_views", "repeats": args.repeats, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+"""
+Teste de carga: muitas sessões de clínicos simultâneas em uma réplica do app
+
+Sobe a `StubApi` e um servidor `streamlit run frontend/app.py` local e abre N
+sessões websocket simuladas, que falam o mesmo protocolo do navegador
+(`BackMsg`/`ForwardMsg` em protobuf no `/_stcore/stream`). Cada sessão repete
+um roteiro realista: pensa, preenche os sinais vitais (no formulário, sem
+tráfego até o envio), envia, volta ao formulário e, às vezes, abre o
+histórico. Para cada N são medidos:
+
+- latência de cada ação (do envio até o fim do script, com os reruns de
+  `st.rerun`), com p50/p95/p99, e no envio também o tempo até a página de
+  resultado aparecer (`submit_first_paint`), antes da resposta da API;
+- ações por segundo e erros (predições com falha, timeouts, desconexões);
+- CPU e memória (RSS) do processo do servidor, lidos de `/proc/<pid>`.
+
+Os resultados vão para `benchmarks/results/load_test.json`, para
+dimensionar réplicas (`numReplicas` no `railway.json`) e validar as
+otimizações do app. Também é possível apontar para um app já em execução
+com `--url` (e `--pid` para as métricas do processo).
+
+Uso:
+    python benchmarks/load_test.py [--sessions 1 5 10 25 50] [--duration 30] [--think 2.0]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+APP_PATH = os.path.join(ROOT_DIR, "frontend", "app.py")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+from tornado.websocket import websocket_connect  # noqa: E402
+from streamlit.proto.BackMsg_pb2 import BackMsg  # noqa: E402
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg  # noqa: E402
+from streamlit.proto.NumberInput_pb2 import NumberInput  # noqa: E402
+from streamlit.proto.WidgetStates_pb2 import WidgetState  # noqa: E402
+
+from stub_api import StubApi  # noqa: E402
+
+SUBMIT_LABEL = "🔬 Avaliar Risco de Sepse"
+BACK_LABEL = "⬅️ Voltar e Inserir Novos Dados"
+# Trecho do HTML da página de resultado, para medir quando ela aparece
+RESULT_MARKER = "result-page-container"
+# Títulos da página de resultado quando a predição falha
+FAILED_TITLES = ("❌ Erro na Predição", "🔌 Predição Indisponível", "🚦 Sistema Sobrecarregado")
+PATIENT_ID_LABEL = "Identificação do Paciente"
+PREDICTION_VIEW = "🔍 Predição"
+HISTORY_VIEW = "📊 Histórico"
+
+# Campos alterados a cada avaliação (prefixo do rótulo: intervalo sorteado)
+VITAL_INPUTS = {
+    "Frequência Cardíaca": (50, 160),
+    "Saturação de Oxigênio": (85, 100),
+    "Temperatura Corporal": (35.5, 40.5),
+    "Taxa Respiratória": (10, 35),
+    "Pressão Sistólica": (85, 170),
+    "Pressão Diastólica": (45, 100),
+}
+
+WIDGET_TYPES = ("button", "checkbox", "number_input", "radio", "selectbox", "text_input")
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class ProcessSampler:
+    """CPU (utime + stime) e RSS de um processo, lidos periodicamente de /proc"""
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+
+    def read(self):
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                # Campos após o nome do processo, que pode conter espaços
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{self.pid}/status") as f:
+                status = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            return None
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+        rss_bytes = int(status["VmRSS"].split()[0]) * 1024
+        threads = int(status["Threads"])
+        return time.monotonic(), cpu_seconds, rss_bytes, threads
+
+    async def run(self):
+        while True:
+            sample = self.read()
+            if sample is not None:
+                self.samples.append(sample)
+            await asyncio.sleep(self.interval)
+
+    def summary(self):
+        if len(self.samples) < 2:
+            return None
+        first, last = self.samples[0], self.samples[-1]
+        intervals = [
+            (b[1] - a[1]) / (b[0] - a[0]) * 100
+            for a, b in zip(self.samples, self.samples[1:]) if b[0] > a[0]
+        ]
+        return {
+            "cpu_percent_mean": (last[1] - first[1]) / (last[0] - first[0]) * 100,
+            "cpu_percent_max": max(intervals),
+            "rss_start_mb": first[2] / 2**20,
+            "rss_end_mb": last[2] / 2**20,
+            "rss_max_mb": max(sample[2] for sample in self.samples) / 2**20,
+            "rss_growth_mb": (last[2] - first[2]) / 2**20,
+            "threads_max": max(sample[3] for sample in self.samples),
+        }
+
+
+class Recorder:
+    """Latências por ação e contagem de erros de um nível de carga"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, action, seconds):
+        self.latencies.setdefault(action, []).append(seconds)
+
+    def error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def summary(self):
+        return {
+            action: {
+                "count": len(values),
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p95_ms": percentile(values, 0.95) * 1000,
+                "p99_ms": percentile(values, 0.99) * 1000,
+                "max_ms": max(values) * 1000,
+            }
+            for action, values in sorted(self.latencies.items())
+        }
+
+
+class SimulatedSession:
+    """
+    Uma aba do navegador: mantém os valores dos widgets e envia um
+    `rerun_script` a cada interação, como o frontend do Streamlit.
+    """
+
+    def __init__(self, url, number, recorder, rng, think, history_ratio, timeout):
+        self.url = url
+        self.number = number
+        self.recorder = recorder
+        self.rng = rng
+        self.think_time = think
+        self.history_ratio = history_ratio
+        self.timeout = timeout
+        self.ws = None
+        self.widgets = {}
+        self.values = {}
+        self.failed = False
+
+    async def think(self, factor=1.0):
+        await asyncio.sleep(self.think_time * factor * self.rng.uniform(0.5, 1.5))
+
+    def _track(self, element):
+        kind = element.WhichOneof("type")
+        if kind == "markdown" and any(title in element.markdown.body for title in FAILED_TITLES):
+            self.failed = True
+        if kind in WIDGET_TYPES:
+            widget = getattr(element, kind)
+            self.widgets[widget.label] = (kind, widget)
+
+    def find(self, label_prefix):
+        for label, (kind, widget) in self.widgets.items():
+            if label.startswith(label_prefix):
+                return kind, widget
+        return None, None
+
+    def view_radio(self):
+        for kind, widget in self.widgets.values():
+            if kind == "radio" and HISTORY_VIEW in widget.options:
+                return widget
+        return None
+
+    def set_value(self, label_prefix, value):
+        kind, widget = self.find(label_prefix)
+        if widget is None:
+            return
+        state = WidgetState(id=widget.id)
+        if kind == "number_input" and widget.data_type == NumberInput.INT:
+            state.int_value = int(round(value))
+        elif kind == "number_input":
+            state.double_value = round(float(value), 1)
+        elif kind in ("radio", "selectbox"):
+            state.int_value = int(value)
+        elif kind == "checkbox":
+            state.bool_value = bool(value)
+        else:
+            state.string_value = str(value)
+        self.values[widget.id] = state
+
+    async def rerun(self, action, trigger=None, paint_marker=None):
+        """
+        Envia um rerun com os valores atuais (e um botão clicado) e espera o
+        fim do script. Com `paint_marker`, registra também em
+        `<action>_first_paint` o tempo até o primeiro markdown que o contém.
+        """
+        message = BackMsg()
+        message.rerun_script.SetInParent()
+        widget_states = message.rerun_script.widget_states
+        current = {widget.id for _, widget in self.widgets.values()}
+        for widget_id, state in self.values.items():
+            if widget_id in current:
+                widget_states.widgets.append(state)
+        if trigger is not None:
+            widget_states.widgets.add(id=trigger, trigger_value=True)
+
+        started = time.perf_counter()
+        painted = paint_marker is None
+        await self.ws.write_message(message.SerializeToString(), binary=True)
+        while True:
+            data = await asyncio.wait_for(self.ws.read_message(), self.timeout)
+            if data is None:
+                raise ConnectionError("websocket fechado pelo servidor")
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                # Cada execução do script redesenha a página
+                self.widgets = {}
+                self.failed = False
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                if element.WhichOneof("type") == "exception":
+                    self.recorder.error("exception")
+                elif not painted and element.WhichOneof("type") == "markdown" \
+                        and paint_marker in element.markdown.body:
+                    painted = True
+                    self.recorder.record(f"{action}_first_paint", time.perf_counter() - started)
+                self._track(element)
+            elif kind == "script_finished" and \
+                    forward.script_finished == ForwardMsg.ScriptFinishedStatus.FINISHED_SUCCESSFULLY:
+                break
+        self.recorder.record(action, time.perf_counter() - started)
+
+    async def switch_view(self, view, action):
+        radio = self.view_radio()
+        if radio is None or view not in radio.options:
+            return
+        state = WidgetState(id=radio.id, int_value=list(radio.options).index(view))
+        self.values[radio.id] = state
+        await self.rerun(action)
+
+    async def evaluate(self):
+        """Preenche o formulário, envia e volta; retorna False se a predição falhou"""
+        for label, (low, high) in VITAL_INPUTS.items():
+            self.set_value(label, self.rng.uniform(low, high))
+        self.set_value(PATIENT_ID_LABEL, f"leito-{self.number % 20 + 1}")
+        _, submit = self.find(SUBMIT_LABEL)
+        if submit is None:
+            self.recorder.error("form_missing")
+            return False
+        # A página de resultado aparece antes da resposta da API (first_paint);
+        # "submit" vai até a probabilidade preenchida
+        await self.rerun("submit", trigger=submit.id, paint_marker=RESULT_MARKER)
+
+        # O script da página de resultado só termina quando a predição termina
+        _, back = self.find(BACK_LABEL)
+        if back is None:
+            self.recorder.error("result_missing")
+            return False
+        failed = self.failed
+        if failed:
+            self.recorder.error("prediction_failed")
+        await self.think(0.5)
+        await self.rerun("back_to_form", trigger=back.id)
+        return not failed
+
+    async def run(self, start_at, stop_at):
+        await asyncio.sleep(max(0.0, start_at - time.monotonic()))
+        try:
+            started = time.perf_counter()
+            self.ws = await asyncio.wait_for(websocket_connect(self.url), self.timeout)
+            self.recorder.record("connect", time.perf_counter() - started)
+            await self.rerun("page_load")
+
+            while time.monotonic() < stop_at:
+                await self.think()
+                await self.evaluate()
+                if self.rng.random() < self.history_ratio:
+                    await self.think(0.5)
+                    await self.switch_view(HISTORY_VIEW, "view_history")
+                    await self.think(0.5)
+                    await self.switch_view(PREDICTION_VIEW, "view_prediction")
+        except asyncio.TimeoutError:
+            self.recorder.error("timeout")
+        except (ConnectionError, OSError) as e:
+            self.recorder.error(type(e).__name__)
+        finally:
+            if self.ws is not None:
+                self.ws.close()
+
+
+async def run_level(url, pid, sessions, args, seed):
+    """Executa `sessions` sessões simultâneas e resume latências, erros e recursos"""
+    recorder = Recorder()
+    sampler = ProcessSampler(pid, args.sample_interval) if pid else None
+    sampler_task = asyncio.create_task(sampler.run()) if sampler else None
+
+    start = time.monotonic()
+    stop_at = start + args.ramp + args.duration
+    clients = [
+        SimulatedSession(
+            url, i, recorder, random.Random(f"{seed}-{sessions}-{i}"), args.think, args.history_ratio, args.timeout
+        )
+        for i in range(sessions)
+    ]
+    await asyncio.gather(*(
+        client.run(start + args.ramp * client.number / sessions, stop_at) for client in clients
+    ))
+    elapsed = time.monotonic() - start
+
+    # Uma última amostra depois do fim das sessões
+    if sampler_task is not None:
+        sampler_task.cancel()
+        sample = sampler.read()
+        if sample is not None:
+            sampler.samples.append(sample)
+
+    actions = recorder.summary()
+    interactive = sum(stats["count"] for action, stats in actions.items() if action != "connect")
+    return {
+        "sessions": sessions,
+        "elapsed_s": elapsed,
+        "actions_per_s": interactive / elapsed,
+        "actions": actions,
+        "errors": recorder.errors,
+        "server": sampler.summary() if sampler else None,
+    }
+
+
+def start_app(port, api_url, log_file):
+    """Sobe `streamlit run` apontando para a API substituta e espera o health check"""
+    env = dict(os.environ)
+    env["SEPSIS_API_URL"] = api_url
+    env.setdefault("HISTORY_BACKEND", "session")
+    env.setdefault("MONITOR_FEED_PATH", os.path.join(RESULTS_DIR, "missing-vitals.jsonl"))
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", APP_PATH,
+            "--server.headless=true",
+            "--server.address=127.0.0.1",
+            f"--server.port={port}",
+            "--server.fileWatcherType=none",
+            "--browser.gatherUsageStats=false",
+        ],
+        cwd=ROOT_DIR, env=env, stdout=log_file, stderr=subprocess.STDOUT
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"o servidor do Streamlit terminou (código {process.returncode})")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("o servidor do Streamlit não respondeu ao health check em 60s")
+
+
+async def run_levels(url, pid, args, stub):
+    levels = []
+    for sessions in args.sessions:
+        before = stub.counts() if stub else {}
+        level = await run_level(url, pid, sessions, args, args.seed)
+        if stub:
+            after = stub.counts()
+            level["api_calls"] = {path: after[path] - before.get(path, 0) for path in after}
+        levels.append(level)
+
+        submit = level["actions"].get("submit", {})
+        server = level["server"] or {}
+        print(
+            f"{sessions:>8} {level['actions_per_s']:>9.1f} "
+            f"{submit.get('p50_ms', 0):>8.0f} {submit.get('p95_ms', 0):>8.0f} {submit.get('p99_ms', 0):>8.0f} "
+            f"{server.get('cpu_percent_mean', 0):>7.0f}% {server.get('rss_end_mb', 0):>8.1f} "
+            f"{server.get('rss_growth_mb', 0):>+8.1f}  {level['errors'] or '-'}"
+        )
+        # Intervalo para o servidor liberar as sessões desconectadas
+        await asyncio.sleep(args.cooldown)
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25, 50],
+                        help="sessões simultâneas em cada nível de carga")
+    parser.add_argument("--duration", type=float, default=30, help="duração de cada nível (s), após a rampa")
+    parser.add_argument("--ramp", type=float, default=5, help="tempo para abrir todas as sessões (s)")
+    parser.add_argument("--think", type=float, default=2.0, help="tempo médio de reflexão entre ações (s)")
+    parser.add_argument("--history-ratio", type=float, default=0.3,
+                        help="fração das avaliações seguidas de uma visita ao histórico")
+    parser.add_argument("--timeout", type=float, default=60, help="tempo máximo por ação (s)")
+    parser.add_argument("--cooldown", type=float, default=3, help="pausa entre os níveis (s)")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="intervalo de leitura do /proc (s)")
+    parser.add_argument("--latency", type=float, default=0.05, help="latência média de /predict (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="variação máxima da latência (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração de predições com erro")
+    parser.add_argument("--url", help="app já em execução (ex.: http://127.0.0.1:8501); não sobe servidor")
+    parser.add_argument("--pid", type=int, help="PID do servidor indicado em --url, para CPU e memória")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "load_test.json"))
+    args = parser.parse_args()
+
+    stub = None
+    process = None
+    log_file = tempfile.NamedTemporaryFile("w+", prefix="streamlit-load-", suffix=".log", delete=False)
+    try:
+        if args.url:
+            base_url, pid = args.url.rstrip("/"), args.pid
+        else:
+            stub = StubApi(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           seed=args.seed).start()
+            port = free_port()
+            process = start_app(port, stub.url, log_file)
+            base_url, pid = f"http://127.0.0.1:{port}", process.pid
+        ws_url = base_url.replace("http", "ws", 1) + "/_stcore/stream"
+
+        print(f"{'sessões':>8} {'ações/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'CPU':>8} {'RSS MB':>8} {'Δ RSS':>8}  erros")
+        levels = asyncio.run(run_levels(ws_url, pid, args, stub))
+    except RuntimeError:
+        log_file.seek(0)
+        print(log_file.read()[-4000:], file=sys.stderr)
+        raise
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if stub is not None:
+            stub.stop()
+        log_file.close()
+        os.unlink(log_file.name)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({
+            "benchmark": "load_test",
+            "python": sys.version.split()[0],
+            "cpu_count": os.cpu_count(),
+            "target": args.url or "local",
+            "script": {
+                "duration_s": args.duration,
+                "ramp_s": args.ramp,
+                "think_s": args.think,
+                "history_ratio": args.history_ratio,
+            },
+            "stub": None if args.url else {
+                "latency_s": args.latency,
+                "jitter_s": args.jitter,
+                "error_rate": args.error_rate,
+            },
+            "levels": levels,
+        }, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark dos escores clínicos locais (SIRS, qSOFA e NEWS2)
+
+Mede o custo por paciente de `score_arrays` sobre colunas NumPy (o caminho
+do lote e do painel de leitos) para N pacientes, e o de `patient_scores`
+chamado paciente a paciente (o caminho do formulário), em microssegundos.
+
+Uso:
+    python benchmarks/local_scores.py [--sizes 1 1000 100000 1000000] [--repeats 7]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend"))
+
+from clinical_scores import patient_scores, score_arrays  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def make_columns(n, seed=42):
+    """Sinais vitais plausíveis de N pacientes, um array por campo"""
+    rng = np.random.default_rng(seed)
+    return {
+        "hr": rng.integers(40, 200, n).astype(float),
+        "resp": rng.integers(8, 40, n).astype(float),
+        "temp": rng.uniform(35.0, 42.0, n).round(1),
+        "sbp": rng.integers(80, 180, n).astype(float),
+        "o2sat": rng.integers(80, 100, n).astype(float),
+        "age": rng.integers(18, 95, n).astype(float),
+    }
+
+
+def time_call(function, repeats):
+    """Mediana e mínimo (s) de `repeats` execuções"""
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations), min(durations)
+
+
+def bench_vectorized(sizes, repeats):
+    rows = []
+    for n in sizes:
+        columns = make_columns(n)
+        median, best = time_call(lambda: score_arrays(columns), repeats)
+        rows.append({
+            "patients": n,
+            "median_s": median,
+            "min_s": best,
+            "us_per_patient": median / n * 10**6,
+        })
+    return rows
+
+
+def bench_per_patient(n, repeats):
+    columns = make_columns(n)
+    patients = [
+        {field: float(values[i]) for field, values in columns.items()}
+        for i in range(n)
+    ]
+    median, best = time_call(lambda: [patient_scores(patient_data) for patient_data in patients], repeats)
+    return {
+        "patients": n,
+        "median_s": median,
+        "min_s": best,
+        "us_per_patient": median / n * 10**6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 1000, 100000, 1000000])
+    parser.add_argument("--per-patient", type=int, default=2000, help="pacientes no laço do formulário")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "local_scores.json"))
+    args = parser.parse_args()
+
+    vectorized = bench_vectorized(args.sizes, args.repeats)
+    per_patient = bench_per_patient(args.per_patient, args.repeats)
+
+    print(f"{'pacientes':>10} {'mediana':>12} {'µs/paciente':>12}")
+    for row in vectorized:
+        print(f"{row['patients']:>10} {row['median_s'] * 1000:>10.3f}ms {row['us_per_patient']:>12.3f}")
+    print(
+        f"patient_scores paciente a paciente ({per_patient['patients']}): "
+        f"{per_patient['us_per_patient']:.1f} µs/paciente"
+    )
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({
+            "benchmark": "local_scores",
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "repeats": args.repeats,
+            "vectorized": vectorized,
+            "per_patient": per_patient,
+        }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
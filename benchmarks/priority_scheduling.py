@@ -0,0 +1,223 @@
+"""
+Benchmark do escalonamento por prioridade no pool de chamadas à API
+
+Sobe a `StubApi` e mede a latência das predições interativas (o caminho do
+formulário, `score_one`) em três cenários, com o mesmo motor de predição e
+o mesmo número de threads:
+
+- `interativo`: só as predições interativas;
+- `com_lote`: as mesmas predições enquanto várias sessões enviam lotes
+  (`score_many`, classe `BULK`) e um leito envia leituras de monitoramento
+  (classe `MONITORING`, com prazo na fila);
+- `com_lote_sem_prioridade`: a mesma carga com todas as chamadas numa
+  única classe e sem threads reservadas (só o rodízio entre sessões).
+
+Uso:
+    python benchmarks/priority_scheduling.py [--latency 0.05] [--workers 16] [--bulk-sessions 8]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+sys.path[:0] = [os.path.join(ROOT_DIR, "frontend"), ROOT_DIR]
+
+from frontend_suite import percentile  # noqa: E402
+from history_memory import make_predictions  # noqa: E402
+from stub_api import StubApi  # noqa: E402
+from worker_pool import BULK, INTERACTIVE, MONITORING, PRIORITIES, WorkerPool  # noqa: E402
+
+
+def make_patients(n, seed):
+    """Pacientes distintos (sem chamadas compartilhadas entre eles)"""
+    patients = [patient_data for _, patient_data, _ in make_predictions(n, seed=seed)]
+    for i, patient_data in enumerate(patients):
+        patient_data["iculos"] = seed * 1_000_000 + i
+    return patients
+
+
+def make_engine(stub, workers, reserved_workers, weights=None):
+    """Motor de predição sem cache sobre um pool próprio"""
+    from api_client import ApiClient
+    from config import get_api_client_settings
+    from scoring_engine import ScoringEngine
+
+    settings = dict(get_api_client_settings(), pool_maxsize=workers * 2)
+    pool = WorkerPool(max_workers=workers, max_queue=4096, max_pending_per_session=32,
+                      weights=weights, reserved_workers=reserved_workers)
+    return ScoringEngine(ApiClient(stub.url, **settings), max_concurrency=workers, pool=pool), pool
+
+
+def to_ms(seconds):
+    return None if seconds is None else seconds * 1000
+
+
+def latency_summary(latencies):
+    if not latencies:
+        return {"calls": 0}
+    return {
+        "calls": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def run_scenario(stub, args, bulk, prioritized):
+    """Predições interativas de `args.users` sessões, com ou sem lotes e monitoramento em paralelo"""
+    weights = None if prioritized else {priority: 1 for priority in PRIORITIES}
+    engine, pool = make_engine(stub, args.workers, args.reserved if prioritized else 0, weights)
+    interactive = INTERACTIVE
+    bulk_priority = BULK if prioritized else INTERACTIVE
+    monitoring = MONITORING if prioritized else INTERACTIVE
+    max_wait = args.monitor_max_wait if prioritized else None
+
+    stop = threading.Event()
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+
+    def user(index):
+        for patient_data in make_patients(args.interactive, seed=index + 1):
+            started = time.perf_counter()
+            success, _ = engine.score_one(patient_data, session=f"user-{index}", priority=interactive)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                failures.append(not success)
+            time.sleep(args.think)
+
+    bulk_results = {}
+
+    def bulk_job(index):
+        patients = make_patients(args.bulk_rows, seed=100 + index)
+        started = time.perf_counter()
+        results = engine.score_many(
+            patients, max_concurrency=args.bulk_in_flight, session=f"bulk-{index}", priority=bulk_priority
+        )
+        with lock:
+            bulk_results[index] = (time.perf_counter() - started, sum(not success for success, _ in results))
+
+    monitor = {"latencies": [], "expired": 0, "failures": 0}
+
+    def monitor_feed():
+        patients = make_patients(10_000, seed=999)
+        for patient_data in patients:
+            if stop.is_set():
+                return
+            started = time.perf_counter()
+            success, result = engine.score_one(
+                patient_data, session="monitor", priority=monitoring, max_wait=max_wait
+            )
+            if success:
+                monitor["latencies"].append(time.perf_counter() - started)
+            elif result.get("expired"):
+                monitor["expired"] += 1
+            else:
+                monitor["failures"] += 1
+            time.sleep(args.monitor_interval)
+
+    background = []
+    if bulk:
+        background = [threading.Thread(target=bulk_job, args=(i,)) for i in range(args.bulk_sessions)]
+        background.append(threading.Thread(target=monitor_feed))
+        for thread in background:
+            thread.start()
+        # Os lotes ocupam as threads antes de as predições interativas começarem
+        time.sleep(args.warmup)
+
+    users = [threading.Thread(target=user, args=(i,)) for i in range(args.users)]
+    for thread in users:
+        thread.start()
+    for thread in users:
+        thread.join()
+    bulk_running = bulk and len(bulk_results) < args.bulk_sessions
+
+    stop.set()
+    for thread in background:
+        thread.join()
+    pool_stats = pool.stats()
+    pool.shutdown(wait=False)
+
+    row = {
+        "interactive": dict(latency_summary(latencies), failures=sum(failures)),
+        "bulk_running_throughout": bulk_running,
+        "classes": {
+            priority: dict(
+                {key: pool_stats["classes"][priority][key] for key in ("completed", "expired", "rejected")},
+                wait_p50_ms=to_ms(pool_stats["classes"][priority]["wait"]["p50_s"]),
+                wait_p99_ms=to_ms(pool_stats["classes"][priority]["wait"]["p99_s"]),
+            )
+            for priority in PRIORITIES
+        },
+    }
+    if bulk:
+        elapsed = max(elapsed for elapsed, _ in bulk_results.values())
+        row["bulk"] = {
+            "rows": args.bulk_rows * args.bulk_sessions,
+            "elapsed_s": elapsed,
+            "rows_per_s": args.bulk_rows * args.bulk_sessions / elapsed,
+            "failures": sum(failed for _, failed in bulk_results.values()),
+        }
+        row["monitoring"] = dict(
+            latency_summary(monitor["latencies"]), expired=monitor["expired"], failures=monitor["failures"]
+        )
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="latência média de /predict (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="variação máxima da latência (s)")
+    parser.add_argument("--workers", type=int, default=16, help="threads do pool")
+    parser.add_argument("--reserved", type=int, default=2, help="threads que o lote não ocupa")
+    parser.add_argument("--users", type=int, default=4, help="sessões enviando o formulário")
+    parser.add_argument("--interactive", type=int, default=50, help="predições por sessão interativa")
+    parser.add_argument("--think", type=float, default=0.05, help="pausa entre envios (s)")
+    parser.add_argument("--bulk-sessions", type=int, default=8)
+    parser.add_argument("--bulk-rows", type=int, default=750, help="pacientes por lote")
+    parser.add_argument("--bulk-in-flight", type=int, default=8, help="requisições simultâneas por lote")
+    parser.add_argument("--monitor-interval", type=float, default=0.02, help="pausa entre leituras (s)")
+    parser.add_argument("--monitor-max-wait", type=float, default=0.1, help="prazo na fila (s)")
+    parser.add_argument("--warmup", type=float, default=0.5, help="espera após iniciar os lotes (s)")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "priority_scheduling.json"))
+    args = parser.parse_args()
+
+    scenarios = {}
+    with StubApi(latency=args.latency, jitter=args.jitter) as stub:
+        scenarios["interativo"] = run_scenario(stub, args, bulk=False, prioritized=True)
+        scenarios["com_lote"] = run_scenario(stub, args, bulk=True, prioritized=True)
+        scenarios["com_lote_sem_prioridade"] = run_scenario(stub, args, bulk=True, prioritized=False)
+
+    print(
+        f"{'cenário':<26} {'p50':>9} {'p95':>9} {'p99':>9} {'fila p99':>9} {'lote/s':>8} "
+        f"{'monit. p99':>11} {'descart.':>9}"
+    )
+    for name, row in scenarios.items():
+        latency = row["interactive"]
+        bulk = row.get("bulk", {})
+        monitoring = row.get("monitoring", {})
+        print(
+            f"{name:<26} {latency['p50_ms']:>7.1f}ms {latency['p95_ms']:>7.1f}ms {latency['p99_ms']:>7.1f}ms "
+            f"{row['classes'][INTERACTIVE]['wait_p99_ms']:>7.1f}ms {bulk.get('rows_per_s', 0):>8.0f} "
+            f"{monitoring.get('p99_ms', 0):>9.1f}ms {monitoring.get('expired', 0):>9}"
+        )
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({
+            "benchmark": "priority_scheduling",
+            "python": sys.version.split()[0],
+            "settings": vars(args) | {"output": None},
+            "scenarios": scenarios,
+        }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Cronômetro de execução do script para benchmarks com o AppTest do Streamlit
+
+O `AppTest.run()` aguarda o fim do script consultando-o a cada 100 ms, o que
+esconde diferenças menores que isso. Este módulo registra o instante real de
+início e fim de cada execução a partir dos eventos do ScriptRunner.
+
+Além disso, o `AppTest.run()` retorna já no primeiro SCRIPT_STOPPED_FOR_RERUN,
+enquanto o rerun pedido por `st.rerun` ainda está executando (e costuma
+falhar com `KeyError: 'client_state'`). Depois de `install()`, cada execução
+espera o fim da thread do script, inclusive dos reruns, e a árvore de
+elementos é montada apenas com as mensagens da última execução.
+"""
+import time
+from urllib import parse
+
+from streamlit.runtime.scriptrunner import RerunData, ScriptRunnerEvent
+from streamlit.testing.v1 import local_script_runner
+from streamlit.testing.v1.element_tree import parse_tree_from_messages
+
+_STOP_EVENTS = (
+    ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS,
+    ScriptRunnerEvent.SCRIPT_STOPPED_WITH_COMPILE_ERROR,
+    ScriptRunnerEvent.SCRIPT_STOPPED_FOR_RERUN,
+)
+
+_durations = []
+_started = {}
+
+
+def _on_event(sender, event, **kwargs):
+    if event == ScriptRunnerEvent.SCRIPT_STARTED:
+        _started[id(sender)] = time.perf_counter()
+        # Só as mensagens da execução mais recente formam a página (como no navegador)
+        sender.forward_msg_queue.clear()
+    elif event in _STOP_EVENTS and id(sender) in _started:
+        _durations.append(time.perf_counter() - _started.pop(id(sender)))
+
+
+def install():
+    """Passa a cronometrar todas as execuções feitas pelo AppTest"""
+    runner_class = local_script_runner.LocalScriptRunner
+    if getattr(runner_class, "_script_timer_installed", False):
+        return
+    original_init = runner_class.__init__
+
+    def __init__(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        self.on_event.connect(_on_event, weak=False)
+
+    def run(self, widget_state=None, query_params=None, timeout=3):
+        query_string = parse.urlencode(query_params, doseq=True) if query_params else ""
+        self.request_rerun(RerunData(widget_states=widget_state, query_string=query_string))
+        if not self._script_thread:
+            self.start()
+        self._script_thread.join(timeout)
+        if self._script_thread.is_alive():
+            self.request_stop()
+            raise RuntimeError(f"AppTest script run timed out after {timeout}s")
+        return parse_tree_from_messages(self.forward_msgs())
+
+    runner_class.__init__ = __init__
+    runner_class.run = run
+    runner_class._script_timer_installed = True
+
+
+def last_duration():
+    """Duração (s) da execução mais recente do script"""
+    return _durations[-1]
+
+
+def mark():
+    """Posição atual na lista de execuções, para usar com `durations_since`"""
+    return len(_durations)
+
+
+def durations_since(position):
+    """
+    Durações (s) das execuções terminadas desde `mark()`; uma interação com
+    `st.rerun` produz mais de uma execução
+    """
+    return _durations[position:]
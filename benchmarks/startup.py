@@ -0,0 +1,180 @@
+"""
+Benchmark do custo de inicialização do frontend (cold start)
+
+Mede duas coisas, sempre em processos Python novos para que nenhum módulo já
+esteja em `sys.modules`:
+
+1. Custo de importação: executa `python -X importtime` com os imports de
+   nível de módulo do `app.py` (extraídos do próprio arquivo) e agrupa o
+   tempo por pacote de topo.
+2. Tempo até a primeira renderização: executa o app com o `AppTest` e
+   cronometra a primeira execução do script (que paga os imports feitos por
+   ele) e um rerun já com os módulos carregados.
+
+O próprio Streamlit já importa pandas, NumPy e pyarrow, e o `AppTest` importa
+também `plotly.graph_objects`; por isso o que o app ainda controla é, em
+essência, o `plotly.express` e os módulos do frontend.
+
+Uso:
+    python benchmarks/startup.py [--repeats 5] [--top 15]
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+FRONTEND_DIR = os.path.join(ROOT_DIR, "frontend")
+APP_PATH = os.path.join(FRONTEND_DIR, "app.py")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Pacotes pesados cuja presença após a primeira renderização é reportada
+HEAVY_MODULES = ["numpy", "pandas", "pyarrow", "plotly.express"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def child_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([FRONTEND_DIR, ROOT_DIR, BENCH_DIR, env.get("PYTHONPATH", "")])
+    # A verificação de saúde em segundo plano falha rapidamente contra uma porta fechada
+    env.setdefault("SEPSIS_API_URL", "http://127.0.0.1:9")
+    env.setdefault("HISTORY_BACKEND", "session")
+    return env
+
+
+def app_imports():
+    """Comandos de import de nível de módulo do app.py (inclusive dentro de try)"""
+    with open(APP_PATH, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    def collect(body):
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                yield ast.unparse(node)
+            elif isinstance(node, ast.Try):
+                yield from collect(node.body)
+            elif isinstance(node, ast.If):
+                yield from collect(node.body)
+                yield from collect(node.orelse)
+
+    return list(collect(tree.body))
+
+
+def run_importtime(statements):
+    """Executa os imports com `-X importtime` e agrupa o tempo por pacote"""
+    code = "\n".join(statements)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=FRONTEND_DIR, env=child_env(), capture_output=True, text=True, check=True
+    )
+
+    packages = {}
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        packages[module.split(".")[0]] = packages.get(module.split(".")[0], 0) + int(self_us)
+        # Linhas sem recuo são imports de topo: o acumulado delas soma o total
+        if len(indent) == 1:
+            total_us += int(cumulative_us)
+    return total_us, packages
+
+
+def measure_first_render():
+    """Processo filho: cronometra a primeira execução do app e um rerun"""
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    import script_timer
+    streamlit_import = time.perf_counter() - started
+
+    script_timer.install()
+    at = AppTest.from_file(APP_PATH, default_timeout=300)
+    at.run()
+    first_render = script_timer.last_duration()
+    at.run()
+    rerun = script_timer.last_duration()
+    assert not at.exception, at.exception
+
+    print(json.dumps({
+        "streamlit_import_s": streamlit_import,
+        "first_render_s": first_render,
+        "rerun_s": rerun,
+        "loaded_after_first_render": [name for name in HEAVY_MODULES if name in sys.modules],
+    }))
+
+
+def run_first_render():
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, __file__, "--child-render"],
+        cwd=FRONTEND_DIR, env=child_env(), capture_output=True, text=True, check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_wall_s"] = time.perf_counter() - started
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "startup.json"))
+    parser.add_argument("--child-render", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_render:
+        measure_first_render()
+        return
+
+    statements = app_imports()
+    totals, per_package = [], {}
+    for _ in range(args.repeats):
+        total_us, packages = run_importtime(statements)
+        totals.append(total_us)
+        for name, self_us in packages.items():
+            per_package.setdefault(name, []).append(self_us)
+    packages = sorted(
+        ((name, statistics.median(samples) / 1e6) for name, samples in per_package.items()),
+        key=lambda item: item[1], reverse=True
+    )[:args.top]
+
+    renders = [run_first_render() for _ in range(args.repeats)]
+    render = {
+        key: statistics.median(r[key] for r in renders)
+        for key in ("streamlit_import_s", "first_render_s", "rerun_s", "process_wall_s")
+    }
+    render["loaded_after_first_render"] = renders[-1]["loaded_after_first_render"]
+
+    print(f"Imports do app.py: {statistics.median(totals) / 1e3:.1f}ms")
+    for name, seconds in packages:
+        print(f"  {name:<24} {seconds * 1000:>8.1f}ms")
+    print(f"Import do Streamlit/AppTest: {render['streamlit_import_s'] * 1000:.1f}ms")
+    print(f"Primeira renderização:      {render['first_render_s'] * 1000:.1f}ms")
+    print(f"Rerun:                      {render['rerun_s'] * 1000:.1f}ms")
+    print(f"Processo completo:          {render['process_wall_s'] * 1000:.1f}ms")
+    print(f"Carregados após a 1ª renderização: {', '.join(render['loaded_after_first_render'])}")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({
+            "benchmark": "startup",
+            "repeats": args.repeats,
+            "python": sys.version.split()[0],
+            "app_imports": statements,
+            "import_time_s": statistics.median(totals) / 1e6,
+            "import_time_by_package_s": dict(packages),
+            "first_render": render,
+        }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+API de predição substituta para benchmarks e testes de carga
+
+Implementa `/predict` e `/health` com o mesmo formato de resposta da API
+real, mas com latência, variação (jitter) e taxa de erro configuráveis. A
+probabilidade é uma função determinística dos sinais vitais, de modo que o
+mesmo paciente recebe sempre a mesma resposta, e cada requisição é contada
+por caminho para que os benchmarks saibam quantas chamadas o app fez.
+
+Pode ser usada dentro de outro script (`with StubApi(latency=0.05) as api:`)
+ou como processo separado:
+
+    python benchmarks/stub_api.py [--port 8000] [--latency 0.05] [--jitter 0.02] [--error-rate 0.01]
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MODEL_VERSION = "stub-1"
+
+
+def stub_probability(patient_data):
+    """Probabilidade plausível (e determinística) a partir dos sinais vitais"""
+    score = (
+        0.04 * (patient_data.get("hr", 80) - 90)
+        + 0.12 * (patient_data.get("resp", 16) - 20)
+        + 0.9 * (patient_data.get("temp", 37.0) - 38.0)
+        - 0.03 * (patient_data.get("sbp", 120) - 100)
+        - 0.15 * (patient_data.get("o2sat", 98) - 94)
+    )
+    return round(1 / (1 + math.exp(-score)), 4)
+
+
+def risk_level(probability):
+    if probability >= 0.6:
+        return "Alto"
+    if probability >= 0.3:
+        return "Moderado"
+    return "Baixo"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em envios separados; com Nagle, o ACK atrasado
+    # do cliente somaria ~40 ms a cada resposta em conexões keep-alive
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        stub = self.server.stub
+        if self.path != "/health":
+            stub._count(self.path, error=True)
+            self._send(404, {"detail": "Not Found"})
+            return
+        stub._wait(stub.health_latency)
+        stub._count(self.path)
+        self._send(200, {"status": "healthy", "model_version": MODEL_VERSION})
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path != "/predict":
+            stub._count(self.path, error=True)
+            self._send(404, {"detail": "Not Found"})
+            return
+
+        stub._wait(stub._sample_latency())
+        if stub._should_fail():
+            stub._count(self.path, error=True)
+            self._send(stub.error_status, {"detail": "Erro simulado pela API substituta"})
+            return
+        try:
+            patient_data = json.loads(body)
+        except ValueError:
+            stub._count(self.path, error=True)
+            self._send(422, {"detail": "JSON inválido"})
+            return
+
+        probability = stub_probability(patient_data)
+        stub._count(self.path)
+        self._send(200, {
+            "prediction": probability,
+            "risk_level": risk_level(probability),
+            "confidence": 0.9,
+            "model_version": MODEL_VERSION,
+        })
+
+
+class StubApi:
+    """
+    Servidor HTTP da API substituta, em uma thread de fundo.
+
+    A latência de `/predict` é `latency ± jitter` segundos (uniforme, nunca
+    negativa) e uma fração `error_rate` das predições responde com o status
+    `error_status` (500 por padrão; 502/503/504 são repetidos pelo cliente).
+    Com `port=0` o sistema escolhe uma porta livre; a URL fica em `url`.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=500, health_latency=0.0, seed=42):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.health_latency = health_latency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._errors = {}
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Atende requisições na thread atual até ser interrompido"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _sample_latency(self):
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _should_fail(self):
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    @staticmethod
+    def _wait(seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def _count(self, path, error=False):
+        with self._lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+            if error:
+                self._errors[path] = self._errors.get(path, 0) + 1
+
+    def counts(self):
+        """Requisições recebidas por caminho (inclusive as que falharam)"""
+        with self._lock:
+            return dict(self._counts)
+
+    def errors(self):
+        """Requisições respondidas com erro, por caminho"""
+        with self._lock:
+            return dict(self._errors)
+
+    def reset(self):
+        """Zera os contadores"""
+        with self._lock:
+            self._counts.clear()
+            self._errors.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.05, help="latência média de /predict (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="variação máxima da latência (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração de predições com erro")
+    parser.add_argument("--error-status", type=int, default=500, help="status HTTP dos erros simulados")
+    parser.add_argument("--health-latency", type=float, default=0.0, help="latência de /health (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    stub = StubApi(
+        args.host, args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        error_status=args.error_status, health_latency=args.health_latency, seed=args.seed
+    )
+    print(f"API substituta em {stub.url} (Ctrl+C para encerrar)")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
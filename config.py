@@ -40,9 +40,111 @@ def get_health_endpoint():
     return f"{base_url}/health"
 
 
+def get_api_client_settings():
+    """
+    Retorna as configurações do cliente HTTP (pool, timeouts e retentativas).
+
+    No POST /predict só as falhas de conexão são repetidas, então uma
+    predição ocupa a thread do pool por no máximo
+    (API_MAX_RETRIES + 1) × API_CONNECT_TIMEOUT + API_READ_TIMEOUT, mais o
+    backoff (API_BACKOFF_FACTOR × 2 a partir da segunda retentativa): cerca
+    de 14,8 s com os padrões. Mantenha esse limite abaixo de
+    SCORING_REQUEST_TIMEOUT; acima dele, o usuário desiste da predição
+    enquanto a chamada continua ocupando a thread.
+    """
+    return {
+        "connect_timeout": float(os.environ.get("API_CONNECT_TIMEOUT", "3.05")),
+        "read_timeout": float(os.environ.get("API_READ_TIMEOUT", "5")),
+        "pool_connections": int(os.environ.get("API_POOL_CONNECTIONS", "4")),
+        "pool_maxsize": int(os.environ.get("API_POOL_MAXSIZE", "16")),
+        "max_retries": int(os.environ.get("API_MAX_RETRIES", "2")),
+        "backoff_factor": float(os.environ.get("API_BACKOFF_FACTOR", "0.3")),
+    }
+
+
 DEBUG = os.environ.get("DEBUG", "false").lower() == "true"
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 
+# Spans de tempo (HTTP, DataFrames, gráficos, páginas): ligados com DEBUG ou
+# LOG_LEVEL=DEBUG, guardando os TRACE_BUFFER_SIZE mais recentes do processo
+TRACING_ENABLED = DEBUG or LOG_LEVEL.upper() == "DEBUG"
+TRACE_BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", "4096"))
+
+# Visão "Diagnóstico": disponível com DEBUG ou quando um token de acesso é definido
+DIAGNOSTICS_TOKEN = os.environ.get("DIAGNOSTICS_TOKEN", "")
+DIAGNOSTICS_ENABLED = DEBUG or bool(DIAGNOSTICS_TOKEN)
+
+# Intervalo (s) entre verificações de saúde da API feitas em segundo plano
+HEALTH_CHECK_TTL = float(os.environ.get("HEALTH_CHECK_TTL", "30"))
+
+# Predição em lote: respostas por atualização da tabela e requisições simultâneas
+BATCH_CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", "50"))
+BATCH_MAX_IN_FLIGHT = int(os.environ.get("BATCH_MAX_IN_FLIGHT", "8"))
+
+# Motor de predição: threads de I/O compartilhadas e timeout por paciente (s),
+# maior que a duração máxima de uma chamada (ver get_api_client_settings)
+SCORING_MAX_CONCURRENCY = int(os.environ.get("SCORING_MAX_CONCURRENCY", "16"))
+SCORING_REQUEST_TIMEOUT = float(os.environ.get("SCORING_REQUEST_TIMEOUT", "15"))
+
+# Pool das chamadas à API (predição e saúde), com SCORING_MAX_CONCURRENCY threads:
+# chamadas aguardando no total e chamadas em andamento por sessão antes de recusar
+API_POOL_QUEUE_SIZE = int(os.environ.get("API_POOL_QUEUE_SIZE", "256"))
+API_POOL_SESSION_LIMIT = int(os.environ.get("API_POOL_SESSION_LIMIT", "32"))
+
+# Escalonamento do pool por classe de prioridade: peso de cada classe na fila
+# justa ponderada e threads que o lote nunca ocupa (livres para o formulário
+# e o monitoramento)
+API_POOL_WEIGHTS = {
+    "interactive": int(os.environ.get("API_WEIGHT_INTERACTIVE", "8")),
+    "monitoring": int(os.environ.get("API_WEIGHT_MONITORING", "3")),
+    "bulk": int(os.environ.get("API_WEIGHT_BULK", "1")),
+}
+API_POOL_RESERVED_WORKERS = int(os.environ.get("API_POOL_RESERVED_WORKERS", "2"))
+
+# Circuit breaker da API de predição: o circuito abre quando, entre as últimas
+# CIRCUIT_WINDOW chamadas (mínimo CIRCUIT_MIN_CALLS), a fração de falhas atinge
+# CIRCUIT_FAILURE_RATE ou a de chamadas com mais de CIRCUIT_SLOW_CALL_SECONDS
+# atinge CIRCUIT_SLOW_CALL_RATE; fica aberto por CIRCUIT_OPEN_SECONDS e então
+# libera CIRCUIT_HALF_OPEN_CALLS chamadas de teste
+CIRCUIT_WINDOW = int(os.environ.get("CIRCUIT_WINDOW", "20"))
+CIRCUIT_MIN_CALLS = int(os.environ.get("CIRCUIT_MIN_CALLS", "5"))
+CIRCUIT_FAILURE_RATE = float(os.environ.get("CIRCUIT_FAILURE_RATE", "0.5"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.environ.get("CIRCUIT_SLOW_CALL_SECONDS", "5"))
+CIRCUIT_SLOW_CALL_RATE = float(os.environ.get("CIRCUIT_SLOW_CALL_RATE", "0.8"))
+CIRCUIT_OPEN_SECONDS = float(os.environ.get("CIRCUIT_OPEN_SECONDS", "30"))
+CIRCUIT_HALF_OPEN_CALLS = int(os.environ.get("CIRCUIT_HALF_OPEN_CALLS", "1"))
+
+# Escores SIRS/qSOFA/NEWS2 locais no formulário e no resultado (inclusive no modo degradado)
+FALLBACK_SCORES_ENABLED = os.environ.get("FALLBACK_SCORES_ENABLED", "true").lower() == "true"
+
+# Cache de predições: número máximo de entradas e validade (s)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "1024"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "600"))
+
+# Histórico: "session" (apenas na sessão) ou "sqlite" (persistente e compartilhado)
+HISTORY_BACKEND = os.environ.get("HISTORY_BACKEND", "session").lower()
+HISTORY_DB_PATH = os.environ.get("HISTORY_DB_PATH", "data/history.sqlite3")
+# Predições por página na tabela e máximo de pontos no gráfico (acima disso a série é reduzida)
+HISTORY_PAGE_SIZE = int(os.environ.get("HISTORY_PAGE_SIZE", "50"))
+HISTORY_CHART_POINTS = int(os.environ.get("HISTORY_CHART_POINTS", "2000"))
+
+# Séries por paciente: medições guardadas por paciente e medições usadas nas tendências
+PATIENT_SERIES_CAPACITY = int(os.environ.get("PATIENT_SERIES_CAPACITY", "256"))
+PATIENT_TREND_WINDOW = int(os.environ.get("PATIENT_TREND_WINDOW", "12"))
+
+# Monitoramento de leitos: arquivo JSONL com as leituras, leituras guardadas
+# por leito, intervalo mínimo entre predições do mesmo leito (s), intervalo de
+# leitura do arquivo (s) e de atualização do painel (s), tempo (s) em que o
+# painel se atualiza no lugar antes de reexecutar o app inteiro, e espera
+# máxima (s) de uma predição na fila do pool antes de ser descartada por estar velha
+MONITOR_FEED_PATH = os.environ.get("MONITOR_FEED_PATH", "data/vitals.jsonl")
+MONITOR_WINDOW = int(os.environ.get("MONITOR_WINDOW", "60"))
+MONITOR_DEBOUNCE = float(os.environ.get("MONITOR_DEBOUNCE", "10"))
+MONITOR_POLL_INTERVAL = float(os.environ.get("MONITOR_POLL_INTERVAL", "1"))
+MONITOR_REFRESH_INTERVAL = float(os.environ.get("MONITOR_REFRESH_INTERVAL", "2"))
+MONITOR_RERUN_INTERVAL = float(os.environ.get("MONITOR_RERUN_INTERVAL", "30"))
+MONITOR_MAX_WAIT = float(os.environ.get("MONITOR_MAX_WAIT", "5"))
+
 
 STREAMLIT_SERVER_PORT=8502
 STREAMLIT_SERVER_ADDRESS ="0.0.0.0"
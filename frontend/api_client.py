@@ -0,0 +1,148 @@
+"""
+Cliente HTTP compartilhado para a API de predição de sepse
+"""
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import LATENCY_BUCKETS, HistogramFamily
+from tracing import span
+
+
+class ApiClient:
+    """
+    Mantém uma única `requests.Session` com pool de conexões keep-alive,
+    timeouts de conexão/leitura e retentativas limitadas com backoff.
+
+    Uma instância deve ser criada por processo (via `st.cache_resource`) e
+    compartilhada entre todas as sessões do Streamlit.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        connect_timeout=3.05,
+        read_timeout=5.0,
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=2,
+        backoff_factor=0.3,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+
+        # Só falhas de conexão são repetidas em qualquer método: a requisição
+        # não chegou à API. Timeouts de leitura nunca são repetidos, e as
+        # respostas 502/503/504 só no GET, para que um POST dure no máximo
+        # (max_retries + 1) × connect_timeout + backoff + read_timeout, abaixo
+        # do timeout do motor de predição (que não interrompe a thread).
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=False,
+        )
+
+        # A Session já envia "Connection: keep-alive" por padrão
+        self.session = requests.Session()
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._histograms = HistogramFamily(LATENCY_BUCKETS)
+
+    def get(self, path, timeout=None):
+        """Executa um GET no caminho informado da API"""
+        return self._request("GET", path, timeout=timeout)
+
+    def post(self, path, payload, timeout=None):
+        """Executa um POST com corpo JSON no caminho informado da API"""
+        return self._request("POST", path, json=payload, timeout=timeout)
+
+    def _request(self, method, path, timeout=None, **kwargs):
+        started = time.perf_counter()
+        ok = False
+        try:
+            with span(f"http.{method} {path}") as request_span:
+                response = self.session.request(
+                    method,
+                    f"{self.base_url}{path}",
+                    timeout=timeout or self.timeout,
+                    **kwargs
+                )
+                request_span.set(status=response.status_code)
+            ok = response.ok
+            return response
+        finally:
+            self._record(path, time.perf_counter() - started, ok)
+
+    def _record(self, path, elapsed, ok):
+        self._histograms.observe(path, elapsed, error=not ok)
+        with self._lock:
+            stats = self._latency.setdefault(path, {
+                "count": 0,
+                "errors": 0,
+                "total_s": 0.0,
+                "max_s": 0.0,
+                "last_s": 0.0,
+            })
+            stats["count"] += 1
+            stats["errors"] += 0 if ok else 1
+            stats["total_s"] += elapsed
+            stats["last_s"] = elapsed
+            stats["max_s"] = max(stats["max_s"], elapsed)
+
+    def pool_stats(self):
+        """
+        Retorna contadores do pool de conexões.
+
+        `pool_hits` é o número de requisições que reaproveitaram uma conexão
+        já aberta (sem novo handshake TCP/TLS).
+        """
+        connections = 0
+        requests_sent = 0
+        for key in list(self._adapter.poolmanager.pools.keys()):
+            pool = self._adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            requests_sent += pool.num_requests
+        return {
+            "connections_opened": connections,
+            "requests": requests_sent,
+            "pool_hits": max(requests_sent - connections, 0),
+        }
+
+    def latency_stats(self):
+        """Retorna contadores de latência por caminho da API"""
+        with self._lock:
+            snapshot = {path: dict(stats) for path, stats in self._latency.items()}
+        for stats in snapshot.values():
+            stats["mean_s"] = stats["total_s"] / stats["count"] if stats["count"] else 0.0
+        return snapshot
+
+    def latency_histograms(self):
+        """Histogramas de latência por caminho da API (buckets fixos)"""
+        return self._histograms.snapshot()
+
+    def stats(self):
+        """Retorna um resumo com as métricas de pool e de latência"""
+        return {"pool": self.pool_stats(), "latency": self.latency_stats()}
+
+    def close(self):
+        """Fecha todas as conexões do pool"""
+        self.session.close()
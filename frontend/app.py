@@ -2,13 +2,20 @@
 Frontend Streamlit para detecção de sepse com design elegante
 """
 import streamlit as st
-import requests
-import json
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
+import hmac
+import logging
 import time
+from concurrent.futures import Future
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+# Início desta execução do script, para o histograma de reruns
+rerun_started = time.perf_counter()
+
+# pandas e Plotly são importados dentro das visões que os usam, para que o
+# primeiro carregamento (e cada visão que não desenha tabelas ou gráficos)
+# não pague o custo de importação
 
 
 st.set_page_config(
@@ -62,6 +69,54 @@ body {
     border-color: #495057;
 }
 
+/* Navegação entre visões: radio horizontal com aparência de abas. O
+   Streamlit usa o rótulo do st.radio como aria-label do grupo, o que
+   restringe o estilo a este radio e deixa os demais intactos */
+div[role="radiogroup"][aria-label="Navegação"] {
+    gap: 0;
+    border-bottom: 1px solid rgba(49, 51, 63, 0.2);
+    margin-bottom: 1rem;
+}
+
+div[role="radiogroup"][aria-label="Navegação"] > label {
+    padding: 0.5rem 1rem;
+    margin: 0;
+    border-bottom: 2px solid transparent;
+}
+
+div[role="radiogroup"][aria-label="Navegação"] > label > div:first-child {
+    display: none;
+}
+
+div[role="radiogroup"][aria-label="Navegação"] > label:has(input:checked) {
+    border-bottom-color: #ff4b4b;
+    color: #ff4b4b;
+}
+
+/* Formulário do paciente sem moldura, como os demais blocos */
+[data-testid="stForm"] {
+    border: none;
+    padding: 0;
+}
+
+[data-testid="stFormSubmitButton"] > button {
+    border: 2px solid #00695c;
+    border-radius: 20px;
+    background-color: #00796b;
+    color: white;
+    padding: 12px 28px;
+    font-size: 18px;
+    font-weight: bold;
+    transition: all 0.3s ease-in-out;
+    width: 100%;
+}
+
+[data-testid="stFormSubmitButton"] > button:hover {
+    background-color: #004d40;
+    border-color: #004d40;
+    transform: scale(1.05);
+}
+
 /* Caixas de entrada de número */
 .stNumberInput input {
     border-radius: 10px;
@@ -93,6 +148,7 @@ body {
 .traffic-light-circle.green { background: linear-gradient(145deg, #66bb6a, #388e3c); }
 .traffic-light-circle.yellow { background: linear-gradient(145deg, #ffee58, #fbc02d); color: #333; }
 .traffic-light-circle.red { background: linear-gradient(145deg, #ef5350, #c62828); }
+.traffic-light-circle.gray { background: linear-gradient(145deg, #bdbdbd, #757575); }
 
 .probability-value {
     font-size: 5rem;
@@ -114,6 +170,7 @@ body {
 .result-title.green-text { color: #2e7d32; }
 .result-title.yellow-text { color: #f57f17; }
 .result-title.red-text { color: #c62828; }
+.result-title.gray-text { color: #616161; }
 
 .result-message {
     font-size: 1.2rem;
@@ -148,135 +205,470 @@ body {
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+# Módulos auxiliares do frontend (cliente da API, caches, etc.)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api_client import ApiClient
+from health_monitor import HealthMonitor
+from batch import read_patient_file, prepare_batch, score_batch
+from scoring_engine import ScoringEngine
+from worker_pool import BULK, INTERACTIVE, MONITORING, PRIORITIES, WorkerPool
+from circuit_breaker import CircuitBreaker, OPEN
+from clinical_scores import NEWS2_RISKS, patient_scores, score_arrays
+from prediction_cache import PredictionCache
+from history import PredictionHistory
+from history_store import SQLiteHistoryStore
+from downsample import downsample
+from bed_monitor import BedMonitor, FileTailFeed
+from patient_store import PatientStore
+from tracing import span, tracer
+from metrics import RERUN_BUCKETS, HistogramFamily, estimate_size
 
 try:
-    from config import get_api_url
+    from config import (
+        get_api_url, get_api_client_settings, HEALTH_CHECK_TTL,
+        LOG_LEVEL, TRACING_ENABLED, TRACE_BUFFER_SIZE, DIAGNOSTICS_ENABLED, DIAGNOSTICS_TOKEN,
+        BATCH_CHUNK_SIZE, BATCH_MAX_IN_FLIGHT,
+        SCORING_MAX_CONCURRENCY, SCORING_REQUEST_TIMEOUT, API_POOL_QUEUE_SIZE, API_POOL_SESSION_LIMIT,
+        API_POOL_WEIGHTS, API_POOL_RESERVED_WORKERS,
+        CIRCUIT_WINDOW, CIRCUIT_MIN_CALLS, CIRCUIT_FAILURE_RATE, CIRCUIT_SLOW_CALL_SECONDS,
+        CIRCUIT_SLOW_CALL_RATE, CIRCUIT_OPEN_SECONDS, CIRCUIT_HALF_OPEN_CALLS, FALLBACK_SCORES_ENABLED,
+        PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL,
+        HISTORY_BACKEND, HISTORY_DB_PATH, HISTORY_PAGE_SIZE, HISTORY_CHART_POINTS,
+        PATIENT_SERIES_CAPACITY, PATIENT_TREND_WINDOW,
+        MONITOR_FEED_PATH, MONITOR_WINDOW, MONITOR_DEBOUNCE,
+        MONITOR_POLL_INTERVAL, MONITOR_REFRESH_INTERVAL, MONITOR_RERUN_INTERVAL, MONITOR_MAX_WAIT
+    )
     API_BASE_URL = get_api_url()
+    API_CLIENT_SETTINGS = get_api_client_settings()
 except ImportError:
     # Fallback para configuração manual
     API_BASE_URL = os.environ.get("API_URL", "http://localhost:8000")
+    API_CLIENT_SETTINGS = {}
+    HEALTH_CHECK_TTL = 30.0
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    TRACING_ENABLED = os.environ.get("DEBUG", "false").lower() == "true" or LOG_LEVEL.upper() == "DEBUG"
+    TRACE_BUFFER_SIZE = 4096
+    DIAGNOSTICS_TOKEN = os.environ.get("DIAGNOSTICS_TOKEN", "")
+    DIAGNOSTICS_ENABLED = os.environ.get("DEBUG", "false").lower() == "true" or bool(DIAGNOSTICS_TOKEN)
+    BATCH_CHUNK_SIZE = 50
+    BATCH_MAX_IN_FLIGHT = 8
+    SCORING_MAX_CONCURRENCY = 16
+    SCORING_REQUEST_TIMEOUT = 15.0
+    API_POOL_QUEUE_SIZE = 256
+    API_POOL_SESSION_LIMIT = 32
+    API_POOL_WEIGHTS = {"interactive": 8, "monitoring": 3, "bulk": 1}
+    API_POOL_RESERVED_WORKERS = 2
+    CIRCUIT_WINDOW = 20
+    CIRCUIT_MIN_CALLS = 5
+    CIRCUIT_FAILURE_RATE = 0.5
+    CIRCUIT_SLOW_CALL_SECONDS = 5.0
+    CIRCUIT_SLOW_CALL_RATE = 0.8
+    CIRCUIT_OPEN_SECONDS = 30.0
+    CIRCUIT_HALF_OPEN_CALLS = 1
+    FALLBACK_SCORES_ENABLED = True
+    PREDICTION_CACHE_SIZE = 1024
+    PREDICTION_CACHE_TTL = 600.0
+    HISTORY_BACKEND = "session"
+    HISTORY_DB_PATH = "data/history.sqlite3"
+    HISTORY_PAGE_SIZE = 50
+    HISTORY_CHART_POINTS = 2000
+    PATIENT_SERIES_CAPACITY = 256
+    PATIENT_TREND_WINDOW = 12
+    MONITOR_FEED_PATH = "data/vitals.jsonl"
+    MONITOR_WINDOW = 60
+    MONITOR_DEBOUNCE = 10.0
+    MONITOR_POLL_INTERVAL = 1.0
+    MONITOR_REFRESH_INTERVAL = 2.0
+    MONITOR_RERUN_INTERVAL = 30.0
+    MONITOR_MAX_WAIT = 5.0
+
+# Logs do frontend (o Streamlit configura apenas o próprio logger)
+logging.basicConfig(
+    level=getattr(logging, LOG_LEVEL.upper(), logging.INFO),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger("sepsis_sentinel")
+tracer.configure(enabled=TRACING_ENABLED, capacity=TRACE_BUFFER_SIZE)
+
+@st.cache_resource
+def get_api_client():
+    """Cliente HTTP com pool de conexões, compartilhado por todo o processo"""
+    return ApiClient(API_BASE_URL, **API_CLIENT_SETTINGS)
+
+@st.cache_resource
+def get_worker_pool():
+    """
+    Pool de threads de todas as chamadas à API do processo (predições e
+    verificações de saúde), com fila limitada, prioridade por classe e
+    rodízio entre as sessões
+    """
+    return WorkerPool(
+        max_workers=SCORING_MAX_CONCURRENCY,
+        max_queue=API_POOL_QUEUE_SIZE,
+        max_pending_per_session=API_POOL_SESSION_LIMIT,
+        weights=API_POOL_WEIGHTS,
+        reserved_workers=API_POOL_RESERVED_WORKERS
+    )
+
+# Filas do pool que não pertencem a uma sessão de usuário
+HEALTH_LANE = "health"
+MONITOR_LANE = "monitor"
+
+# Ocupação da fila do pool a partir da qual as páginas avisam sobre a demora
+BACKPRESSURE_WARNING = 0.5
+
+def show_backpressure_warning(priority=INTERACTIVE):
+    """
+    Avisa quando a fila de chamadas à API está se enchendo (antes de recusar
+    novas), considerando só as chamadas que passam à frente da classe `priority`
+    """
+    pool = get_worker_pool()
+    if pool.pressure(priority) >= BACKPRESSURE_WARNING:
+        st.warning(
+            f"🚦 Alta demanda: {pool.stats()['queued']} chamadas à API na fila. As predições podem demorar "
+            "e, com a fila cheia, são recusadas até a demanda baixar."
+        )
 
-def check_api_health():
+def current_session_id():
+    """Identificador da sessão do Streamlit em execução (None fora do servidor)"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+def check_api_health(client=None, pool=None):
     """Verifica se a API está funcionando"""
+    client = client or get_api_client()
+    pool = pool or get_worker_pool()
+    try:
+        # Interativa: uma verificação atrasada pelo lote marcaria a API como fora do ar
+        future = pool.submit(lambda: client.get("/health", timeout=5), session=HEALTH_LANE, priority=INTERACTIVE)
+    except Exception as e:
+        logger.debug("Verificação de saúde da API não entrou na fila: %s", e)
+        return False, None
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
+        response = future.result(timeout=10)
         return response.status_code == 200, response.json()
-    except:
+    except Exception as e:
+        future.cancel()
+        logger.debug("Verificação de saúde da API falhou: %s", e)
         return False, None
 
+@st.cache_resource
+def get_health_monitor():
+    """Monitor de saúde da API, atualizado em segundo plano a cada TTL"""
+    client, pool = get_api_client(), get_worker_pool()
+    return HealthMonitor(lambda: check_api_health(client, pool), ttl=HEALTH_CHECK_TTL).start()
+
+@st.cache_resource
+def get_prediction_cache():
+    """Cache de predições por dados do paciente, compartilhado entre sessões"""
+    return PredictionCache(maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+
+@st.cache_resource
+def get_circuit_breaker():
+    """Circuit breaker das predições, compartilhado por todo o processo"""
+    return CircuitBreaker(
+        window=CIRCUIT_WINDOW,
+        min_calls=CIRCUIT_MIN_CALLS,
+        failure_rate=CIRCUIT_FAILURE_RATE,
+        slow_call_duration=CIRCUIT_SLOW_CALL_SECONDS,
+        slow_call_rate=CIRCUIT_SLOW_CALL_RATE,
+        open_duration=CIRCUIT_OPEN_SECONDS,
+        half_open_calls=CIRCUIT_HALF_OPEN_CALLS
+    )
+
+@st.cache_resource
+def get_scoring_engine():
+    """Motor de predição concorrente, compartilhado por todo o processo"""
+    return ScoringEngine(
+        get_api_client(),
+        max_concurrency=SCORING_MAX_CONCURRENCY,
+        request_timeout=SCORING_REQUEST_TIMEOUT,
+        pool=get_worker_pool(),
+        cache=get_prediction_cache(),
+        breaker=get_circuit_breaker()
+    )
+
 def predict_sepsis(patient_data):
-    """Faz predição de sepse via API"""
+    """Faz predição de sepse via API, na fila do pool reservada à sessão atual"""
+    return get_scoring_engine().score_one(patient_data, session=current_session_id())
+
+def submit_prediction(patient_data, patient_id=""):
+    """
+    Envia a predição em segundo plano e abre a página de resultado, que
+    mostra os dados locais enquanto a API não responde
+    """
+    pending = {
+        "id": uuid4().hex,
+        "future": Future(),
+        "patient_data": patient_data,
+        "patient_id": patient_id,
+    }
+    # Obtidos aqui: o callback roda numa thread do pool, sem contexto de script
+    history, patient_store = get_history(), get_patient_store()
+    get_scoring_engine().submit(patient_data, session=current_session_id()).add_done_callback(
+        lambda done: record_prediction(done, pending, history, patient_store)
+    )
+    st.session_state.pending_predictions.append(pending)
+    st.session_state.result_id = pending["id"]
+    st.session_state.result = None
+    st.session_state.prediction_error = None
+    st.session_state.patient_data = patient_data
+    st.session_state.page = 'result'
+
+def record_prediction(done, pending, history, patient_store):
+    """
+    Callback da predição em segundo plano: grava a bem-sucedida no histórico
+    (e na série do paciente, se identificado) com o horário em que terminou,
+    mesmo que a sessão não volte a rodar, e resolve `pending["future"]` com
+    (sucesso, resultado, horário, ticket do histórico)
+    """
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/predict",
-            json=patient_data,
-            timeout=10
-        )
-        return response.status_code == 200, response.json()
+        success, result = done.result()
     except Exception as e:
-        return False, {"error": str(e)}
+        logger.warning("Predição em segundo plano falhou: %s", e)
+        success, result = False, {"error": str(e)}
+
+    ticket = None
+    # Horário marcado com o lock do histórico da sessão (o SQLite tem o
+    # próprio), para que as predições entrem em ordem de término
+    with getattr(history, "lock", None) or nullcontext():
+        completed_at = datetime.now()
+        if success:
+            try:
+                ticket = history.append(pending["patient_data"], result, completed_at)
+                if pending["patient_id"]:
+                    patient_store.append(pending["patient_id"], pending["patient_data"], result, completed_at)
+            except Exception:
+                logger.exception("Falha ao gravar a predição no histórico")
+    pending["future"].set_result((success, result, completed_at, ticket))
+
+def collect_pending_predictions():
+    """
+    Incorpora as predições em segundo plano que já terminaram (e já foram
+    gravadas no histórico pelo callback): a da página de resultado atual
+    preenche `result` ou `prediction_error`
+    """
+    pending_predictions = st.session_state.pending_predictions
+    for pending in [pending for pending in pending_predictions if pending["future"].done()]:
+        pending_predictions.remove(pending)
+        success, result, _, ticket = pending["future"].result()
+        if ticket is not None:
+            st.session_state.history_ticket = ticket
+
+        if pending["id"] == st.session_state.get("result_id"):
+            st.session_state.result = result if success else None
+            st.session_state.prediction_error = None if success else result
+
+# Intervalo (s) entre as verificações da predição pendente na página de resultado
+PENDING_POLL_INTERVAL = 0.1
+
+def wait_for_prediction(status):
+    """
+    Mantém a página de resultado aberta até a predição atual terminar e então
+    a redesenha. O placeholder é reescrito a cada intervalo, o que permite ao
+    Streamlit interromper a espera quando o usuário interage com a página.
+    """
+    pending = next(
+        (pending for pending in st.session_state.pending_predictions
+         if pending["id"] == st.session_state.get("result_id")),
+        None
+    )
+    if pending is None:
+        return
+    pool = get_worker_pool()
+    started = time.monotonic()
+    while not pending["future"].done():
+        status.caption(
+            f"⏳ Aguardando o modelo preditivo há {time.monotonic() - started:.1f}s · "
+            f"{pool.stats()['queued']} chamadas à API na fila"
+        )
+        time.sleep(PENDING_POLL_INTERVAL)
+    st.rerun()
+
+@st.cache_resource
+def get_history_store():
+    """Histórico persistente em SQLite, compartilhado por todo o processo"""
+    return SQLiteHistoryStore(HISTORY_DB_PATH)
+
+@st.cache_resource
+def get_rerun_histograms():
+    """Histogramas da duração dos reruns por visão, compartilhados pelo processo"""
+    return HistogramFamily(RERUN_BUCKETS)
+
+@st.cache_resource
+def get_shared_patient_store():
+    """Séries por paciente compartilhadas entre sessões (com HISTORY_BACKEND=sqlite)"""
+    return PatientStore(capacity=PATIENT_SERIES_CAPACITY)
+
+def get_patient_store():
+    """Séries por paciente, com o mesmo escopo do histórico de predições"""
+    if HISTORY_BACKEND == "sqlite":
+        return get_shared_patient_store()
+    if "patient_store" not in st.session_state:
+        st.session_state.patient_store = PatientStore(capacity=PATIENT_SERIES_CAPACITY)
+    return st.session_state.patient_store
+
+@st.cache_resource
+def get_bed_monitor():
+    """
+    Monitor de leitos compartilhado por todas as sessões. As predições usam
+    o mesmo motor de `predict_sepsis`, obtido aqui porque a thread do
+    monitor não tem contexto de script para consultar o cache_resource.
+    Os leitos pendentes são enviados juntos e dividem uma única fila no
+    pool de chamadas à API, na classe de monitoramento; uma predição que
+    espera mais de MONITOR_MAX_WAIT segundos na fila é descartada e refeita
+    com as leituras mais recentes do leito.
+    """
+    engine = get_scoring_engine()
+    return BedMonitor(
+        FileTailFeed(MONITOR_FEED_PATH),
+        lambda patient_data: engine.submit(
+            patient_data, session=MONITOR_LANE, priority=MONITORING, max_wait=MONITOR_MAX_WAIT
+        ),
+        window=MONITOR_WINDOW,
+        debounce=MONITOR_DEBOUNCE,
+        poll_interval=MONITOR_POLL_INTERVAL
+    ).start()
+
+# Espera máxima (s) pela gravação das predições da própria sessão antes de ler o histórico
+HISTORY_OWN_WRITES_TIMEOUT = 1.0
+
+def wait_own_history_writes(history):
+    """
+    Com o histórico em SQLite, espera a gravação apenas das predições desta
+    sessão ainda na fila, para que apareçam na página; as das demais sessões
+    entram quando o lote delas for gravado
+    """
+    ticket = st.session_state.get("history_ticket")
+    if ticket is not None and hasattr(history, "flush"):
+        history.flush(timeout=HISTORY_OWN_WRITES_TIMEOUT, ticket=ticket)
+
+def get_history():
+    """
+    Histórico de predições: persistente em SQLite (HISTORY_BACKEND=sqlite)
+    ou apenas da sessão atual (padrão)
+    """
+    if HISTORY_BACKEND == "sqlite":
+        return get_history_store()
+    if "history" not in st.session_state:
+        st.session_state.history = PredictionHistory()
+    return st.session_state.history
 
 # -----------------------------------------------------------------------------
 # Funções para renderizar as "páginas"
 # -----------------------------------------------------------------------------
 
+# Opções codificadas do formulário (rótulo exibido -> valor enviado à API)
+GENDER_CODES = {"Feminino": 0, "Masculino": 1}
+YES_NO_CODES = {"Não": 0, "Sim": 1}
+
 def show_form_page():
     """Renderiza a página com o formulário de entrada de dados."""
     st.header("📊 Informações do Paciente")
     st.markdown("Por favor, insira os dados clínicos mais recentes para avaliação.")
-
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.subheader("💓 Sinais Vitais")
-        hr = st.number_input(
-            "Frequência Cardíaca (bpm)", 
-            min_value=40, max_value=200, value=80,
-            help="Batimentos por minuto. Normal: 60-100 bpm."
-        )
-        o2sat = st.number_input(
-            "Saturação de Oxigênio (%)", 
-            min_value=0, max_value=100, value=98,
-            help="Saturação de oxigênio em porcentagem."
+    show_backpressure_warning()
+
+    # Os campos ficam em um st.form: editar um valor não dispara rerun, e o
+    # script só executa (e chama a API) quando o formulário é enviado
+    with st.form("patient_form"):
+        patient_id = st.text_input(
+            "Identificação do Paciente / Leito (opcional)",
+            max_chars=64,
+            help="Predições com a mesma identificação formam a trajetória do paciente no histórico. Não é enviada à API."
         )
+        col1, col2, col3 = st.columns(3)
 
-    with col2:
-        st.subheader("🌡️ Respiração e Temperatura")
-        temp = st.number_input(
-            "Temperatura Corporal (°C)", 
-            min_value=35.0, max_value=42.0, value=37.0, step=0.1,
-            help="Normal: 36.5-37.5°C."
-        )
-        resp = st.number_input(
-            "Taxa Respiratória (rpm)", 
-            min_value=0, max_value=100, value=18,
-            help="Respirações por minuto. Normal: 12-20 rpm."
-        )
+        with col1:
+            st.subheader("💓 Sinais Vitais")
+            hr = st.number_input(
+                "Frequência Cardíaca (bpm)", 
+                min_value=40, max_value=200, value=80,
+                help="Batimentos por minuto. Normal: 60-100 bpm."
+            )
+            o2sat = st.number_input(
+                "Saturação de Oxigênio (%)", 
+                min_value=0, max_value=100, value=98,
+                help="Saturação de oxigênio em porcentagem."
+            )
 
-    with col3:
-        st.subheader("💉 Pressão Arterial")
-        sbp = st.number_input(
-            "Pressão Sistólica (mmHg)", 
-            min_value=0, max_value=300, value=120,
-            help="O valor mais alto da pressão. Normal: ~120 mmHg."
-        )
-        dbp = st.number_input(
-            "Pressão Diastólica (mmHg)", 
-            min_value=0, max_value=200, value=80,
-            help="O valor mais baixo da pressão. Normal: ~80 mmHg."
-        )
+        with col2:
+            st.subheader("🌡️ Respiração e Temperatura")
+            temp = st.number_input(
+                "Temperatura Corporal (°C)", 
+                min_value=35.0, max_value=42.0, value=37.0, step=0.1,
+                help="Normal: 36.5-37.5°C."
+            )
+            resp = st.number_input(
+                "Taxa Respiratória (rpm)", 
+                min_value=0, max_value=100, value=18,
+                help="Respirações por minuto. Normal: 12-20 rpm."
+            )
 
-    # Segunda linha de campos
-    st.markdown("<br>", unsafe_allow_html=True)
-    col4, col5, col6 = st.columns(3)
-
-    with col4:
-        st.subheader("👤 Dados Demográficos")
-        age = st.number_input(
-            "Idade (anos)", 
-            min_value=0, max_value=150, value=45,
-            help="Idade do paciente em anos."
-        )
-        gender = st.selectbox(
-            "Gênero",
-            options=[(0, "Feminino"), (1, "Masculino")],
-            format_func=lambda x: x[1],
-            help="Gênero do paciente"
-        )[0]
-
-    with col5:
-        st.subheader("🏥 Dados Hospitalares")
-        hosp_adm_time = st.number_input(
-            "Tempo de Internação (horas)", 
-            min_value=0, value=24,
-            help="Tempo de internação em horas."
-        )
-        iculos = st.number_input(
-            "Tempo na UTI (horas)", 
-            min_value=0, value=48,
-            help="Número de horas na UTI."
-        )
+        with col3:
+            st.subheader("💉 Pressão Arterial")
+            sbp = st.number_input(
+                "Pressão Sistólica (mmHg)", 
+                min_value=0, max_value=300, value=120,
+                help="O valor mais alto da pressão. Normal: ~120 mmHg."
+            )
+            dbp = st.number_input(
+                "Pressão Diastólica (mmHg)", 
+                min_value=0, max_value=200, value=80,
+                help="O valor mais baixo da pressão. Normal: ~80 mmHg."
+            )
 
-    with col6:
-        st.subheader("🏢 Unidades")
-        unit1 = st.selectbox(
-            "Unidade 1",
-            options=[(0, "Não"), (1, "Sim")],
-            format_func=lambda x: x[1]
-        )[0]
-        unit2 = st.selectbox(
-            "Unidade 2",
-            options=[(0, "Não"), (1, "Sim")],
-            format_func=lambda x: x[1]
-        )[0]
-
-    # Calcula MAP automaticamente
-    map_val = (sbp + 2 * dbp) / 3
+        # Segunda linha de campos
+        st.markdown("<br>", unsafe_allow_html=True)
+        col4, col5, col6 = st.columns(3)
 
-    st.markdown("<br>", unsafe_allow_html=True)
-    _, col_button, _ = st.columns([2, 3, 2])
+        with col4:
+            st.subheader("👤 Dados Demográficos")
+            age = st.number_input(
+                "Idade (anos)", 
+                min_value=0, max_value=150, value=45,
+                help="Idade do paciente em anos."
+            )
+            gender = GENDER_CODES[st.selectbox(
+                "Gênero",
+                options=list(GENDER_CODES),
+                help="Gênero do paciente"
+            )]
+
+        with col5:
+            st.subheader("🏥 Dados Hospitalares")
+            hosp_adm_time = st.number_input(
+                "Tempo de Internação (horas)", 
+                min_value=0, value=24,
+                help="Tempo de internação em horas."
+            )
+            iculos = st.number_input(
+                "Tempo na UTI (horas)", 
+                min_value=0, value=48,
+                help="Número de horas na UTI."
+            )
 
-    if col_button.button("🔬 Avaliar Risco de Sepse", type="primary"):
+        with col6:
+            st.subheader("🏢 Unidades")
+            unit1 = YES_NO_CODES[st.selectbox(
+                "Unidade 1",
+                options=list(YES_NO_CODES)
+            )]
+            unit2 = YES_NO_CODES[st.selectbox(
+                "Unidade 2",
+                options=list(YES_NO_CODES)
+            )]
+
+        # Calcula MAP automaticamente
+        map_val = (sbp + 2 * dbp) / 3
+
+        st.markdown("<br>", unsafe_allow_html=True)
+        _, col_button, _ = st.columns([2, 3, 2])
+        submitted = col_button.form_submit_button("🔬 Avaliar Risco de Sepse", type="primary")
+
+    if submitted:
         # Prepara dados para a API
         patient_data = {
             "hr": hr,
@@ -294,42 +686,82 @@ def show_form_page():
             "iculos": iculos
         }
 
-        with st.spinner('Analisando dados e consultando o modelo preditivo...'):
-            # Faz predição real via API
-            success, result = predict_sepsis(patient_data)
-
-            if success:
-                # Salva no histórico
-                if "predictions" not in st.session_state:
-                    st.session_state.predictions = []
-
-                prediction_record = {
-                    "timestamp": datetime.now().isoformat(),
-                    "patient_data": patient_data,
-                    "result": result
-                }
-                st.session_state.predictions.append(prediction_record)
-
-                # Salva resultado e vai para página de resultado
-                st.session_state.result = result
-                st.session_state.page = 'result'
-                st.rerun()
-            else:
-                st.error(f"❌ Erro na predição: {result.get('error', 'Erro desconhecido')}")
+        # A predição segue em segundo plano: a página de resultado abre na hora,
+        # com a PAM e os escores locais, e a probabilidade entra quando a API responder
+        submit_prediction(patient_data, patient_id.strip())
+        st.rerun()
+
+def show_clinical_scores(patient_data):
+    """Escores SIRS/qSOFA/NEWS2 locais, exibidos junto com a predição ou no lugar dela"""
+    scores = patient_scores(patient_data)
+
+    st.subheader("🩺 Escores Clínicos Locais")
+    col_sirs, col_qsofa, col_news2 = st.columns(3)
+    with col_sirs:
+        st.metric("SIRS (parcial)", f"{scores['sirs']}/3", help="Sem leucócitos e PaCO2, que não são coletados.")
+        for criterion in scores["sirs_criteria"]:
+            st.markdown(f"- {criterion}")
+    with col_qsofa:
+        st.metric("qSOFA (parcial)", f"{scores['qsofa']}/2", help="Sem o nível de consciência, que não é coletado.")
+        for criterion in scores["qsofa_criteria"]:
+            st.markdown(f"- {criterion}")
+    with col_news2:
+        st.metric(
+            "NEWS2",
+            scores["news2"],
+            scores["news2_risk"],
+            delta_color="off",
+            help="Em ar ambiente e sem o nível de consciência, que não são coletados."
+        )
+        for label, points in scores["news2_components"].items():
+            if points:
+                st.markdown(f"- {label}: +{points}")
+
+    if scores["alert"]:
+        st.error(
+            "🚨 Dois ou mais critérios de SIRS ou qSOFA, ou NEWS2 ≥ 5: considere avaliação imediata para sepse. "
+            + scores["news2_response"]
+        )
+    else:
+        st.info(f"Menos de dois critérios de SIRS e de qSOFA com os dados disponíveis. {scores['news2_response']}")
+    st.caption(
+        "Escores calculados pelo próprio frontend a partir do formulário, sem o modelo de ML, "
+        "histórico nem exames laboratoriais."
+    )
 
 def show_result_page():
     """Renderiza a página com o resultado do diagnóstico."""
+    import pandas as pd
+
     result = st.session_state.result
-    probability = result["prediction"]
-    prob_percent = probability * 100
+    error = st.session_state.prediction_error
+    patient_data = st.session_state.patient_data
 
     # Define a cor, título e mensagem com base na probabilidade
-    if prob_percent >= 60:
+    if result is None:
+        # Sem probabilidade: predição em andamento ou que falhou
+        color_class = "gray"
+        color_text = "gray-text"
+        circle_value = "…" if error is None else "—"
+        circle_label = "consultando" if error is None else "sem predição"
+        if error is None:
+            title = "⏳ Consultando o Modelo Preditivo"
+            message = "A probabilidade aparece aqui assim que a API responder. Os escores clínicos locais abaixo já estão disponíveis."
+        elif error.get("backpressure"):
+            title = "🚦 Sistema Sobrecarregado"
+            message = f"{error['error']}. Os escores clínicos locais abaixo não dependem da API."
+        elif error.get("circuit_open"):
+            title = "🔌 Predição Indisponível"
+            message = f"{error['error']}. A predição do modelo não foi feita; os escores clínicos locais abaixo não dependem da API."
+        else:
+            title = "❌ Erro na Predição"
+            message = f"{error.get('error', 'Erro desconhecido')}. Os escores clínicos locais abaixo não dependem da API."
+    elif result["prediction"] >= 0.6:
         color_class = "red"
         color_text = "red-text"
         title = "🚨 ALERTA - Risco Elevado"
         message = "Os dados indicam um risco elevado de sepse. É crucial procurar avaliação médica imediata para uma análise aprofundada e início de tratamento, se necessário."
-    elif 30 <= prob_percent < 60:
+    elif result["prediction"] >= 0.3:
         color_class = "yellow"
         color_text = "yellow-text"
         title = "⚠️ ATENÇÃO - Risco Moderado"
@@ -340,17 +772,25 @@ def show_result_page():
         title = "✅ Baixo Risco"
         message = "O modelo indica um baixo risco de sepse com base nos dados atuais. Continue monitorando os sintomas e, caso persistam ou piorem, procure um profissional de saúde."
 
+    if result is not None:
+        circle_value = f"{result['prediction'] * 100:.0f}%"
+        circle_label = "de Risco"
+
     # Renderiza o HTML da página de resultado
     st.markdown(f"""
     <div class="result-page-container">
         <div class="traffic-light-circle {color_class}">
-            <div class="probability-value">{prob_percent:.0f}%</div>
-            <div class="probability-label">de Risco</div>
+            <div class="probability-value">{circle_value}</div>
+            <div class="probability-label">{circle_label}</div>
         </div>
         <div class="result-title {color_text}">{title}</div>
         <p class="result-message">{message}</p>
     </div>
     """, unsafe_allow_html=True)
+    status = st.empty()
+
+    if FALLBACK_SCORES_ENABLED:
+        show_clinical_scores(patient_data)
 
     # Informações adicionais
     st.markdown("<br>", unsafe_allow_html=True)
@@ -361,15 +801,23 @@ def show_result_page():
         st.subheader("📋 Detalhes da Predição")
          
         # Cria DataFrame com detalhes da predição na vertical
-        prediction_data = [
-            {'Campo': 'Probabilidade', 'Valor': f"{probability:.1%}"},
-            {'Campo': 'Nível de Risco', 'Valor': result["risk_level"]},
-            {'Campo': 'Confiança', 'Valor': 'Alta'},
-            {'Campo': 'Status', 'Valor': 'Processado'}
-        ]
+        if result is not None:
+            prediction_data = [
+                {'Campo': 'Probabilidade', 'Valor': f"{result['prediction']:.1%}"},
+                {'Campo': 'Nível de Risco', 'Valor': result["risk_level"]},
+                {'Campo': 'Confiança', 'Valor': 'Alta'},
+                {'Campo': 'Status', 'Valor': 'Processado'}
+            ]
+        else:
+            prediction_data = [
+                {'Campo': 'Probabilidade', 'Valor': '—'},
+                {'Campo': 'Nível de Risco', 'Valor': '—'},
+                {'Campo': 'Status', 'Valor': 'Aguardando a API' if error is None else 'Erro'}
+            ]
          
         # Cria DataFrame final na vertical
-        prediction_df = pd.DataFrame(prediction_data)
+        with span("dataframe.result"):
+            prediction_df = pd.DataFrame(prediction_data)
          
         # Exibe a tabela na vertical sem índices
         st.dataframe(prediction_df, use_container_width=True, hide_index=True)
@@ -377,9 +825,6 @@ def show_result_page():
     with col_info2:
         st.subheader("📊 Dados do Paciente")
          
-        # Dados do paciente
-        patient_data = st.session_state.predictions[-1]["patient_data"]
-         
         # Mapeamento de nomes amigáveis em português
         field_names = {
             'hr': 'Frequência Cardíaca (bpm)',
@@ -425,7 +870,8 @@ def show_result_page():
                 })
          
         # Cria DataFrame final na vertical
-        patient_df = pd.DataFrame(display_data)
+        with span("dataframe.result"):
+            patient_df = pd.DataFrame(display_data)
          
         # Exibe a tabela na vertical sem índices
         st.dataframe(patient_df, use_container_width=True, hide_index=True)
@@ -434,25 +880,273 @@ def show_result_page():
     _, col_button, _ = st.columns([2, 3, 2])
 
     if col_button.button("⬅️ Voltar e Inserir Novos Dados", type="secondary"):
+        # Uma predição ainda em andamento continua e entra no histórico ao terminar
         st.session_state.page = 'form'
         st.rerun()
 
+    if result is None and error is None:
+        wait_for_prediction(status)
+
+@st.cache_resource(max_entries=32, ttl=3600)
+def build_probability_figure(history_key, history_version, window_start, window_stop, max_points, _history):
+    """
+    Monta o gráfico de evolução da probabilidade para o intervalo
+    [window_start, window_stop) do histórico.
+
+    O resultado é memorizado pela identidade e versão do histórico e pela
+    janela: enquanto nenhuma predição nova é incluída, os reruns reutilizam
+    a mesma figura em vez de reconstruí-la. A figura é compartilhada e não
+    deve ser alterada por quem a recebe. Retorna (figura, pontos desenhados).
+    """
+    import pandas as pd
+    import plotly.express as px
+
+    # Séries longas são reduzidas (LTTB) mantendo os cruzamentos dos limiares de risco
+    pred_dates, pred_probabilities, pred_risks = _history.series(window_start, window_stop)
+    if window_start == 0:
+        summary = _history.summary()
+        min_prob = summary["min_probability"]
+        max_prob = summary["max_probability"]
+    else:
+        min_prob = float(pred_probabilities.min())
+        max_prob = float(pred_probabilities.max())
+    if len(pred_probabilities) > max_points:
+        points = downsample(pred_dates, pred_probabilities, max_points, (0.3, 0.6))
+        pred_dates, pred_probabilities, pred_risks = (
+            pred_dates[points], pred_probabilities[points], pred_risks[points]
+        )
+
+    with span("figure.probability", points=len(pred_probabilities)):
+        # Cria DataFrame para o gráfico
+        chart_data = pd.DataFrame({
+            'Data/Hora': pred_dates,
+            'Probabilidade': pred_probabilities,
+            'Nível de Risco': pred_risks
+        })
+
+        # Gráfico de linha com pontos
+        fig = px.line(
+            chart_data,
+            x='Data/Hora',
+            y='Probabilidade',
+            title="Evolução da Probabilidade de Sepse ao Longo do Tempo",
+            labels={
+                "Data/Hora": "Data e Hora da Predição",
+                "Probabilidade": "Probabilidade de Sepse (0-1)"
+            },
+            markers=True,  # Adiciona pontos nos dados
+            line_shape='linear'
+        )
+
+        # Adiciona pontos coloridos por nível de risco
+        fig.add_scatter(
+            x=chart_data['Data/Hora'],
+            y=chart_data['Probabilidade'],
+            mode='markers',
+            marker=dict(
+                size=10,
+                color=[{'Alto': '#ef5350', 'Moderado': '#fbc02d', 'Baixo': '#66bb6a'}[risk] for risk in pred_risks]
+            ),
+            name='Nível de Risco',
+            showlegend=True
+        )
+
+        # Configurações do gráfico com escala ajustada
+         # Se todos os valores forem 0, ajusta a escala para mostrar melhor os dados
+         # Ajusta a escala do eixo Y baseado nos dados reais (0-1)
+         # Sempre inclui espaço para as linhas de referência importantes
+        if min_prob == 0 and max_prob == 0:
+            y_range = [0, 0.1]  # Escala de 0 a 0.1 para valores muito baixos
+        elif max_prob < 0.1:
+            y_range = [0, max(0.1, max_prob * 1.2)]  # Escala proporcional para valores baixos
+        elif max_prob < 0.3:
+            y_range = [0, 0.4]  # Escala que inclui risco moderado
+        elif max_prob < 0.6:
+            y_range = [0, 0.7]  # Escala que inclui risco alto
+        else:
+            y_range = [0, 1]  # Escala padrão de 0 a 1
+
+            fig.update_layout(
+            height=500,
+            xaxis_title="Data e Hora da Predição",
+            yaxis_title="Probabilidade de Sepse (0-1)",
+            yaxis=dict(range=y_range),
+            hovermode='x unified',
+            showlegend=True
+        )
+
+        # Adiciona linhas de referência para níveis de risco
+        # Linha de risco moderado (sempre visível se a escala permitir)
+        if y_range[1] >= 0.3:
+            fig.add_hline(y=0.3, line_dash="dash", line_color="orange", 
+                         annotation_text="Risco Moderado (≥0.3)", annotation_position="top right")
+        elif y_range[1] >= 0.2:  # Se a escala for menor, mostra em posição ajustada
+            fig.add_hline(y=0.3, line_dash="dash", line_color="orange", 
+                         annotation_text="Risco Moderado (≥0.3)", annotation_position="top right")
+
+        # Linha de risco alto (sempre visível se a escala permitir)
+        if y_range[1] >= 0.6:
+            fig.add_hline(y=0.6, line_dash="dash", line_color="red", 
+                         annotation_text="Risco Alto (≥0.6)", annotation_position="top right")
+        elif y_range[1] >= 0.4:  # Se a escala for menor, mostra em posição ajustada
+            fig.add_hline(y=0.6, line_dash="dash", line_color="red", 
+                         annotation_text="Risco Alto (≥0.6)", annotation_position="top right")
+
+        # Linha de risco baixo (sempre visível)
+        fig.add_hline(y=0.05, line_dash="dash", line_color="green", 
+                     annotation_text="Risco Baixo (<0.05)", annotation_position="top right")
+
+    return fig, len(pred_probabilities)
+
+@st.cache_resource(max_entries=32, ttl=3600)
+def build_trajectory_figure(store_key, store_version, patient_ids, _store):
+    """
+    Trajetória da probabilidade de cada paciente selecionado, lida das
+    séries por paciente (sem percorrer o histórico global). Memorizada pela
+    identidade e versão das séries, como o gráfico de evolução.
+    """
+    import plotly.graph_objects as go
+
+    with span("figure.trajectory", patients=len(patient_ids)):
+        fig = go.Figure()
+        for patient_id in patient_ids:
+            timestamps, values = _store.window(patient_id)
+            fig.add_scatter(x=timestamps, y=values["probability"], mode="lines+markers", name=patient_id)
+
+    fig.update_layout(
+        height=450,
+        title="Trajetória da Probabilidade de Sepse por Paciente",
+        xaxis_title="Data e Hora da Predição",
+        yaxis_title="Probabilidade de Sepse (0-1)",
+        yaxis=dict(range=[0, 1]),
+        hovermode='x unified',
+        showlegend=True
+    )
+    fig.add_hline(y=0.3, line_dash="dash", line_color="orange",
+                  annotation_text="Risco Moderado (≥0.3)", annotation_position="top right")
+    fig.add_hline(y=0.6, line_dash="dash", line_color="red",
+                  annotation_text="Risco Alto (≥0.6)", annotation_position="top right")
+    return fig
+
+def show_patient_trajectories():
+    """Trajetórias e tendências dos pacientes identificados no formulário"""
+    store = get_patient_store()
+    patient_ids = store.patients()
+
+    st.subheader("🧑‍⚕️ Trajetórias por Paciente")
+    if not patient_ids:
+        st.info("Informe a identificação do paciente no formulário para acompanhar sua trajetória.")
+        return
+
+    selected = st.multiselect(
+        "Pacientes",
+        patient_ids,
+        default=patient_ids[-5:],
+        key="history_patients"
+    )
+    if not selected:
+        return
+
+    fig = build_trajectory_figure(store.key, store.version, tuple(selected), store)
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Tendências nas últimas medições de cada paciente (escores sem nível de consciência)
+    st.caption(
+        f"Tendências nas últimas {PATIENT_TREND_WINDOW} medições de cada paciente. "
+        "qSOFA parcial: FR ≥ 22 e PAS ≤ 100; NEWS2 em ar ambiente. Nenhum dos dois inclui o nível de consciência."
+    )
+    for patient_id in selected:
+        trends = store.trends(patient_id, PATIENT_TREND_WINDOW)
+        col_name, col_hr, col_resp, col_map, col_qsofa, col_news2 = st.columns(6)
+        col_name.markdown(f"**{patient_id}**  \n{trends['points']} medições")
+        for column, label, key, unit in (
+            (col_hr, "FC", "hr_slope", "bpm/h"),
+            (col_resp, "FR", "resp_slope", "irpm/h"),
+            (col_map, "PAM", "map_slope", "mmHg/h"),
+        ):
+            slope = trends[key]
+            column.metric(label, "—" if slope != slope else f"{slope:+.1f} {unit}")
+        col_qsofa.metric(
+            "qSOFA parcial",
+            f"{trends['qsofa']}/2",
+            delta=trends["qsofa_change"] or None,
+            delta_color="inverse"
+        )
+        col_news2.metric(
+            "NEWS2",
+            trends["news2"],
+            delta=trends["news2_change"] or None,
+            delta_color="inverse"
+        )
+
+# Janelas de tempo disponíveis no histórico
+HISTORY_WINDOWS = {
+    "Tudo": None,
+    "Última hora": timedelta(hours=1),
+    "Últimas 24 horas": timedelta(days=1),
+    "Últimos 7 dias": timedelta(days=7),
+}
+
+def show_history_window(history, total_predictions, window_start, window_count, page, page_size, page_count):
+    """Tabela da página atual e gráfico de evolução das predições da janela de tempo"""
+    # A página 1 traz as predições mais recentes
+    table_stop = total_predictions - (page - 1) * page_size
+    table_start = max(table_stop - page_size, window_start)
+    
+    # Tabela vertical (uma coluna por predição) apenas com a página atual
+    with span("dataframe.history_table"):
+        vertical_df = history.table_frame(table_start, table_stop)
+    st.caption(
+        f"Página {page} de {page_count} · predições {table_start + 1} a {table_stop} "
+        f"({window_count} na janela de tempo)"
+    )
+    
+    # Exibe a tabela vertical
+    st.dataframe(
+        vertical_df,
+        use_container_width=True,
+        height=500,  # Aumentado de 400 para 500
+        column_config={
+            col: st.column_config.TextColumn(col, width="medium") 
+            for col in vertical_df.columns
+        }
+    )
+    
+    st.markdown("---")
+
+    # Gráfico de evolução temporal das predições
+    st.subheader(f"📈 Evolução das Predições ao Longo do Tempo ({window_count} predições)")
+    
+    fig, point_count = build_probability_figure(
+        history.key, history.version, window_start, total_predictions, HISTORY_CHART_POINTS, history
+    )
+    if point_count < window_count:
+        st.caption(f"Exibindo {point_count} de {window_count} pontos (série reduzida)")
+
+    # Avisos de inconsistência entre probabilidade e nível de risco (os mais recentes)
+    for warning in history.warnings[-5:]:
+        st.warning(warning)
+    
+    # Exibe o gráfico
+    st.plotly_chart(fig, use_container_width=True)
+
 def show_history_page():
     """Renderiza a página de histórico de predições"""
     st.header("📊 Histórico de Predições")
 
-    if "predictions" in st.session_state and st.session_state.predictions:
+    history = get_history()
+    wait_own_history_writes(history)
+
+    if len(history):
         # Resumo executivo no topo
         st.subheader("📋 Resumo Executivo")
         
-        # Calcula estatísticas gerais
-        total_predictions = len(st.session_state.predictions)
-        high_risk_count = sum(1 for pred in st.session_state.predictions 
-                             if pred["result"]["prediction"] >= 0.6)
-        moderate_risk_count = sum(1 for pred in st.session_state.predictions 
-                                 if 0.3 <= pred["result"]["prediction"] < 0.6)
-        low_risk_count = sum(1 for pred in st.session_state.predictions 
-                            if pred["result"]["prediction"] < 0.3)
+        # Estatísticas gerais, mantidas de forma incremental pelo histórico
+        summary = history.summary()
+        total_predictions = summary["count"]
+        high_risk_count = summary["buckets"]["Alto"]
+        moderate_risk_count = summary["buckets"]["Moderado"]
+        low_risk_count = summary["buckets"]["Baixo"]
         
         # Exibe métricas em colunas
         col1, col2, col3, col4 = st.columns(4)
@@ -474,212 +1168,463 @@ def show_history_page():
         # Tabela de histórico organizada verticalmente
         st.subheader("📊 Detalhamento das Predições")
         
-        # Cria DataFrame organizado verticalmente
-        if st.session_state.predictions:
-            # Define as métricas que serão exibidas
-            metrics = [
-                'Data/Hora',
-                'Probabilidade',
-                'Nível de Risco',
-                'Freq. Cardíaca',
-                'Saturação O2',
-                'Temperatura',
-                'Pressão Sistólica'
-            ]
-            
-            # Cria dados para tabela vertical
-            vertical_data = {}
-            for i, pred in enumerate(st.session_state.predictions):
-                pred_date = datetime.fromisoformat(pred["timestamp"])
-                col_name = f"Predição {i + 1}"
-                
-                vertical_data[col_name] = [
-                    pred_date.strftime("%d/%m/%Y %H:%M"),
-                    f"{pred['result']['prediction']:.1%}",
-                    pred["result"]["risk_level"],
-                    f"{pred['patient_data']['hr']} bpm",
-                    f"{pred['patient_data']['o2sat']}%",
-                    f"{pred['patient_data']['temp']:.1f}°C",
-                    f"{pred['patient_data']['sbp']} mmHg"
-                ]
-            
-            # Cria DataFrame vertical
-            vertical_df = pd.DataFrame(vertical_data, index=metrics)
-            
-                         # Exibe a tabela vertical
-            st.dataframe(
-                vertical_df,
-                use_container_width=True,
-                height=500,  # Aumentado de 400 para 500
-                column_config={
-                    col: st.column_config.TextColumn(col, width="medium") 
-                    for col in vertical_data.keys()
-                }
-            )
+        # Janela de tempo (vale para a tabela e para o gráfico) e paginação
+        col_window, col_page_size, col_page = st.columns(3)
+        window_name = col_window.selectbox("Janela de tempo", list(HISTORY_WINDOWS), key="history_window")
+        window = HISTORY_WINDOWS[window_name]
+        if window is None:
+            window_start = 0
+        else:
+            # Arredonda ao minuto para que a janela não mude a cada rerun
+            since = datetime.now().replace(second=0, microsecond=0) - window
+            window_start = history.position_at(since)
+        window_count = total_predictions - window_start
+        
+        page_sizes = sorted({10, 25, HISTORY_PAGE_SIZE, 100})
+        page_size = col_page_size.selectbox(
+            "Predições por página", page_sizes,
+            index=page_sizes.index(HISTORY_PAGE_SIZE), key="history_page_size"
+        )
+        page_count = max((window_count + page_size - 1) // page_size, 1)
+        page = col_page.number_input("Página", min_value=1, max_value=page_count, value=1, key="history_page")
         
+        # Outra sessão pode gravar entre o resumo e a busca da janela: com a
+        # janela vazia, `window_count` chega a ficar negativo
+        if window_count <= 0:
+            st.info("Nenhuma predição na janela de tempo selecionada.")
+        else:
+            show_history_window(history, total_predictions, window_start, window_count, page, page_size, page_count)
+
         st.markdown("---")
+        show_patient_trajectories()
 
-        # Gráfico de evolução temporal das predições
-        st.subheader(f"📈 Evolução das Predições ao Longo do Tempo ({len(st.session_state.predictions)} predições)")
+        # Estatísticas resumidas
+        st.subheader("📊 Estatísticas das Predições")
+        col_stats1, col_stats2, col_stats3 = st.columns(3)
         
-        if st.session_state.predictions:
-            
-            # Prepara dados para o gráfico
-            pred_dates = []
-            pred_probabilities = []
-            pred_risks = []
-            
-            for pred in st.session_state.predictions:
-                # Converte timestamp para datetime
-                pred_date = datetime.fromisoformat(pred["timestamp"])
-                pred_dates.append(pred_date)
-                 
-                # Extrai probabilidade (mantém como decimal 0-1)
-                prob = pred["result"]["prediction"]
-                pred_probabilities.append(prob)  # Mantém como decimal
-                
-                # Mapeia nível de risco para cores - lógica mais robusta
-                risk_level = pred["result"]["risk_level"]
-                
-                # Primeiro tenta mapear baseado na probabilidade (mais confiável)
-                if prob >= 0.6:
-                    pred_risks.append("Alto")
-                elif prob >= 0.3:
-                    pred_risks.append("Moderado")
-                else:
-                    pred_risks.append("Baixo")
-                
-                # Se risk_level for string, tenta usar ele também para validação
-                if isinstance(risk_level, str):
-                    risk_text = risk_level.lower()
-                    if any(word in risk_text for word in ["alto", "elevado", "high", "severe"]):
-                        # Se o texto indica alto risco mas a probabilidade é baixa, pode ser um erro
-                        if prob < 0.3:
-                            st.warning(f"⚠️ Inconsistência detectada: Probabilidade {prob:.1%} mas nível de risco '{risk_level}'")
-                        pred_risks[-1] = "Alto"  # Força o nível alto
-                    elif any(word in risk_text for word in ["moderado", "moderate", "médio", "medium"]):
-                        if prob < 0.2 or prob > 0.7:
-                            st.warning(f"⚠️ Inconsistência detectada: Probabilidade {prob:.1%} mas nível de risco '{risk_level}'")
-                        pred_risks[-1] = "Moderado"
-                    elif any(word in risk_text for word in ["baixo", "low", "baixo risco"]):
-                        if prob > 0.5:
-                            st.warning(f"⚠️ Inconsistência detectada: Probabilidade {prob:.1%} mas nível de risco '{risk_level}'")
-                        pred_risks[-1] = "Baixo"
-            
-                         # Cria DataFrame para o gráfico
-            chart_data = pd.DataFrame({
-                'Data/Hora': pred_dates,
-                'Probabilidade': pred_probabilities,
-                'Nível de Risco': pred_risks
-            })
-            
-                         # Gráfico de linha com pontos
-            fig = px.line(
-                chart_data,
-                x='Data/Hora',
-                y='Probabilidade',
-                title="Evolução da Probabilidade de Sepse ao Longo do Tempo",
-                labels={
-                    "Data/Hora": "Data e Hora da Predição",
-                    "Probabilidade": "Probabilidade de Sepse (0-1)"
-                },
-                markers=True,  # Adiciona pontos nos dados
-                line_shape='linear'
+        with col_stats1:
+            st.metric(
+                "Total de Predições",
+                total_predictions,
+                help="Número total de avaliações realizadas"
             )
-            
-                         # Adiciona pontos coloridos por nível de risco
-            fig.add_scatter(
-                x=chart_data['Data/Hora'],
-                y=chart_data['Probabilidade'],
-                mode='markers',
-                marker=dict(
-                    size=10,
-                    color=[{'Alto': '#ef5350', 'Moderado': '#fbc02d', 'Baixo': '#66bb6a'}[risk] for risk in pred_risks]
-                ),
-                name='Nível de Risco',
-                showlegend=True
+        
+        with col_stats2:
+            avg_prob = summary["mean_probability"]
+            st.metric(
+                "Probabilidade Média",
+                f"{avg_prob:.1f}%",
+                help="Probabilidade média de todas as predições"
             )
-            
-            # Configurações do gráfico com escala ajustada
-             # Se todos os valores forem 0, ajusta a escala para mostrar melhor os dados
-            min_prob = min(pred_probabilities) if pred_probabilities else 0
-            max_prob = max(pred_probabilities) if pred_probabilities else 1
-             
-             # Ajusta a escala do eixo Y baseado nos dados reais (0-1)
-             # Sempre inclui espaço para as linhas de referência importantes
-            if min_prob == 0 and max_prob == 0:
-                y_range = [0, 0.1]  # Escala de 0 a 0.1 para valores muito baixos
-            elif max_prob < 0.1:
-                y_range = [0, max(0.1, max_prob * 1.2)]  # Escala proporcional para valores baixos
-            elif max_prob < 0.3:
-                y_range = [0, 0.4]  # Escala que inclui risco moderado
-            elif max_prob < 0.6:
-                y_range = [0, 0.7]  # Escala que inclui risco alto
-            else:
-                y_range = [0, 1]  # Escala padrão de 0 a 1
-            
-                fig.update_layout(
-                height=500,
-                xaxis_title="Data e Hora da Predição",
-                yaxis_title="Probabilidade de Sepse (0-1)",
-                yaxis=dict(range=y_range),
-                hovermode='x unified',
-                showlegend=True
+        
+        with col_stats3:
+            high_risk_count = summary["risks"]["Alto"]
+            st.metric(
+                "Predições de Alto Risco",
+                high_risk_count,
+                help="Número de predições com risco alto"
             )
-            
-            # Adiciona linhas de referência para níveis de risco
-            # Linha de risco moderado (sempre visível se a escala permitir)
-            if y_range[1] >= 0.3:
-                fig.add_hline(y=0.3, line_dash="dash", line_color="orange", 
-                             annotation_text="Risco Moderado (≥0.3)", annotation_position="top right")
-            elif y_range[1] >= 0.2:  # Se a escala for menor, mostra em posição ajustada
-                fig.add_hline(y=0.3, line_dash="dash", line_color="orange", 
-                             annotation_text="Risco Moderado (≥0.3)", annotation_position="top right")
-            
-            # Linha de risco alto (sempre visível se a escala permitir)
-            if y_range[1] >= 0.6:
-                fig.add_hline(y=0.6, line_dash="dash", line_color="red", 
-                             annotation_text="Risco Alto (≥0.6)", annotation_position="top right")
-            elif y_range[1] >= 0.4:  # Se a escala for menor, mostra em posição ajustada
-                fig.add_hline(y=0.6, line_dash="dash", line_color="red", 
-                             annotation_text="Risco Alto (≥0.6)", annotation_position="top right")
-            
-            # Linha de risco baixo (sempre visível)
-            fig.add_hline(y=0.05, line_dash="dash", line_color="green", 
-                         annotation_text="Risco Baixo (<0.05)", annotation_position="top right")
-            
-            # Exibe o gráfico
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Estatísticas resumidas
-            st.subheader("📊 Estatísticas das Predições")
-            col_stats1, col_stats2, col_stats3 = st.columns(3)
-            
-            with col_stats1:
-                st.metric(
-                    "Total de Predições",
-                    len(st.session_state.predictions),
-                    help="Número total de avaliações realizadas"
-                )
-            
-            with col_stats2:
-                avg_prob = sum(pred_probabilities) / len(pred_probabilities)
-                st.metric(
-                    "Probabilidade Média",
-                    f"{avg_prob:.1f}%",
-                    help="Probabilidade média de todas as predições"
-                )
-            
-            with col_stats3:
-                high_risk_count = sum(1 for risk in pred_risks if risk == "Alto")
-                st.metric(
-                    "Predições de Alto Risco",
-                    high_risk_count,
-                    help="Número de predições com risco alto"
-                )
     else:
         st.info("📝 Nenhuma predição realizada ainda. Use a aba 'Predição' para começar.")
 
+def build_batch_scores(valid_df):
+    """SIRS, qSOFA e NEWS2 de todo o lote, calculados de uma vez sobre as colunas"""
+    import pandas as pd
+
+    scores = score_arrays(valid_df)
+    return pd.DataFrame({
+        "SIRS": scores["sirs"],
+        "qSOFA": scores["qsofa"],
+        "NEWS2": scores["news2"],
+        "Risco NEWS2": pd.Categorical.from_codes(scores["news2_risk"], NEWS2_RISKS),
+        "Alerta Local": scores["alert"],
+    }, index=valid_df.index)
+
+def build_batch_results(valid_df, outcomes, scores_df=None):
+    """Junta os dados do lote (e os escores locais) às respostas já recebidas, na ordem de chegada"""
+    results_df = valid_df.loc[list(outcomes)].copy()
+    results_df.insert(0, "Linha", results_df.index + 1)
+    if scores_df is not None:
+        results_df = results_df.join(scores_df)
+    results_df["Probabilidade"] = [outcomes[index][0] for index in outcomes]
+    results_df["Nível de Risco"] = [outcomes[index][1] for index in outcomes]
+    results_df["Status"] = [outcomes[index][2] for index in outcomes]
+    return results_df
+
+def show_batch_page():
+    """Renderiza a página de predição em lote a partir de um arquivo"""
+    st.header("📁 Predição em Lote")
+    st.markdown(
+        "Envie um arquivo **CSV** ou **Parquet** com uma linha por paciente e as colunas "
+        "`hr, o2sat, temp, sbp, dbp, resp, age, gender, unit1, unit2, hosp_adm_time, iculos`. "
+        "A coluna `map` é opcional e, se ausente, é calculada a partir de `sbp` e `dbp`."
+    )
+
+    uploaded_file = st.file_uploader("Arquivo de pacientes", type=["csv", "parquet"])
+    if uploaded_file is None:
+        return
+
+    try:
+        valid_df, invalid_df = prepare_batch(read_patient_file(uploaded_file))
+    except Exception as e:
+        st.error(f"❌ Não foi possível ler o arquivo: {e}")
+        return
+
+    scores_df = build_batch_scores(valid_df) if FALLBACK_SCORES_ENABLED else None
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Pacientes Válidos", len(valid_df))
+    col2.metric("Linhas Rejeitadas", len(invalid_df))
+    if scores_df is not None:
+        col3.metric(
+            "Alerta pelos Escores Locais",
+            int(scores_df["Alerta Local"].sum()),
+            help="≥ 2 critérios de SIRS ou de qSOFA, ou NEWS2 ≥ 5. Calculado antes do envio à API."
+        )
+
+    if not invalid_df.empty:
+        with st.expander("Linhas rejeitadas"):
+            st.dataframe(invalid_df, use_container_width=True)
+
+    show_backpressure_warning(BULK)
+    batch_key = (uploaded_file.name, uploaded_file.size)
+    _, col_button, _ = st.columns([2, 3, 2])
+    if col_button.button("🔬 Avaliar Lote", type="primary", disabled=valid_df.empty):
+        progress = st.progress(0.0, text="Enviando pacientes para o modelo preditivo...")
+        table = st.empty()
+        outcomes = {}
+
+        def show_chunk(chunk):
+            for index, success, result in chunk:
+                if success:
+                    outcomes[index] = (result["prediction"], result["risk_level"], "Processado")
+                else:
+                    outcomes[index] = (None, None, f"Erro: {result.get('error', 'Erro desconhecido')}")
+
+            progress.progress(len(outcomes) / len(valid_df), text=f"{len(outcomes)} de {len(valid_df)} pacientes avaliados")
+            table.dataframe(build_batch_results(valid_df, outcomes, scores_df), use_container_width=True, hide_index=True)
+
+        score_batch(
+            valid_df, get_scoring_engine(), show_chunk, BATCH_CHUNK_SIZE, BATCH_MAX_IN_FLIGHT,
+            session=current_session_id()
+        )
+
+        results_df = build_batch_results(valid_df, outcomes, scores_df).sort_values("Linha")
+        st.session_state.batch_result = (batch_key, results_df)
+        progress.empty()
+        table.empty()
+
+    batch_result = st.session_state.get("batch_result")
+    if batch_result is None or batch_result[0] != batch_key:
+        return
+
+    results_df = batch_result[1]
+    st.subheader("📋 Resultado do Lote")
+    probabilities = results_df["Probabilidade"].dropna()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Alto Risco", int((probabilities >= 0.6).sum()))
+    col2.metric("Risco Moderado", int(((probabilities >= 0.3) & (probabilities < 0.6)).sum()))
+    col3.metric("Baixo Risco", int((probabilities < 0.3).sum()))
+
+    st.dataframe(
+        results_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Probabilidade": st.column_config.ProgressColumn(
+                "Probabilidade", format="%.2f", min_value=0, max_value=1
+            )
+        }
+    )
+    st.download_button(
+        "⬇️ Baixar Resultados (CSV)",
+        results_df.to_csv(index=False).encode("utf-8"),
+        file_name="sepsis_sentinel_lote.csv",
+        mime="text/csv"
+    )
+
+RISK_ICONS = {"Alto": "🔴", "Moderado": "🟡", "Baixo": "🟢"}
+
+def render_bed_card(bed):
+    """Renderiza o cartão de um leito a partir do snapshot do monitor"""
+    st.markdown(f"**🛏️ {bed['bed']}**")
+
+    result = bed["result"]
+    if result is None:
+        st.metric("Probabilidade", "—")
+        st.caption(bed["error"] or "Aguardando dados completos para a predição")
+    else:
+        st.metric(
+            "Probabilidade",
+            f"{result['prediction']:.1%}",
+            f"{RISK_ICONS[bed['risk']]} {bed['risk']}",
+            delta_color="off"
+        )
+        if bed["error"]:
+            st.caption(f"⚠️ Última repredição falhou: {bed['error']}")
+
+    vitals, trends = bed["vitals"], bed["trends"]
+    units = {"hr": "bpm", "o2sat": "%", "temp": "°C", "map": "mmHg", "resp": "irpm"}
+    labels = {"hr": "FC", "o2sat": "SpO2", "temp": "Temp", "map": "PAM", "resp": "FR"}
+    parts = []
+    for field, unit in units.items():
+        if field not in vitals:
+            continue
+        trend = trends.get(field, 0)
+        arrow = "↑" if trend > 0 else "↓" if trend < 0 else "→"
+        parts.append(f"{labels[field]} {vitals[field]:g} {unit} {arrow}")
+    st.caption(" · ".join(parts))
+    st.caption(f"NEWS2 local: {bed['news2']} ({bed['news2_risk']})")
+
+    updated = bed["updated_at"].strftime("%H:%M:%S") if bed["updated_at"] else "—"
+    scored = bed["scored_at"].strftime("%H:%M:%S") if bed["scored_at"] else "—"
+    st.caption(f"Leitura: {updated} · Predição: {scored} · Janela: {bed['readings']} leituras")
+
+def show_monitor_page():
+    """
+    Painel de leitos alimentado pelo monitor em segundo plano.
+
+    Com a atualização automática ligada, o script permanece nesta função por
+    até MONITOR_RERUN_INTERVAL segundos e reescreve apenas os cartões dos
+    leitos que mudaram, em vez de reexecutar o app inteiro a cada intervalo.
+    Depois disso (ou quando surge um leito novo) a função retorna pedindo um
+    rerun, feito no fim do script, para que o rodapé e a medição da execução
+    também rodem nesta visão.
+    """
+    st.header("📡 Monitoramento de Leitos")
+    st.markdown(
+        f"Leituras de sinais vitais lidas de `{MONITOR_FEED_PATH}` (uma linha JSON por leitura, "
+        f"com o leito em `bed`). Cada leito é repredito quando algum sinal muda de forma relevante, "
+        f"no máximo uma vez a cada {MONITOR_DEBOUNCE:g}s."
+    )
+
+    monitor = get_bed_monitor()
+    auto_refresh = st.toggle("Atualização automática", value=True, key="monitor_auto_refresh")
+
+    beds = monitor.beds()
+    if not beds:
+        st.info("📭 Nenhuma leitura recebida ainda.")
+    columns_per_row = 3
+    cards = {}
+    for row_start in range(0, len(beds), columns_per_row):
+        columns = st.columns(columns_per_row)
+        for column, bed in zip(columns, beds[row_start:row_start + columns_per_row]):
+            cards[bed] = column.empty()
+    stats_placeholder = st.empty()
+
+    rendered = {}
+    refresh_until = time.monotonic() + MONITOR_RERUN_INTERVAL
+    while True:
+        snapshot = monitor.snapshot()
+        # Leitos novos mudam a grade e exigem reexecutar o app inteiro
+        if [bed["bed"] for bed in snapshot] != beds:
+            st.session_state.rerun_requested = True
+            return
+
+        for bed in snapshot:
+            if rendered.get(bed["bed"]) != bed["version"]:
+                with cards[bed["bed"]].container():
+                    render_bed_card(bed)
+                rendered[bed["bed"]] = bed["version"]
+
+        stats = monitor.stats()
+        stats_placeholder.caption(
+            f"{stats['beds']} leitos · {stats['updates']} leituras · {stats['scores']} predições · "
+            f"{stats['skipped']} sem mudança relevante · {stats['debounced']} adiadas · "
+            f"{stats['expired']} descartadas na fila · {stats['backpressure']} recusadas (fila cheia) · "
+            f"{stats['failures']} falhas · "
+            f"{stats['invalid_lines']} linhas inválidas"
+        )
+
+        if not auto_refresh:
+            break
+        if time.monotonic() + MONITOR_REFRESH_INTERVAL > refresh_until:
+            st.session_state.rerun_requested = True
+            break
+        time.sleep(MONITOR_REFRESH_INTERVAL)
+
+def list_active_sessions():
+    """
+    (id, execuções do script, estado) de cada sessão ativa neste processo,
+    ou None quando o app não está rodando no servidor do Streamlit
+    """
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return None
+    # Atributo interno do Runtime; ausente no AppTest e em versões diferentes do Streamlit
+    session_manager = getattr(Runtime.instance(), "_session_mgr", None)
+    if session_manager is None or not hasattr(session_manager, "list_active_sessions"):
+        return None
+    sessions = session_manager.list_active_sessions()
+    return [(info.session.id, info.script_run_count, info.session.session_state) for info in sessions]
+
+CIRCUIT_STATE_LABELS = {"closed": "🟢 Fechado", "open": "🔴 Aberto", "half_open": "🟡 Meio aberto"}
+
+def format_seconds(value):
+    """Duração em ms para as tabelas do diagnóstico"""
+    return "—" if value is None else f"{value * 1000:.1f} ms"
+
+def show_histogram_family(snapshots, names=None):
+    """Resumo e buckets de cada histograma (sem amostras individuais)"""
+    import pandas as pd
+
+    names = names or list(snapshots)
+    rows = {}
+    for name in names:
+        snapshot = snapshots.get(name)
+        if snapshot is None:
+            continue
+        rows[name] = {
+            "Chamadas": snapshot["count"],
+            "Taxa de erro": f"{snapshot['error_rate']:.1%}",
+            "Média": format_seconds(snapshot["mean_s"] if snapshot["count"] else None),
+            "p50": format_seconds(snapshot["p50_s"]),
+            "p95": format_seconds(snapshot["p95_s"]),
+            "p99": format_seconds(snapshot["p99_s"]),
+            "Máximo": format_seconds(snapshot["max_s"] if snapshot["count"] else None),
+        }
+    if not rows:
+        st.info("Nenhuma medição ainda.")
+        return
+    st.dataframe(pd.DataFrame.from_dict(rows, orient="index"), use_container_width=True)
+
+    first = snapshots[next(iter(rows))]
+    labels = [f"≤{bound * 1000:g} ms" for bound in first["bounds"]] + ["> " + f"{first['bounds'][-1] * 1000:g} ms"]
+    buckets = pd.DataFrame(
+        {name: snapshots[name]["counts"] for name in rows},
+        index=pd.CategoricalIndex(labels, categories=labels, ordered=True)
+    )
+    st.bar_chart(buckets)
+
+def show_diagnostics_page():
+    """
+    Métricas do próprio processo: latência da API, reruns, sessões e caches.
+
+    Lê apenas contadores e histogramas já agregados (custo proporcional ao
+    número de buckets, não de requisições) e não é contada nos reruns.
+    """
+    import pandas as pd
+
+    st.header("🩻 Diagnóstico")
+
+    if DIAGNOSTICS_TOKEN and not st.session_state.get("diagnostics_unlocked"):
+        token = st.text_input("Token de acesso", type="password", key="diagnostics_token")
+        if not token:
+            st.info("🔒 Informe o token definido em DIAGNOSTICS_TOKEN.")
+            return
+        if not hmac.compare_digest(token.encode("utf-8"), DIAGNOSTICS_TOKEN.encode("utf-8")):
+            st.error("Token inválido.")
+            return
+        st.session_state.diagnostics_unlocked = True
+
+    client = get_api_client()
+    st.subheader("🌐 Latência da API")
+    show_histogram_family(client.latency_histograms(), ["/predict", "/health"])
+
+    st.subheader("🔁 Duração dos Reruns")
+    show_histogram_family(get_rerun_histograms().snapshot())
+
+    st.subheader("👥 Sessões Ativas")
+    sessions = list_active_sessions()
+    if sessions is None:
+        st.caption("Fora do servidor do Streamlit: exibindo apenas a sessão atual.")
+        sessions = [("atual", None, st.session_state)]
+    rows = []
+    for session_id, script_runs, state in sessions:
+        try:
+            values = state.filtered_state if hasattr(state, "filtered_state") else state.to_dict()
+        except (RuntimeError, KeyError):
+            # O estado de outra sessão mudou durante a leitura
+            continue
+        rows.append({
+            "Sessão": session_id[:8],
+            "Execuções do script": script_runs,
+            "Chaves": len(values),
+            "Memória estimada (KB)": round(sum(estimate_size(value) for value in values.values()) / 1024, 1),
+        })
+    st.metric("Sessões ativas", len(rows))
+    if rows:
+        st.dataframe(
+            pd.DataFrame(rows).sort_values("Memória estimada (KB)", ascending=False),
+            use_container_width=True,
+            hide_index=True
+        )
+
+    st.subheader("🗃️ Caches e Conexões")
+    cache_stats = get_prediction_cache().stats()
+    pool_stats = client.pool_stats()
+    col_hits, col_size, col_pool = st.columns(3)
+    col_hits.metric("Acertos do cache de predições", f"{cache_stats['hit_rate']:.1%}",
+                    help=f"{cache_stats['hits']} acertos, {cache_stats['misses']} falhas")
+    col_size.metric("Entradas em cache", cache_stats["size"],
+                    help=f"{cache_stats['evictions']} removidas por LRU, {cache_stats['expirations']} expiradas")
+    col_pool.metric("Conexões reaproveitadas", pool_stats["pool_hits"],
+                    help=f"{pool_stats['connections_opened']} conexões abertas para {pool_stats['requests']} requisições")
+
+    engine_stats = get_scoring_engine().stats()
+    breaker_stats = get_circuit_breaker().stats()
+    col_calls, col_coalesced, col_timeouts, col_circuit = st.columns(4)
+    col_calls.metric("Chamadas a /predict", engine_stats["api_calls"],
+                     help=f"{engine_stats['requests']} predições pedidas, {engine_stats['cache_hits']} respondidas pelo cache")
+    col_coalesced.metric("Chamadas compartilhadas", engine_stats["coalesced"],
+                         help=f"{engine_stats['coalesced_rate']:.1%} das chamadas aproveitaram uma requisição idêntica "
+                              f"em andamento; {engine_stats['in_flight']} em andamento agora")
+    col_timeouts.metric("Tempo limite excedido", engine_stats["timeouts"],
+                        help=f"{engine_stats['abandoned']} requisições canceladas na fila, "
+                             f"{engine_stats['failures']} respostas com erro")
+    col_circuit.metric("Circuito da API", CIRCUIT_STATE_LABELS[breaker_stats["state"]],
+                       help=f"Aberto {breaker_stats['opened']} vez(es), {breaker_stats['rejected']} predições recusadas; "
+                            f"janela atual: {breaker_stats['failure_rate']:.0%} de falhas e "
+                            f"{breaker_stats['slow_call_rate']:.0%} lentas em {breaker_stats['window_calls']} chamadas")
+
+    worker_stats = get_worker_pool().stats()
+    col_running, col_queued, col_sessions, col_rejected = st.columns(4)
+    col_running.metric("Threads ocupadas", f"{worker_stats['running']}/{SCORING_MAX_CONCURRENCY}",
+                       help=f"{worker_stats['workers']} threads criadas; {worker_stats['completed']} chamadas concluídas")
+    col_queued.metric("Chamadas na fila", worker_stats["queued"],
+                      help=f"Ocupação {worker_stats['pressure']:.0%} de {API_POOL_QUEUE_SIZE}; "
+                           f"máximo observado: {worker_stats['max_queued']}")
+    col_sessions.metric("Sessões aguardando", worker_stats["waiting_sessions"],
+                        help="Filas com chamadas pendentes, atendidas em rodízio (inclui saúde e monitoramento)")
+    col_rejected.metric("Chamadas recusadas", worker_stats["rejected"],
+                        help=f"Fila cheia ou cota de {API_POOL_SESSION_LIMIT} por sessão atingida; "
+                             f"{worker_stats['cancelled']} canceladas antes de começar e "
+                             f"{worker_stats['expired']} descartadas por prazo vencido")
+    show_priority_classes(worker_stats["classes"])
+
+PRIORITY_LABELS = {INTERACTIVE: "Interativa", MONITORING: "Monitoramento", BULK: "Lote"}
+
+def show_priority_classes(classes):
+    """Fila, execução, descartes e espera na fila de cada classe de prioridade do pool"""
+    import pandas as pd
+
+    rows = {}
+    for priority in PRIORITIES:
+        cls = classes[priority]
+        rows[PRIORITY_LABELS[priority]] = {
+            "Peso": cls["weight"],
+            "Na fila": cls["queued"],
+            "Em execução": cls["running"],
+            "Concluídas": cls["completed"],
+            "Descartadas (prazo)": cls["expired"],
+            "Recusadas": cls["rejected"],
+            "Espera p50": format_seconds(cls["wait"]["p50_s"]),
+            "Espera p99": format_seconds(cls["wait"]["p99_s"]),
+        }
+    st.dataframe(pd.DataFrame.from_dict(rows, orient="index"), use_container_width=True)
+    st.caption(
+        f"Classes atendidas por fila justa ponderada; o lote usa no máximo "
+        f"{max(1, SCORING_MAX_CONCURRENCY - API_POOL_RESERVED_WORKERS)} das {SCORING_MAX_CONCURRENCY} threads."
+    )
+
+def show_prediction_view():
+    """Renderiza o formulário ou o resultado, conforme a etapa atual"""
+    if st.session_state.page == 'form':
+        show_form_page()
+    else:
+        show_result_page()
+
 def show_about_page():
     """Renderiza a página sobre o sistema"""
     st.header("ℹ️ Sobre o Sistema")
@@ -754,6 +1699,14 @@ if 'page' not in st.session_state:
     st.session_state.page = 'form'
 if 'result' not in st.session_state:
     st.session_state.result = None
+if 'prediction_error' not in st.session_state:
+    st.session_state.prediction_error = None
+if 'pending_predictions' not in st.session_state:
+    st.session_state.pending_predictions = []
+
+# Predições enviadas em reruns anteriores que já terminaram entram no histórico
+# mesmo que o usuário tenha saído da página de resultado
+collect_pending_predictions()
 
 # Cabeçalho e Disclaimer (aparecem em todas as "páginas")
 st.title("🏥 Sepsis Sentinel AI")
@@ -761,35 +1714,88 @@ st.markdown("#### **Sistema Inteligente de Detecção Precoce de Sepse**")
 #st.markdown("*Plataforma de Apoio à Decisão Clínica com Machine Learning*")
 st.markdown("---")
 
-# Verificação de saúde da API (apenas para logs)
-api_healthy, health_data = check_api_health()
+# Verificação de saúde da API (apenas para logs). Lê o último estado
+# conhecido; a consulta à API acontece em segundo plano.
+health_monitor = get_health_monitor()
+api_healthy, health_data = health_monitor.status()
 
-# Log da verificação (não exibido na interface)
-if not api_healthy:
+# Predições em cache deixam de valer quando a API troca a versão do modelo
+if health_data:
+    get_prediction_cache().sync_model_version(health_data.get("model_version"))
 
-    print("❌ API Desconectada - Verifique se o backend está rodando")
+# Log da verificação (não exibido na interface)
+if not api_healthy and health_monitor.age() is not None:
+    logger.warning("API desconectada - verifique se o backend está rodando em %s", API_BASE_URL)
+
+# Com o circuito aberto as predições falham na hora: o modo degradado é avisado em todas as visões
+circuit_breaker = get_circuit_breaker()
+if circuit_breaker.state == OPEN:
+    st.error(
+        f"🔌 **Modo degradado:** a API de predição está falhando ou lenta. Novas predições não são "
+        f"enviadas por {circuit_breaker.retry_in():.0f}s"
+        + (" e os escores SIRS/qSOFA/NEWS2 locais são exibidos no lugar." if FALLBACK_SCORES_ENABLED else ".")
+    )
 
 st.warning("""
 **AVISO IMPORTANTE:** Esta ferramenta é um protótipo e **não substitui uma avaliação médica profissional.** 
 Os resultados são preditivos e devem ser interpretados por um profissional de saúde.
 """)
 
-# Navegação por tabs
-tab1, tab2, tab3 = st.tabs(["🔍 Predição", "📊 Histórico", "ℹ️ Sobre"])
-
-with tab1:
-    if st.session_state.page == 'form':
-        show_form_page()
-    else:
-        show_result_page()
+# Navegação entre as visões. Diferente de st.tabs, que executa todas as abas
+# a cada rerun, apenas a visão ativa é executada.
+views = {
+    "🔍 Predição": show_prediction_view,
+    "📁 Lote": show_batch_page,
+    "📡 Monitoramento": show_monitor_page,
+    "📊 Histórico": show_history_page,
+    "ℹ️ Sobre": show_about_page,
+}
+DIAGNOSTICS_VIEW = "🩻 Diagnóstico"
+if DIAGNOSTICS_ENABLED:
+    views[DIAGNOSTICS_VIEW] = show_diagnostics_page
+# O rótulo "Navegação" também seleciona o estilo de abas no CSS do topo
+active_view = st.radio(
+    "Navegação",
+    list(views),
+    horizontal=True,
+    key="active_view",
+    label_visibility="collapsed"
+)
+with span(f"page.{views[active_view].__name__}"):
+    views[active_view]()
 
-with tab2:
-    show_history_page()
+# Spans de tempo do processo, apenas com DEBUG ou LOG_LEVEL=DEBUG
+if tracer.enabled:
+    with st.expander("🔧 Rastreamento (debug)"):
+        import pandas as pd
 
-with tab3:
-    show_about_page()
+        spans_summary = tracer.summary()
+        if spans_summary:
+            st.dataframe(
+                pd.DataFrame.from_dict(spans_summary, orient="index")[
+                    ["count", "errors", "mean_s", "p50_s", "p95_s", "p99_s", "max_s"]
+                ],
+                use_container_width=True
+            )
+        col_prometheus, col_jsonl = st.columns(2)
+        col_prometheus.download_button(
+            "⬇️ Prometheus", tracer.to_prometheus(), file_name="sepsis_spans.prom", mime="text/plain"
+        )
+        col_jsonl.download_button(
+            "⬇️ JSONL", tracer.to_jsonl(), file_name="sepsis_spans.jsonl", mime="application/x-ndjson"
+        )
 
 # Rodapé
 st.markdown("<br><br><br>", unsafe_allow_html=True)
 st.markdown("---")
-st.markdown("Desenvolvido com base no estudo 'Aplicação do Método CRISP-DM para Diagnóstico Hospitalar Precoce de Sepse'.")
\ No newline at end of file
+st.markdown("Desenvolvido com base no estudo 'Aplicação do Método CRISP-DM para Diagnóstico Hospitalar Precoce de Sepse'.")
+
+# Duração desta execução por visão. A visão de diagnóstico não entra na
+# conta, para que consultá-la não altere os números que ela exibe.
+if active_view != DIAGNOSTICS_VIEW:
+    get_rerun_histograms().observe(active_view, time.perf_counter() - rerun_started)
+
+# Rerun pedido por uma visão (painel de monitoramento), feito só agora para
+# que o restante do script tenha rodado
+if st.session_state.pop("rerun_requested", False):
+    st.rerun()
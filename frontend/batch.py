@@ -0,0 +1,113 @@
+"""
+Predição em lote: leitura, validação e envio concorrente de pacientes
+"""
+
+# Campos enviados à API, na mesma ordem do formulário de predição
+PATIENT_FIELDS = [
+    "hr", "o2sat", "temp", "sbp", "dbp", "map", "resp", "age",
+    "gender", "unit1", "unit2", "hosp_adm_time", "iculos"
+]
+
+FLOAT_FIELDS = ["temp", "map"]
+INT_FIELDS = [field for field in PATIENT_FIELDS if field not in FLOAT_FIELDS]
+
+# Limites aceitos pelo formulário (mínimo, máximo); None = sem limite
+FIELD_LIMITS = {
+    "hr": (40, 200),
+    "o2sat": (0, 100),
+    "temp": (35.0, 42.0),
+    "sbp": (0, 300),
+    "dbp": (0, 200),
+    "map": (0, 300),
+    "resp": (0, 100),
+    "age": (0, 150),
+    "gender": (0, 1),
+    "unit1": (0, 1),
+    "unit2": (0, 1),
+    "hosp_adm_time": (0, None),
+    "iculos": (0, None),
+}
+
+
+def read_patient_file(uploaded_file):
+    """Lê um arquivo CSV ou Parquet enviado pelo usuário"""
+    import pandas as pd
+
+    name = getattr(uploaded_file, "name", str(uploaded_file)).lower()
+    if name.endswith((".parquet", ".pq")):
+        return pd.read_parquet(uploaded_file)
+    return pd.read_csv(uploaded_file)
+
+
+def prepare_batch(df):
+    """
+    Valida o lote e calcula a MAP quando ausente.
+
+    Retorna (válidos, inválidos): `válidos` contém apenas os campos da API,
+    já com os tipos corretos; `inválidos` traz as linhas rejeitadas com a
+    coluna "Motivo". Levanta ValueError se faltarem colunas obrigatórias.
+    """
+    import pandas as pd
+
+    df = df.rename(columns=lambda col: str(col).strip().lower())
+
+    required = [field for field in PATIENT_FIELDS if field != "map"]
+    missing = [field for field in required if field not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas ausentes no arquivo: {', '.join(missing)}")
+
+    data = pd.DataFrame(index=df.index)
+    for field in PATIENT_FIELDS:
+        if field in df.columns:
+            data[field] = pd.to_numeric(df[field], errors="coerce")
+        else:
+            data[field] = float("nan")
+
+    # MAP derivada da pressão sistólica e diastólica, como no formulário
+    derived_map = ((data["sbp"] + 2 * data["dbp"]) / 3).round(1)
+    data["map"] = data["map"].fillna(derived_map)
+
+    reasons = pd.Series("", index=data.index)
+    for field, (low, high) in FIELD_LIMITS.items():
+        column = data[field]
+        bad = column.isna()
+        if low is not None:
+            bad |= column < low
+        if high is not None:
+            bad |= column > high
+        reasons = reasons.mask(bad & (reasons == ""), f"{field} ausente ou fora do intervalo")
+
+    valid_mask = reasons == ""
+    valid = data[valid_mask].copy()
+    valid[INT_FIELDS] = valid[INT_FIELDS].round().astype(int)
+    valid[FLOAT_FIELDS] = valid[FLOAT_FIELDS].astype(float)
+
+    invalid = df[~valid_mask].copy()
+    invalid["Motivo"] = reasons[~valid_mask]
+    return valid, invalid
+
+
+def score_batch(valid_df, engine, on_chunk, chunk_size=50, max_in_flight=8, session=None):
+    """
+    Envia os pacientes à API pelo motor de predição, com no máximo
+    `max_in_flight` requisições simultâneas, na fila da sessão `session`.
+
+    A cada `chunk_size` respostas recebidas (e ao final), chama `on_chunk`
+    com uma lista de tuplas (índice, sucesso, resultado) na ordem em que as
+    respostas chegaram.
+    """
+    indices = list(valid_df.index)
+    completed = []
+
+    def collect(position, success, result):
+        completed.append((indices[position], success, result))
+        if len(completed) >= chunk_size:
+            on_chunk(list(completed))
+            completed.clear()
+
+    engine.score_many(
+        valid_df.to_dict("records"), on_result=collect, max_concurrency=max_in_flight, session=session
+    )
+
+    if completed:
+        on_chunk(list(completed))
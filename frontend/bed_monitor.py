@@ -0,0 +1,342 @@
+"""
+Monitoramento contínuo de leitos: leitura do fluxo de sinais vitais e repredição
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from batch import FLOAT_FIELDS, PATIENT_FIELDS
+from clinical_scores import NEWS2_RISKS, SCORE_FIELDS, score_arrays
+from history import classify_risk
+
+logger = logging.getLogger(__name__)
+
+
+# Variação mínima, em relação aos dados da última predição, para que um
+# campo justifique uma nova chamada à API. Campos ausentes daqui (idade,
+# sexo, unidade, tempos de internação) disparam a repredição a qualquer
+# mudança.
+RESCORE_DELTAS = {
+    "hr": 5,
+    "o2sat": 2,
+    "temp": 0.3,
+    "sbp": 10,
+    "dbp": 8,
+    "map": 5,
+    "resp": 3,
+}
+
+# Sinais vitais cuja tendência na janela é exibida no painel
+TREND_FIELDS = ["hr", "o2sat", "temp", "map", "resp"]
+
+
+class FileTailFeed:
+    """
+    Fonte de sinais vitais que acompanha um arquivo JSONL, como `tail -f`.
+
+    Cada linha é um objeto com o identificador do leito em "bed" e qualquer
+    subconjunto dos campos do paciente (além de "timestamp", opcional).
+    Linhas incompletas no fim do arquivo aguardam a próxima leitura; se o
+    arquivo for truncado ou substituído, a leitura recomeça do início.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.invalid_lines = 0
+        self._offset = 0
+        self._inode = None
+        self._partial = b""
+
+    def read_new(self):
+        """Retorna as atualizações gravadas desde a última leitura"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._inode = stat.st_ino
+            self._offset = 0
+            self._partial = b""
+        if stat.st_size == self._offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        self._offset += len(chunk)
+
+        lines = (self._partial + chunk).split(b"\n")
+        self._partial = lines.pop()
+
+        updates = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                update = json.loads(line)
+            except ValueError:
+                self.invalid_lines += 1
+                continue
+            if not isinstance(update, dict) or "bed" not in update:
+                self.invalid_lines += 1
+                continue
+            updates.append(update)
+        return updates
+
+
+class BedState:
+    """Estado de um leito: janela de leituras e última predição"""
+
+    def __init__(self, bed, window):
+        self.bed = str(bed)
+        self.readings = deque(maxlen=window)
+        self.vitals = {}
+        self.updated_at = None
+        self.scored_vitals = None
+        self.attempted_at = None
+        self.scored_at = None
+        self.result = None
+        self.error = None
+        self.version = 0
+        self.checked_version = None
+        self.debounced_version = None
+        self.in_flight = False
+
+
+class BedMonitor:
+    """
+    Mantém o estado de cada leito a partir de uma fonte de sinais vitais e
+    repete a predição apenas quando os dados mudam de forma relevante.
+
+    Uma thread de fundo lê a fonte a cada `poll_interval` segundos, guarda
+    as últimas `window` leituras de cada leito e chama `submit(dados)` quando
+    algum campo varia além de `RESCORE_DELTAS` desde a última predição,
+    respeitando um intervalo mínimo de `debounce` segundos entre predições
+    do mesmo leito. Assim o número de chamadas à API depende do ritmo das
+    mudanças clínicas, e não da frequência do fluxo nem de quantas sessões
+    estão olhando o painel.
+
+    `submit` devolve uma `concurrent.futures.Future` que resolve para
+    (sucesso, resultado): os leitos pendentes são enviados juntos e cada
+    resposta é incorporada quando chega, sem segurar a leitura da fonte.
+    Cada leito tem no máximo uma predição em andamento.
+    """
+
+    def __init__(self, feed, submit, window=60, debounce=10.0, poll_interval=1.0, deltas=None):
+        self.feed = feed
+        self._submit = submit
+        self.window = window
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.deltas = RESCORE_DELTAS if deltas is None else deltas
+
+        self._lock = threading.Lock()
+        self._beds = {}
+        self._thread = None
+        self._stats = {
+            "updates": 0,
+            "scores": 0,
+            "failures": 0,
+            "skipped": 0,
+            "debounced": 0,
+            "expired": 0,
+            "backpressure": 0,
+        }
+
+    def start(self):
+        """Inicia a thread de monitoramento (idempotente)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._thread = threading.Thread(target=self._run, name="sepsis-bed-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Falha no monitoramento de leitos")
+            time.sleep(self.poll_interval)
+
+    def poll(self):
+        """Lê a fonte, atualiza os leitos e envia as predições pendentes, sem esperar por elas"""
+        for update in self.feed.read_new():
+            self.apply(update)
+        for bed, patient_data in self._due():
+            try:
+                future = self._submit(patient_data)
+            except Exception as e:
+                logger.warning("Falha ao enviar a predição do leito %s: %s", bed, e)
+                self._rescore(bed, patient_data, False, {"error": str(e)})
+                continue
+            future.add_done_callback(
+                lambda done, bed=bed, patient_data=patient_data: self._collect(bed, patient_data, done)
+            )
+
+    def apply(self, update):
+        """Incorpora uma leitura (parcial ou completa) ao estado do leito"""
+        update = dict(update)
+        bed = str(update.pop("bed"))
+        timestamp = update.pop("timestamp", None)
+        try:
+            timestamp = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+        except (TypeError, ValueError):
+            timestamp = datetime.now()
+
+        values = {}
+        for field in PATIENT_FIELDS:
+            value = update.get(field)
+            if value is None:
+                continue
+            try:
+                values[field] = float(value) if field in FLOAT_FIELDS else int(round(float(value)))
+            except (TypeError, ValueError):
+                continue
+
+        with self._lock:
+            state = self._beds.get(bed)
+            if state is None:
+                state = self._beds[bed] = BedState(bed, self.window)
+            state.vitals.update(values)
+            # MAP derivada da pressão quando a leitura não a informa
+            if "map" not in values and ("sbp" in values or "dbp" in values) \
+                    and "sbp" in state.vitals and "dbp" in state.vitals:
+                state.vitals["map"] = round((state.vitals["sbp"] + 2 * state.vitals["dbp"]) / 3, 1)
+            state.readings.append((timestamp, dict(state.vitals)))
+            state.updated_at = timestamp
+            state.version += 1
+            self._stats["updates"] += 1
+
+    def _changed(self, state):
+        """Indica se algum campo variou além do limiar desde a última predição"""
+        for field in PATIENT_FIELDS:
+            delta = abs(state.vitals[field] - state.scored_vitals[field])
+            if delta >= self.deltas.get(field, 1e-9):
+                return True
+        return False
+
+    def _due(self):
+        """Leitos com dados completos que precisam de nova predição"""
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for state in self._beds.values():
+                # Cada versão do leito é avaliada uma única vez, depois que a
+                # predição em andamento (se houver) terminar
+                if state.checked_version == state.version or state.in_flight:
+                    continue
+                if any(field not in state.vitals for field in PATIENT_FIELDS):
+                    state.checked_version = state.version
+                    continue
+                if state.scored_vitals is not None and not self._changed(state):
+                    if state.scored_vitals != state.vitals:
+                        self._stats["skipped"] += 1
+                    state.checked_version = state.version
+                    continue
+                if state.attempted_at is not None and now - state.attempted_at < self.debounce:
+                    # Reavaliado nas próximas leituras da fonte, até vencer o intervalo
+                    if state.debounced_version != state.version:
+                        state.debounced_version = state.version
+                        self._stats["debounced"] += 1
+                    continue
+                state.checked_version = state.version
+                state.attempted_at = now
+                state.in_flight = True
+                due.append((state.bed, {field: state.vitals[field] for field in PATIENT_FIELDS}))
+        return due
+
+    def _collect(self, bed, patient_data, future):
+        """Callback da predição de um leito (thread do pool)"""
+        try:
+            success, result = future.result()
+        except Exception as e:
+            logger.warning("Falha na predição do leito %s: %s", bed, e)
+            success, result = False, {"error": str(e)}
+        self._rescore(bed, patient_data, success, result)
+
+    def _rescore(self, bed, patient_data, success, result):
+        """
+        Incorpora o resultado da predição de um leito. Em qualquer caso a
+        versão avança, para que o leito seja reavaliado (e, se ainda for
+        preciso, refeito) nas próximas leituras, vencido o intervalo
+        """
+        with self._lock:
+            state = self._beds[bed]
+            state.in_flight = False
+            if success:
+                state.scored_vitals = patient_data
+                state.scored_at = datetime.now()
+                state.result = result
+                state.error = None
+                self._stats["scores"] += 1
+            elif result.get("expired"):
+                # Descartada na fila por ter ficado velha; a versão nova do
+                # leito é reavaliada com os dados atuais, vencido o intervalo
+                self._stats["expired"] += 1
+            elif result.get("backpressure"):
+                # Recusada com a fila cheia; refeita como a descartada
+                self._stats["backpressure"] += 1
+            else:
+                state.error = result.get("error", "Erro desconhecido")
+                self._stats["failures"] += 1
+            state.version += 1
+
+    def beds(self):
+        """Identificadores dos leitos conhecidos, em ordem"""
+        with self._lock:
+            return sorted(self._beds)
+
+    def snapshot(self):
+        """Cópia do estado de cada leito, para renderização"""
+        with self._lock:
+            states = [self._beds[bed] for bed in sorted(self._beds)]
+            snapshot = []
+            for state in states:
+                trends = {}
+                if len(state.readings) > 1:
+                    first, last = state.readings[0][1], state.readings[-1][1]
+                    trends = {
+                        field: last[field] - first[field]
+                        for field in TREND_FIELDS if field in first and field in last
+                    }
+                risk = None
+                if state.result is not None:
+                    risk, _ = classify_risk(state.result["prediction"], state.result["risk_level"])
+                snapshot.append({
+                    "bed": state.bed,
+                    "version": state.version,
+                    "vitals": dict(state.vitals),
+                    "readings": len(state.readings),
+                    "trends": trends,
+                    "updated_at": state.updated_at,
+                    "scored_at": state.scored_at,
+                    "result": dict(state.result) if state.result else None,
+                    "risk": risk,
+                    "error": state.error,
+                })
+
+        # NEWS2 de todos os leitos em uma única chamada, com os sinais já lidos
+        # (os ausentes não pontuam); não depende da predição pela API
+        scores = score_arrays({
+            field: [bed["vitals"].get(field, float("nan")) for bed in snapshot]
+            for field in SCORE_FIELDS
+        })
+        for bed, news2, risk in zip(snapshot, scores["news2"], scores["news2_risk"]):
+            bed["news2"] = int(news2)
+            bed["news2_risk"] = NEWS2_RISKS[risk]
+        return snapshot
+
+    def stats(self):
+        """Contadores de leituras, predições e repredições evitadas"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["beds"] = len(self._beds)
+        stats["invalid_lines"] = getattr(self.feed, "invalid_lines", 0)
+        return stats
@@ -0,0 +1,134 @@
+"""
+Circuit breaker para as chamadas de predição: falha imediata enquanto a API está fora
+"""
+import threading
+import time
+from collections import deque
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Disjuntor com três estados, alimentado pelo resultado e pela duração de
+    cada chamada à API.
+
+    - Fechado: as chamadas passam. Entre as últimas `window` chamadas (com
+      pelo menos `min_calls`), se a fração de falhas atingir `failure_rate`
+      ou a de chamadas mais lentas que `slow_call_duration` atingir
+      `slow_call_rate`, o circuito abre.
+    - Aberto: `allow()` recusa tudo por `open_duration` segundos, sem
+      ocupar threads esperando o timeout de uma API fora do ar.
+    - Meio aberto: passado esse tempo, até `half_open_calls` chamadas de
+      teste são liberadas. Se todas terminarem bem, o circuito fecha; uma
+      falha (ou lentidão) o abre de novo.
+    """
+
+    def __init__(self, window=20, min_calls=5, failure_rate=0.5, slow_call_duration=5.0,
+                 slow_call_rate=0.8, open_duration=30.0, half_open_calls=1, clock=time.monotonic):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._calls = deque(maxlen=window)
+        self._opened_at = None
+        self._trials = 0
+        self._trial_successes = 0
+        self._stats = {"opened": 0, "rejected": 0}
+
+    def _transition(self, state):
+        self._state = state
+        self._calls.clear()
+        self._trials = 0
+        self._trial_successes = 0
+        if state == OPEN:
+            self._opened_at = self._clock()
+            self._stats["opened"] += 1
+
+    def _refresh(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_duration:
+            self._transition(HALF_OPEN)
+
+    @property
+    def state(self):
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def retry_in(self):
+        """Segundos até a próxima chamada de teste (0 se o circuito não estiver aberto)"""
+        with self._lock:
+            self._refresh()
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.open_duration - (self._clock() - self._opened_at))
+
+    def allow(self):
+        """
+        Indica se uma nova chamada pode ser feita: False se recusada, senão o
+        estado em que foi liberada. `HALF_OPEN` indica uma chamada de teste
+        reservada, que deve ser devolvida com `release()` se não for feita.
+        """
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return CLOSED
+            if self._state == HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return HALF_OPEN
+            self._stats["rejected"] += 1
+            return False
+
+    def release(self):
+        """Devolve um teste reservado por `allow()` (liberado em `HALF_OPEN`) cuja chamada não chegou a ser feita"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def record(self, success, duration):
+        """Registra o resultado de uma chamada liberada por `allow()`"""
+        slow = duration >= self.slow_call_duration
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if not success or slow:
+                    self._transition(OPEN)
+                    return
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self._transition(CLOSED)
+                return
+            if self._state == OPEN:
+                # Chamada iniciada antes de o circuito abrir
+                return
+
+            self._calls.append((not success, slow))
+            if len(self._calls) < self.min_calls:
+                return
+            failures = sum(failed for failed, _ in self._calls) / len(self._calls)
+            slow_calls = sum(was_slow for _, was_slow in self._calls) / len(self._calls)
+            if failures >= self.failure_rate or slow_calls >= self.slow_call_rate:
+                self._transition(OPEN)
+
+    def stats(self):
+        """Estado atual, taxas da janela e quantas vezes o circuito abriu"""
+        with self._lock:
+            self._refresh()
+            calls = list(self._calls)
+            stats = dict(self._stats)
+            stats["state"] = self._state
+            stats["retry_in_s"] = (
+                max(0.0, self.open_duration - (self._clock() - self._opened_at)) if self._state == OPEN else 0.0
+            )
+        stats["window_calls"] = len(calls)
+        stats["failure_rate"] = sum(failed for failed, _ in calls) / len(calls) if calls else 0.0
+        stats["slow_call_rate"] = sum(slow for _, slow in calls) / len(calls) if calls else 0.0
+        return stats
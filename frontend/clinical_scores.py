@@ -0,0 +1,147 @@
+"""
+Escores clínicos de alerta precoce (SIRS, qSOFA e NEWS2) calculados localmente
+
+As funções recebem valores escalares ou arrays NumPy (uma posição por
+paciente) e devolvem arrays do mesmo formato, de modo que o mesmo código
+atende o formulário, o lote enviado em arquivo e o painel de leitos sem
+laço em Python. Valores ausentes (None/NaN) não pontuam.
+
+Os escores são parciais, limitados aos campos do formulário: faltam
+leucócitos e PaCO2 no SIRS, o nível de consciência no qSOFA e no NEWS2, e
+o NEWS2 assume ar ambiente (escala 1 da SpO2). A idade é coletada, mas não
+faz parte de nenhum dos três.
+"""
+from functools import reduce
+
+import numpy as np
+
+
+# Campos do formulário usados pelos escores
+SCORE_FIELDS = ("hr", "resp", "temp", "sbp", "o2sat")
+
+SIRS_LABELS = (
+    "Temperatura > 38 °C ou < 36 °C",
+    "Frequência cardíaca > 90 bpm",
+    "Frequência respiratória > 20 rpm",
+)
+QSOFA_LABELS = (
+    "Frequência respiratória ≥ 22 rpm",
+    "Pressão sistólica ≤ 100 mmHg",
+)
+
+# Faixas do NEWS2: limites superiores (inclusivos) de cada faixa e os pontos
+# de cada uma; valores acima do último limite caem na última faixa
+NEWS2_BANDS = {
+    "resp": ((8, 11, 20, 24), (3, 1, 0, 2, 3)),
+    "o2sat": ((91, 93, 95), (3, 2, 1, 0)),
+    "sbp": ((90, 100, 110, 219), (3, 2, 1, 0, 3)),
+    "hr": ((40, 50, 90, 110, 130), (3, 1, 0, 1, 2, 3)),
+    "temp": ((35.0, 36.0, 38.0, 39.0), (3, 1, 0, 1, 2)),
+}
+NEWS2_LABELS = {
+    "resp": "Frequência respiratória",
+    "o2sat": "SpO2",
+    "sbp": "Pressão sistólica",
+    "hr": "Frequência cardíaca",
+    "temp": "Temperatura",
+}
+
+# Níveis de risco do NEWS2, na ordem dos códigos de `news2_risk`
+NEWS2_RISKS = ("Baixo", "Baixo-médio", "Médio", "Alto")
+NEWS2_RESPONSES = (
+    "Monitoramento de rotina da enfermagem.",
+    "Um parâmetro com 3 pontos: avaliação urgente pela equipe médica.",
+    "Resposta urgente: avaliação pela equipe médica e aumento da frequência de monitoramento.",
+    "Resposta de emergência: avaliação imediata por equipe de cuidados críticos.",
+)
+
+
+def _column(columns, field):
+    """Valores de um campo como float (None vira NaN), de um dict ou DataFrame"""
+    value = columns.get(field) if hasattr(columns, "get") else columns[field]
+    if value is None:
+        return np.float64(np.nan)
+    return np.asarray(value, dtype=float)
+
+
+def sirs_flags(temp, hr, resp):
+    """Critérios de SIRS atendidos, na ordem de `SIRS_LABELS`"""
+    return (temp > 38.0) | (temp < 36.0), hr > 90, resp > 20
+
+
+def qsofa_flags(resp, sbp):
+    """Critérios de qSOFA atendidos, na ordem de `QSOFA_LABELS`"""
+    return resp >= 22, sbp <= 100
+
+
+def news2_component(field, values):
+    """Pontos do NEWS2 de um parâmetro; valores ausentes valem 0"""
+    edges, points = NEWS2_BANDS[field]
+    values = np.asarray(values, dtype=float)
+    component = np.asarray(points, dtype=np.int8)[np.searchsorted(edges, values, side="left")]
+    return np.where(np.isnan(values), np.int8(0), component)
+
+
+def news2_risk(total, max_component):
+    """Código do nível de risco (índice em `NEWS2_RISKS`) a partir do total e do maior componente"""
+    total = np.asarray(total)
+    return np.select(
+        [total >= 7, total >= 5, np.asarray(max_component) >= 3],
+        [3, 2, 1],
+        default=0,
+    ).astype(np.int8)
+
+
+def _scores(columns):
+    hr, resp, temp, sbp, o2sat = (_column(columns, field) for field in SCORE_FIELDS)
+    values = {"hr": hr, "resp": resp, "temp": temp, "sbp": sbp, "o2sat": o2sat}
+    sirs = sirs_flags(temp, hr, resp)
+    qsofa = qsofa_flags(resp, sbp)
+    components = {field: news2_component(field, values[field]) for field in NEWS2_BANDS}
+    return sirs, qsofa, components
+
+
+def score_arrays(columns):
+    """
+    SIRS, qSOFA e NEWS2 de todos os pacientes de uma vez.
+
+    `columns` é um mapeamento campo -> valores (dict de escalares ou de
+    arrays, ou um DataFrame). Devolve arrays com `sirs` (0 a 3), `qsofa`
+    (0 a 2), `news2`, `news2_max` (maior componente), `news2_risk` (código
+    em `NEWS2_RISKS`) e `alert` (≥ 2 critérios de SIRS ou de qSOFA, ou
+    NEWS2 ≥ 5).
+    """
+    sirs_met, qsofa_met, components = _scores(columns)
+    sirs = sum(flag.astype(np.int8) for flag in sirs_met)
+    qsofa = sum(flag.astype(np.int8) for flag in qsofa_met)
+    news2 = sum(component.astype(np.int16) for component in components.values())
+    news2_max = reduce(np.maximum, components.values())
+    return {
+        "sirs": sirs,
+        "qsofa": qsofa,
+        "news2": news2,
+        "news2_max": news2_max,
+        "news2_risk": news2_risk(news2, news2_max),
+        "alert": (sirs >= 2) | (qsofa >= 2) | (news2 >= 5),
+    }
+
+
+def patient_scores(patient_data):
+    """Escores de um paciente, com os critérios atendidos e os pontos de cada parâmetro do NEWS2"""
+    sirs_met, qsofa_met, components = _scores(patient_data)
+    sirs = [label for label, flag in zip(SIRS_LABELS, sirs_met) if flag]
+    qsofa = [label for label, flag in zip(QSOFA_LABELS, qsofa_met) if flag]
+    points = {field: int(component) for field, component in components.items()}
+    news2 = sum(points.values())
+    risk = int(news2_risk(news2, max(points.values())))
+    return {
+        "sirs": len(sirs),
+        "sirs_criteria": sirs,
+        "qsofa": len(qsofa),
+        "qsofa_criteria": qsofa,
+        "news2": news2,
+        "news2_components": {NEWS2_LABELS[field]: value for field, value in points.items()},
+        "news2_risk": NEWS2_RISKS[risk],
+        "news2_response": NEWS2_RESPONSES[risk],
+        "alert": len(sirs) >= 2 or len(qsofa) >= 2 or news2 >= 5,
+    }
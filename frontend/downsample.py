@@ -0,0 +1,83 @@
+"""
+Redução de pontos de séries temporais para o gráfico do histórico
+"""
+import numpy as np
+
+
+def lttb_indices(x, y, max_points):
+    """
+    Índices selecionados pelo algoritmo Largest-Triangle-Three-Buckets.
+
+    Mantém o primeiro e o último ponto e, em cada bucket intermediário, o
+    ponto que forma o maior triângulo com o ponto escolhido no bucket
+    anterior e a média do bucket seguinte, preservando a forma da série.
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Limites dos buckets entre o primeiro e o último ponto
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_start, next_stop = stop, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_stop].mean()
+        next_y = y[next_start:next_stop].mean()
+
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def crossing_indices(y, thresholds):
+    """Índices dos pontos imediatamente antes e depois de cada cruzamento de limiar"""
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) < 2:
+        return np.array([], dtype=np.int64)
+
+    crossings = []
+    for threshold in thresholds:
+        above = y >= threshold
+        changed = np.flatnonzero(above[1:] != above[:-1])
+        crossings.append(changed)
+        crossings.append(changed + 1)
+    return np.concatenate(crossings)
+
+
+def downsample(x, y, max_points, thresholds=()):
+    """
+    Índices (ordenados) dos pontos a desenhar: LTTB com no máximo
+    `max_points` pontos, somados aos pontos vizinhos de cada cruzamento dos
+    `thresholds`, para que nenhuma mudança de faixa de risco desapareça.
+
+    Em séries que oscilam muito em torno de um limiar, os cruzamentos
+    também são limitados a `max_points` (amostrados uniformemente), o que
+    mantém o total abaixo de 2 × `max_points`.
+    """
+    if len(x) <= max_points:
+        return np.arange(len(x))
+
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[us]").astype(np.int64)
+
+    indices = lttb_indices(x, y, max_points)
+    if thresholds:
+        crossings = np.unique(crossing_indices(y, thresholds))
+        if len(crossings) > max_points:
+            crossings = crossings[np.linspace(0, len(crossings) - 1, max_points).astype(np.int64)]
+        indices = np.union1d(indices, crossings)
+    return indices
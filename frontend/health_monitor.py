@@ -0,0 +1,69 @@
+"""
+Verificação de saúde da API em segundo plano, com cache por TTL
+"""
+import threading
+import time
+
+
+class HealthMonitor:
+    """
+    Executa a verificação de saúde da API em uma thread de fundo e guarda o
+    último resultado conhecido.
+
+    O caminho de renderização apenas lê `status()`, que nunca espera pela
+    rede: enquanto a primeira verificação não termina, a API é considerada
+    indisponível.
+    """
+
+    def __init__(self, probe, ttl=30.0):
+        self._probe = probe
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._healthy = False
+        self._data = None
+        self._checked_at = None
+
+    def start(self):
+        """Inicia a thread de verificação (idempotente)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._thread = threading.Thread(
+                target=self._run,
+                name="sepsis-health-monitor",
+                daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def refresh(self):
+        """Solicita uma nova verificação sem aguardar o resultado"""
+        self._wakeup.set()
+
+    def status(self):
+        """Retorna (saudável, dados) da última verificação concluída"""
+        with self._lock:
+            return self._healthy, self._data
+
+    def age(self):
+        """Segundos desde a última verificação concluída (None se nunca houve)"""
+        with self._lock:
+            checked_at = self._checked_at
+        return None if checked_at is None else time.monotonic() - checked_at
+
+    def _run(self):
+        while True:
+            try:
+                healthy, data = self._probe()
+            except Exception:
+                healthy, data = False, None
+
+            with self._lock:
+                self._healthy = healthy
+                self._data = data
+                self._checked_at = time.monotonic()
+
+            self._wakeup.wait(self.ttl)
+            self._wakeup.clear()
@@ -0,0 +1,316 @@
+"""
+Histórico de predições da sessão em formato colunar, com agregados incrementais
+"""
+import threading
+from datetime import datetime
+from uuid import uuid4
+
+import numpy as np
+
+
+# Limiares de probabilidade usados em todo o frontend
+HIGH_RISK_THRESHOLD = 0.6
+MODERATE_RISK_THRESHOLD = 0.3
+
+RISK_LABELS = ("Alto", "Moderado", "Baixo")
+
+# Campos do paciente e tipo da coluna correspondente
+PATIENT_COLUMNS = {
+    "hr": np.int32,
+    "o2sat": np.int32,
+    "temp": np.float64,
+    "sbp": np.int32,
+    "dbp": np.int32,
+    "map": np.float64,
+    "resp": np.int32,
+    "age": np.int32,
+    "gender": np.int8,
+    "unit1": np.int8,
+    "unit2": np.int8,
+    "hosp_adm_time": np.int32,
+    "iculos": np.int32,
+}
+
+# Linhas da tabela vertical do histórico
+TABLE_METRICS = [
+    'Data/Hora',
+    'Probabilidade',
+    'Nível de Risco',
+    'Freq. Cardíaca',
+    'Saturação O2',
+    'Temperatura',
+    'Pressão Sistólica'
+]
+
+
+def probability_bucket(probability):
+    """Classifica a probabilidade em Alto/Moderado/Baixo"""
+    if probability >= HIGH_RISK_THRESHOLD:
+        return "Alto"
+    if probability >= MODERATE_RISK_THRESHOLD:
+        return "Moderado"
+    return "Baixo"
+
+
+def classify_risk(probability, risk_level):
+    """
+    Concilia a probabilidade com o nível de risco textual da API.
+
+    Retorna (nível, aviso): o nível parte da probabilidade e é substituído
+    pelo texto da API quando este é reconhecido; `aviso` descreve uma
+    inconsistência entre os dois, ou é None.
+    """
+    risk = probability_bucket(probability)
+    warning = None
+    inconsistency = f"⚠️ Inconsistência detectada: Probabilidade {probability:.1%} mas nível de risco '{risk_level}'"
+
+    if isinstance(risk_level, str):
+        risk_text = risk_level.lower()
+        if any(word in risk_text for word in ["alto", "elevado", "high", "severe"]):
+            # Se o texto indica alto risco mas a probabilidade é baixa, pode ser um erro
+            if probability < 0.3:
+                warning = inconsistency
+            risk = "Alto"
+        elif any(word in risk_text for word in ["moderado", "moderate", "médio", "medium"]):
+            if probability < 0.2 or probability > 0.7:
+                warning = inconsistency
+            risk = "Moderado"
+        elif any(word in risk_text for word in ["baixo", "low", "baixo risco"]):
+            if probability > 0.5:
+                warning = inconsistency
+            risk = "Baixo"
+
+    return risk, warning
+
+
+class PredictionHistory:
+    """
+    Histórico de predições de uma sessão, armazenado por colunas.
+
+    Cada campo é um array NumPy tipado (datas em `datetime64`, níveis de
+    risco como códigos inteiros) que cresce dobrando de capacidade, o que dá
+    custo amortizado O(1) por `append`. `column()` e `to_frame()` expõem
+    fatias dos arrays sem cópia para o pandas e o Plotly.
+
+    Contagens, soma/mínimo/máximo da probabilidade e contagens por faixa de
+    risco são atualizadas a cada `append`, de modo que `summary()` custa O(1)
+    independentemente do tamanho do histórico.
+
+    As predições em segundo plano chegam de threads do pool, enquanto a
+    sessão lê o histórico: `lock` protege a inclusão, o crescimento dos
+    arrays e as leituras. Quem marca o horário fora de `append` deve fazê-lo
+    com `lock` em mãos, para que as datas fiquem em ordem.
+    """
+
+    def __init__(self, capacity=64):
+        self.lock = threading.RLock()
+        self._size = 0
+        self._columns = {
+            "timestamp": np.empty(capacity, dtype="datetime64[us]"),
+            "probability": np.empty(capacity, dtype=np.float64),
+            "confidence": np.empty(capacity, dtype=np.float64),
+            "risk": np.empty(capacity, dtype=np.uint8),
+            "risk_level": np.empty(capacity, dtype=np.uint16),
+        }
+        for field, dtype in PATIENT_COLUMNS.items():
+            self._columns[field] = np.empty(capacity, dtype=dtype)
+
+        # Textos de nível de risco devolvidos pela API, indexados pelo código
+        self._risk_level_labels = []
+        self._risk_level_codes = {}
+        self.warnings = []
+        # Identidade e versão do histórico, usadas como chave de cache
+        self.key = uuid4().hex
+        self.version = 0
+
+        self._sum_probability = 0.0
+        self._min_probability = None
+        self._max_probability = None
+        self._bucket_counts = {"Alto": 0, "Moderado": 0, "Baixo": 0}
+        self._risk_counts = {"Alto": 0, "Moderado": 0, "Baixo": 0}
+
+    def __len__(self):
+        with self.lock:
+            return self._size
+
+    @property
+    def capacity(self):
+        with self.lock:
+            return len(self._columns["probability"])
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos arrays (inclui a capacidade reservada)"""
+        with self.lock:
+            return sum(column.nbytes for column in self._columns.values())
+
+    def _grow(self):
+        capacity = max(self.capacity * 2, 1)
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _risk_level_code(self, risk_level):
+        risk_level = str(risk_level)
+        code = self._risk_level_codes.get(risk_level)
+        if code is None:
+            code = len(self._risk_level_labels)
+            self._risk_level_labels.append(risk_level)
+            self._risk_level_codes[risk_level] = code
+        return code
+
+    def append(self, patient_data, result, timestamp=None):
+        """Inclui uma predição e atualiza os agregados"""
+        probability = result["prediction"]
+        risk, warning = classify_risk(probability, result["risk_level"])
+
+        with self.lock:
+            timestamp = timestamp or datetime.now()
+            if self._size == self.capacity:
+                self._grow()
+
+            i = self._size
+            columns = self._columns
+            columns["timestamp"][i] = np.datetime64(timestamp, "us")
+            columns["probability"][i] = probability
+            columns["confidence"][i] = result.get("confidence", np.nan)
+            columns["risk"][i] = RISK_LABELS.index(risk)
+            columns["risk_level"][i] = self._risk_level_code(result["risk_level"])
+            for field in PATIENT_COLUMNS:
+                columns[field][i] = patient_data[field]
+            self._size += 1
+
+            if warning:
+                self.warnings.append(warning)
+
+            self._sum_probability += probability
+            if self._min_probability is None or probability < self._min_probability:
+                self._min_probability = probability
+            if self._max_probability is None or probability > self._max_probability:
+                self._max_probability = probability
+            self._bucket_counts[probability_bucket(probability)] += 1
+            self._risk_counts[risk] += 1
+            self.version += 1
+
+    def column(self, name):
+        """Retorna uma visão somente leitura (sem cópia) de uma coluna"""
+        with self.lock:
+            view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def timestamps(self):
+        return self.column("timestamp")
+
+    @property
+    def probabilities(self):
+        return self.column("probability")
+
+    @property
+    def risks(self):
+        """Nível de risco conciliado de cada predição (Alto/Moderado/Baixo)"""
+        return np.asarray(RISK_LABELS, dtype=object)[self.column("risk")]
+
+    def series(self, start=0, stop=None):
+        """Datas, probabilidades e níveis de risco conciliados do intervalo [start, stop)"""
+        risk_labels = np.asarray(RISK_LABELS, dtype=object)
+        with self.lock:
+            return (
+                self.timestamps[start:stop],
+                self.probabilities[start:stop],
+                risk_labels[self.column("risk")[start:stop]],
+            )
+
+    def position_at(self, timestamp):
+        """Posição da primeira predição feita em `timestamp` ou depois"""
+        return int(np.searchsorted(self.timestamps, np.datetime64(timestamp, "us"), side="left"))
+
+    def risk_levels(self, start=0, stop=None):
+        """Textos de nível de risco devolvidos pela API para um intervalo"""
+        with self.lock:
+            labels = np.asarray(self._risk_level_labels, dtype=object)
+            return labels[self.column("risk_level")[start:stop]]
+
+    def record(self, i):
+        """Reconstrói a predição `i` no formato {timestamp, patient_data, result}"""
+        with self.lock:
+            if i < 0:
+                i += self._size
+            columns = self._columns
+            result = {
+                "prediction": float(columns["probability"][i]),
+                "risk_level": self._risk_level_labels[columns["risk_level"][i]],
+            }
+            confidence = columns["confidence"][i]
+            if not np.isnan(confidence):
+                result["confidence"] = float(confidence)
+
+            patient_data = {field: columns[field][i].item() for field in PATIENT_COLUMNS}
+            timestamp = columns["timestamp"][i].astype(datetime)
+        return {
+            "timestamp": timestamp.isoformat(),
+            "patient_data": patient_data,
+            "result": result
+        }
+
+    def last(self):
+        """Retorna a predição mais recente, ou None"""
+        with self.lock:
+            return self.record(-1) if self._size else None
+
+    def to_frame(self):
+        """DataFrame com uma linha por predição, montado sobre as colunas"""
+        import pandas as pd
+
+        with self.lock:
+            data = {name: self.column(name) for name in self._columns if name != "risk_level"}
+            risk_levels = self.column("risk_level").astype(np.int32)
+            labels = list(self._risk_level_labels)
+        frame = pd.DataFrame(data, copy=False)
+        frame["risk"] = pd.Categorical.from_codes(frame["risk"], RISK_LABELS)
+        frame["risk_level"] = pd.Categorical.from_codes(risk_levels, labels)
+        return frame
+
+    def table_frame(self, start=0, stop=None):
+        """
+        Tabela vertical do histórico (uma coluna por predição) para o
+        intervalo [start, stop), com os valores já formatados.
+        """
+        import pandas as pd
+
+        with self.lock:
+            stop = self._size if stop is None else min(stop, self._size)
+            columns = {name: column[start:stop] for name, column in self._columns.items()}
+            risk_levels = self.risk_levels(start, stop)
+        timestamps = pd.DatetimeIndex(columns["timestamp"])
+
+        rows = [
+            timestamps.strftime("%d/%m/%Y %H:%M"),
+            [f"{p:.1%}" for p in columns["probability"]],
+            risk_levels,
+            [f"{v} bpm" for v in columns["hr"]],
+            [f"{v}%" for v in columns["o2sat"]],
+            [f"{v:.1f}°C" for v in columns["temp"]],
+            [f"{v} mmHg" for v in columns["sbp"]],
+        ]
+        names = [f"Predição {i + 1}" for i in range(start, stop)]
+        return pd.DataFrame(
+            {name: [row[j] for row in rows] for j, name in enumerate(names)},
+            index=TABLE_METRICS
+        )
+
+    def summary(self):
+        """Retorna os agregados do histórico em O(1)"""
+        with self.lock:
+            count = self._size
+            return {
+                "count": count,
+                "sum_probability": self._sum_probability,
+                "mean_probability": self._sum_probability / count if count else 0.0,
+                "min_probability": self._min_probability,
+                "max_probability": self._max_probability,
+                "buckets": dict(self._bucket_counts),
+                "risks": dict(self._risk_counts),
+            }
@@ -0,0 +1,320 @@
+"""
+Histórico de predições persistente em SQLite (modo WAL)
+"""
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from history import (
+    PATIENT_COLUMNS, RISK_LABELS, TABLE_METRICS,
+    classify_risk, probability_bucket
+)
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts INTEGER NOT NULL,
+    probability REAL NOT NULL,
+    confidence REAL,
+    risk INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    risk_level TEXT,
+    warning TEXT,
+    {", ".join(f"{field} REAL" for field in PATIENT_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_ts ON predictions (ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_bucket_ts ON predictions (bucket, ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_warning ON predictions (id) WHERE warning IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS history_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    count INTEGER NOT NULL DEFAULT 0,
+    sum_probability REAL NOT NULL DEFAULT 0,
+    min_probability REAL,
+    max_probability REAL,
+    bucket_high INTEGER NOT NULL DEFAULT 0,
+    bucket_moderate INTEGER NOT NULL DEFAULT 0,
+    bucket_low INTEGER NOT NULL DEFAULT 0,
+    risk_high INTEGER NOT NULL DEFAULT 0,
+    risk_moderate INTEGER NOT NULL DEFAULT 0,
+    risk_low INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO history_stats (id) VALUES (1);
+"""
+
+INSERT_COLUMNS = ["ts", "probability", "confidence", "risk", "bucket", "risk_level", "warning"] + list(PATIENT_COLUMNS)
+
+
+def _to_micros(timestamp):
+    return int(np.datetime64(timestamp, "us").astype(np.int64))
+
+
+class SQLiteHistoryStore:
+    """
+    Histórico de predições compartilhado entre sessões, gravado em SQLite.
+
+    Expõe a mesma interface do `PredictionHistory` usada pela página de
+    histórico. As inclusões vão para uma fila e são gravadas em lote por uma
+    thread de escrita, no máximo `flush_interval` segundos depois de
+    chegarem; os agregados ficam na tabela `history_stats`, atualizada na
+    mesma transação, e as leituras são paginadas pela chave primária, sem
+    carregar o histórico inteiro em memória.
+
+    As leituras veem apenas o que já foi gravado e nunca esperam a fila.
+    Quem precisa ver as próprias inclusões guarda o número devolvido por
+    `append` e chama `flush(ticket=...)` antes de ler.
+    """
+
+    def __init__(self, path, batch_size=100, flush_interval=0.25):
+        self.path = path
+        self.key = f"sqlite:{os.path.abspath(path)}"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._reader = self._connect()
+        self._reader.executescript(SCHEMA)
+        self._read_lock = threading.Lock()
+
+        self._queue = queue.Queue()
+        # Inclusões enfileiradas e gravadas desde a abertura; a fila é FIFO,
+        # então a inclusão n está gravada quando `_written >= n`
+        self._appended = 0
+        self._written = 0
+        self._written_lock = threading.Condition()
+        self._writer = threading.Thread(target=self._write_loop, name="sepsis-history-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=5000")
+        return connection
+
+    # -------------------------------------------------------------------------
+    # Escrita
+    # -------------------------------------------------------------------------
+
+    def append(self, patient_data, result, timestamp=None):
+        """Enfileira uma predição para gravação em lote; retorna o número dela para `flush`"""
+        timestamp = timestamp or datetime.now()
+        probability = result["prediction"]
+        risk, warning = classify_risk(probability, result["risk_level"])
+        row = [
+            _to_micros(timestamp),
+            probability,
+            result.get("confidence"),
+            RISK_LABELS.index(risk),
+            RISK_LABELS.index(probability_bucket(probability)),
+            str(result["risk_level"]),
+            warning,
+        ] + [patient_data[field] for field in PATIENT_COLUMNS]
+
+        with self._written_lock:
+            self._appended += 1
+            self._queue.put(row)
+            return self._appended
+
+    def flush(self, timeout=5.0, ticket=None):
+        """
+        Aguarda a gravação das predições enfileiradas até a de número
+        `ticket` (todas, por padrão); retorna False se o tempo acabar
+        """
+        with self._written_lock:
+            target = self._appended if ticket is None else ticket
+            return self._written_lock.wait_for(lambda: self._written >= target, timeout)
+
+    def _write_loop(self):
+        connection = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            # Prazo do lote inteiro: com inclusões chegando sem parar, o lote
+            # é gravado ao vencer o prazo em vez de esperar encher
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_batch(connection, batch)
+            except sqlite3.Error as e:
+                logger.error("Falha ao gravar histórico em %s: %s", self.path, e)
+            finally:
+                with self._written_lock:
+                    self._written += len(batch)
+                    self._written_lock.notify_all()
+
+    def _write_batch(self, connection, batch):
+        probabilities = [row[1] for row in batch]
+        risks = [row[3] for row in batch]
+        buckets = [row[4] for row in batch]
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                f"INSERT INTO predictions ({', '.join(INSERT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in INSERT_COLUMNS)})",
+                batch
+            )
+            connection.execute(
+                """
+                UPDATE history_stats SET
+                    count = count + ?,
+                    sum_probability = sum_probability + ?,
+                    min_probability = MIN(COALESCE(min_probability, ?), ?),
+                    max_probability = MAX(COALESCE(max_probability, ?), ?),
+                    bucket_high = bucket_high + ?,
+                    bucket_moderate = bucket_moderate + ?,
+                    bucket_low = bucket_low + ?,
+                    risk_high = risk_high + ?,
+                    risk_moderate = risk_moderate + ?,
+                    risk_low = risk_low + ?
+                WHERE id = 1
+                """,
+                (
+                    len(batch), sum(probabilities),
+                    min(probabilities), min(probabilities),
+                    max(probabilities), max(probabilities),
+                    buckets.count(0), buckets.count(1), buckets.count(2),
+                    risks.count(0), risks.count(1), risks.count(2),
+                )
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    # -------------------------------------------------------------------------
+    # Leitura
+    # -------------------------------------------------------------------------
+
+    def _query(self, sql, params=()):
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    def __len__(self):
+        return self._query("SELECT count FROM history_stats WHERE id = 1")[0][0]
+
+    @property
+    def version(self):
+        """Muda sempre que uma predição é gravada"""
+        return len(self)
+
+    def summary(self):
+        """Retorna os agregados mantidos na tabela `history_stats`"""
+        (count, sum_probability, min_probability, max_probability,
+         bucket_high, bucket_moderate, bucket_low,
+         risk_high, risk_moderate, risk_low) = self._query(
+            """
+            SELECT count, sum_probability, min_probability, max_probability,
+                   bucket_high, bucket_moderate, bucket_low,
+                   risk_high, risk_moderate, risk_low
+            FROM history_stats WHERE id = 1
+            """
+        )[0]
+        return {
+            "count": count,
+            "sum_probability": sum_probability,
+            "mean_probability": sum_probability / count if count else 0.0,
+            "min_probability": min_probability,
+            "max_probability": max_probability,
+            "buckets": {"Alto": bucket_high, "Moderado": bucket_moderate, "Baixo": bucket_low},
+            "risks": {"Alto": risk_high, "Moderado": risk_moderate, "Baixo": risk_low},
+        }
+
+    @property
+    def warnings(self):
+        """Avisos de inconsistência mais recentes (até 50)"""
+        rows = self._query(
+            "SELECT warning FROM predictions WHERE warning IS NOT NULL ORDER BY id DESC LIMIT 50"
+        )
+        return [row[0] for row in reversed(rows)]
+
+    def _rows(self, columns, start=0, stop=None):
+        # As linhas nunca são removidas, então a posição i corresponde ao id i + 1
+        if stop is None:
+            stop = len(self)
+        return self._query(
+            f"SELECT {', '.join(columns)} FROM predictions WHERE id > ? AND id <= ? ORDER BY id",
+            (start, stop)
+        )
+
+    def position_at(self, timestamp):
+        """Posição da primeira predição feita em `timestamp` ou depois (usa o índice de ts)"""
+        row = self._query("SELECT MIN(id) FROM predictions WHERE ts >= ?", (_to_micros(timestamp),))[0]
+        return len(self) if row[0] is None else row[0] - 1
+
+    def last(self):
+        """Retorna a predição mais recente, ou None"""
+        rows = self._query(
+            f"SELECT {', '.join(INSERT_COLUMNS)} FROM predictions ORDER BY id DESC LIMIT 1"
+        )
+        if not rows:
+            return None
+        row = dict(zip(INSERT_COLUMNS, rows[0]))
+        result = {"prediction": row["probability"], "risk_level": row["risk_level"]}
+        if row["confidence"] is not None:
+            result["confidence"] = row["confidence"]
+        patient_data = {
+            field: (row[field] if PATIENT_COLUMNS[field] == np.float64 else int(row[field]))
+            for field in PATIENT_COLUMNS
+        }
+        return {
+            "timestamp": np.datetime64(row["ts"], "us").astype(datetime).isoformat(),
+            "patient_data": patient_data,
+            "result": result
+        }
+
+    def series(self, start=0, stop=None):
+        """Datas, probabilidades e níveis de risco conciliados do intervalo [start, stop)"""
+        rows = self._rows(["ts", "probability", "risk"], start, stop)
+        if not rows:
+            return np.array([], dtype="datetime64[us]"), np.array([]), np.array([], dtype=object)
+        ts, probabilities, risks = (np.asarray(values) for values in zip(*rows))
+        return (
+            ts.astype("datetime64[us]"),
+            probabilities.astype(np.float64),
+            np.asarray(RISK_LABELS, dtype=object)[risks.astype(np.int64)],
+        )
+
+    def table_frame(self, start=0, stop=None):
+        """Tabela vertical do histórico para o intervalo [start, stop)"""
+        import pandas as pd
+
+        rows = self._rows(["id", "ts", "probability", "risk_level", "hr", "o2sat", "temp", "sbp"], start, stop)
+        data = {}
+        for row_id, ts, probability, risk_level, hr, o2sat, temp, sbp in rows:
+            timestamp = np.datetime64(ts, "us").astype(datetime)
+            data[f"Predição {row_id}"] = [
+                timestamp.strftime("%d/%m/%Y %H:%M"),
+                f"{probability:.1%}",
+                risk_level,
+                f"{hr:.0f} bpm",
+                f"{o2sat:.0f}%",
+                f"{temp:.1f}°C",
+                f"{sbp:.0f} mmHg"
+            ]
+        return pd.DataFrame(data, index=TABLE_METRICS)
+
+    def close(self):
+        """Grava o que estiver na fila e fecha a conexão de leitura"""
+        self.flush()
+        with self._read_lock:
+            self._reader.close()
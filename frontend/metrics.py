@@ -0,0 +1,140 @@
+"""
+Métricas do processo em histogramas de buckets fixos, baratas de gravar e de ler
+"""
+import bisect
+import sys
+import threading
+from itertools import islice
+
+
+# Limites superiores (s) dos buckets de latência das chamadas à API
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Limites superiores (s) dos buckets de duração dos reruns do script
+RERUN_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Contagens por bucket (o último é +Inf), soma, máximo e erros.
+
+    `observe` é O(log buckets) e a leitura é O(buckets), independentemente
+    de quantas observações foram feitas: nenhuma amostra individual é
+    guardada, então consultar o histograma não custa mais à medida que o
+    processo envelhece.
+    """
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._count = 0
+        self._errors = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def observe(self, value, error=False):
+        """Registra uma observação (em segundos)"""
+        bucket = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self._counts[bucket] += 1
+            self._count += 1
+            self._errors += bool(error)
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def snapshot(self):
+        """Cópia das contagens e agregados, com p50/p95/p99 estimados pelos buckets"""
+        with self._lock:
+            counts = list(self._counts)
+            snapshot = {
+                "count": self._count,
+                "errors": self._errors,
+                "sum_s": self._sum,
+                "max_s": self._max,
+            }
+        snapshot["bounds"] = list(self.bounds)
+        snapshot["counts"] = counts
+        snapshot["mean_s"] = snapshot["sum_s"] / snapshot["count"] if snapshot["count"] else 0.0
+        snapshot["error_rate"] = snapshot["errors"] / snapshot["count"] if snapshot["count"] else 0.0
+        for q in (0.5, 0.95, 0.99):
+            snapshot[f"p{int(q * 100)}_s"] = bucket_quantile(q, self.bounds, counts, snapshot["max_s"])
+        return snapshot
+
+
+def bucket_quantile(q, bounds, counts, maximum):
+    """
+    Estima o quantil `q` por interpolação linear dentro do bucket que o
+    contém (como o `histogram_quantile` do Prometheus), limitado ao máximo
+    observado, que também serve de limite superior do bucket +Inf.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if cumulative + count >= rank and count:
+            lower = bounds[i - 1] if i > 0 else 0.0
+            upper = bounds[i] if i < len(bounds) else max(maximum, lower)
+            return min(lower + (upper - lower) * (rank - cumulative) / count, maximum)
+        cumulative += count
+    return maximum
+
+
+class HistogramFamily:
+    """Histogramas com os mesmos buckets, um por nome (caminho da API, visão...)"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, name, value, error=False):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram(self.bounds))
+        histogram.observe(value, error)
+
+    def snapshot(self):
+        """Snapshot de cada histograma, por nome"""
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histograms[name].snapshot() for name in sorted(histograms)}
+
+
+def estimate_size(value, depth=3, max_items=1000):
+    """
+    Estimativa barata, em bytes, da memória ocupada por um valor do
+    session_state.
+
+    Usa `nbytes` quando disponível (arrays NumPy e históricos colunares) e
+    `memory_usage()` em DataFrames; coleções são percorridas até `depth`
+    níveis, extrapolando a partir dos primeiros `max_items` elementos.
+    """
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes + sys.getsizeof(value)
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            return int(memory_usage(index=True).sum())
+        except TypeError:
+            pass
+
+    size = sys.getsizeof(value)
+    if depth <= 0 or isinstance(value, (str, bytes, bytearray)):
+        return size
+    if isinstance(value, dict):
+        sample = list(islice(value.items(), max_items))
+        children = sum(estimate_size(k, depth - 1) + estimate_size(v, depth - 1) for k, v in sample)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        sample = list(islice(value, max_items))
+        children = sum(estimate_size(item, depth - 1) for item in sample)
+    else:
+        return size
+    if sample:
+        children = children * len(value) / len(sample)
+    return size + int(children)
@@ -0,0 +1,153 @@
+"""
+Séries temporais por paciente em buffers circulares, com tendências dos sinais vitais
+"""
+import threading
+from datetime import datetime
+from uuid import uuid4
+
+import numpy as np
+
+from clinical_scores import score_arrays
+
+
+# Sinais acompanhados por paciente; a probabilidade da predição fica na última linha
+SERIES_FIELDS = ("hr", "o2sat", "temp", "sbp", "dbp", "map", "resp", "probability")
+
+MICROSECONDS_PER_HOUR = 3600 * 10**6
+
+
+def slope_per_hour(timestamps, values):
+    """Inclinação da reta de mínimos quadrados (unidades por hora), ou NaN"""
+    mask = ~np.isnan(values)
+    if mask.sum() < 2:
+        return float("nan")
+    x = timestamps[mask].astype(np.int64) / MICROSECONDS_PER_HOUR
+    y = values[mask]
+    x = x - x.mean()
+    denominator = np.dot(x, x)
+    if denominator == 0:
+        return float("nan")
+    return float(np.dot(x, y - y.mean()) / denominator)
+
+
+class PatientSeries:
+    """
+    Buffer circular com as últimas `capacity` medições de um paciente.
+
+    Os valores ficam em uma matriz NumPy (um sinal por linha), de modo que
+    `append` é O(1) e sem realocação, e consultas sobre as últimas `n`
+    medições custam O(n), independentemente de quantas já foram incluídas.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._count = 0
+        self._timestamps = np.empty(capacity, dtype="datetime64[us]")
+        self._values = np.full((len(SERIES_FIELDS), capacity), np.nan)
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    @property
+    def nbytes(self):
+        return self._timestamps.nbytes + self._values.nbytes
+
+    @property
+    def total(self):
+        """Medições incluídas desde o início, inclusive as já sobrescritas"""
+        return self._count
+
+    def append(self, timestamp, values):
+        """Inclui uma medição; campos ausentes ficam como NaN"""
+        i = self._count % self.capacity
+        self._timestamps[i] = np.datetime64(timestamp, "us")
+        for row, field in enumerate(SERIES_FIELDS):
+            value = values.get(field)
+            self._values[row, i] = np.nan if value is None else value
+        self._count += 1
+
+    def _positions(self, n=None):
+        size = len(self)
+        n = size if n is None else min(n, size)
+        return np.arange(self._count - n, self._count) % self.capacity
+
+    def window(self, n=None):
+        """Datas e valores (por campo) das últimas `n` medições, em ordem cronológica"""
+        positions = self._positions(n)
+        timestamps = self._timestamps[positions]
+        values = self._values[:, positions]
+        return timestamps, {field: values[row] for row, field in enumerate(SERIES_FIELDS)}
+
+    def trends(self, n=None):
+        """Inclinações por hora, qSOFA parcial e NEWS2 nas últimas `n` medições"""
+        timestamps, values = self.window(n)
+        scores = score_arrays(values)
+        qsofa, news2 = scores["qsofa"], scores["news2"]
+        return {
+            "points": len(timestamps),
+            "hr_slope": slope_per_hour(timestamps, values["hr"]),
+            "resp_slope": slope_per_hour(timestamps, values["resp"]),
+            "map_slope": slope_per_hour(timestamps, values["map"]),
+            "probability_slope": slope_per_hour(timestamps, values["probability"]),
+            "qsofa": int(qsofa[-1]) if len(qsofa) else None,
+            "qsofa_change": int(qsofa[-1]) - int(qsofa[0]) if len(qsofa) else None,
+            "news2": int(news2[-1]) if len(news2) else None,
+            "news2_change": int(news2[-1]) - int(news2[0]) if len(news2) else None,
+        }
+
+
+class PatientStore:
+    """
+    Séries temporais indexadas pela identificação do paciente (ou leito).
+
+    Cada paciente tem o próprio `PatientSeries`, então a trajetória de um
+    paciente é lida sem percorrer o histórico global. `key` e `version`
+    identificam o conteúdo para o cache das figuras, como no
+    `PredictionHistory`.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._series = {}
+        self._lock = threading.Lock()
+        self.key = uuid4().hex
+        self.version = 0
+
+    def __len__(self):
+        return len(self._series)
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos buffers de todos os pacientes"""
+        with self._lock:
+            return sum(series.nbytes for series in self._series.values())
+
+    def append(self, patient_id, patient_data, result, timestamp=None):
+        """Inclui os sinais vitais e a probabilidade de uma predição"""
+        timestamp = timestamp or datetime.now()
+        values = dict(patient_data)
+        if values.get("map") is None and "sbp" in values and "dbp" in values:
+            values["map"] = round((values["sbp"] + 2 * values["dbp"]) / 3, 1)
+        values["probability"] = result["prediction"]
+
+        with self._lock:
+            series = self._series.get(patient_id)
+            if series is None:
+                series = self._series[patient_id] = PatientSeries(self.capacity)
+            series.append(timestamp, values)
+            self.version += 1
+
+    def patients(self):
+        """Identificações com ao menos uma medição, em ordem"""
+        with self._lock:
+            return sorted(self._series)
+
+    def window(self, patient_id, n=None):
+        """Datas e valores das últimas `n` medições do paciente"""
+        with self._lock:
+            return self._series[patient_id].window(n)
+
+    def trends(self, patient_id, n=None):
+        """Tendências das últimas `n` medições do paciente"""
+        with self._lock:
+            return self._series[patient_id].trends(n)
@@ -0,0 +1,102 @@
+"""
+Cache LRU + TTL de predições, compartilhado entre as sessões
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+# Casas decimais usadas na chave, iguais ao passo de cada campo no formulário
+# (temperatura com step=0.1, MAP arredondada a 0.1, demais campos inteiros)
+FIELD_PRECISION = {"temp": 1, "map": 1}
+
+
+def canonical_key(patient_data):
+    """Gera uma chave estável para os dados do paciente"""
+    normalized = {
+        field: round(float(value), FIELD_PRECISION.get(field, 0))
+        for field, value in patient_data.items()
+    }
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """
+    Guarda as últimas respostas de `/predict` por até `ttl` segundos,
+    descartando as menos usadas quando `maxsize` é atingido.
+
+    O cache é invalidado por completo quando a versão do modelo informada
+    pelo `/health` muda (veja `sync_model_version`).
+    """
+
+    def __init__(self, maxsize=1024, ttl=600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_version = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, key):
+        """Retorna o resultado em cache ou None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            expires_at, result = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return dict(result)
+
+    def put(self, key, result):
+        """Armazena um resultado de predição bem-sucedida"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+
+    def sync_model_version(self, model_version):
+        """Invalida o cache se a versão do modelo na API mudou"""
+        if model_version is None:
+            return
+        with self._lock:
+            changed = self._model_version is not None and self._model_version != model_version
+            self._model_version = model_version
+        if changed:
+            self.invalidate()
+
+    def stats(self):
+        """Retorna contadores de acertos, falhas e remoções"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["model_version"] = self._model_version
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,369 @@
+"""
+Motor de predição concorrente (asyncio + semáforo) sobre o cliente da API
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from circuit_breaker import CLOSED, HALF_OPEN
+from prediction_cache import canonical_key
+from worker_pool import BULK, INTERACTIVE, PRIORITIES, DeadlineExpired, QueueFull, WorkerPool
+
+logger = logging.getLogger(__name__)
+
+# Espera (s) antes de reenviar ao pool um paciente do lote recusado por fila cheia
+BACKPRESSURE_RETRY_DELAY = 0.05
+BACKPRESSURE_MAX_DELAY = 1.0
+
+
+class _Flight:
+    """Requisição à API em andamento e quantos chamadores aguardam por ela"""
+
+    __slots__ = ("future", "waiters", "priority", "trial")
+
+    def __init__(self, future, priority, trial=False):
+        self.future = future
+        self.waiters = 0
+        self.priority = priority
+        # Chamada de teste do circuito meio aberto, devolvida se não for feita
+        self.trial = trial
+
+
+def _bridge(future, loop):
+    """
+    Future do `loop` que recebe o resultado de `future` (de outra thread).
+
+    Ao contrário de `asyncio.wrap_future`, cancelar a future devolvida não
+    cancela a original, que pode estar sendo aguardada por outras sessões,
+    e o resultado é descartado se o loop já tiver sido encerrado.
+    """
+    waiter = loop.create_future()
+
+    def transfer(done):
+        if waiter.done():
+            return
+        if done.cancelled():
+            waiter.cancel()
+        elif done.exception() is not None:
+            waiter.set_exception(done.exception())
+        else:
+            waiter.set_result(done.result())
+
+    def on_done(done):
+        try:
+            loop.call_soon_threadsafe(transfer, done)
+        except RuntimeError:
+            # O chamador desistiu (timeout) e o loop dele já foi encerrado
+            pass
+
+    future.add_done_callback(on_done)
+    return waiter
+
+
+class ScoringEngine:
+    """
+    Envia predições à API com concorrência limitada.
+
+    As chamadas HTTP continuam sendo feitas pelo `ApiClient` (bloqueante,
+    com pool keep-alive) nas threads de um `WorkerPool`, que pode ser
+    compartilhado com as demais chamadas à API do processo; o asyncio
+    coordena o limite de requisições simultâneas, o timeout de cada
+    paciente e o cancelamento do restante do lote quando algo interrompe a
+    execução.
+
+    Cada chamada entra na fila do pool sob a sessão (`session`) que a pediu
+    e na classe de prioridade (`priority`) do seu uso: `INTERACTIVE` para o
+    formulário (padrão de `score_one` e `submit`), `MONITORING` para o
+    painel de leitos e `BULK` para o lote (padrão de `score_many`). Com
+    `max_wait`, a chamada que passar esse tempo na fila é descartada sem
+    chegar à API e a predição falha com `expired` no resultado. Com a fila
+    (ou a cota da sessão) cheia, a predição falha na hora com `backpressure`
+    no resultado, para que a interface avise o usuário em vez de esperar
+    indefinidamente.
+
+    Com um `PredictionCache`, pacientes com os mesmos dados são respondidos
+    sem nova chamada à API. Chamadas simultâneas com os mesmos dados (de
+    sessões diferentes ou dentro de um lote) compartilham uma única
+    requisição em andamento (single-flight): todas recebem o mesmo
+    resultado ou erro, cada uma respeitando o próprio timeout. A requisição
+    ainda na fila assume a classe mais urgente e o prazo mais cedo entre
+    os chamadores, para que uma predição interativa não fique atrás do lote
+    que pediu os mesmos dados primeiro. Se todos os chamadores desistirem
+    antes de a requisição começar, ela é cancelada.
+
+    Com um `CircuitBreaker`, cada chamada à API alimenta o disjuntor com o
+    resultado e a duração; com o circuito aberto, as predições que não
+    estão em cache falham na hora, sem ocupar threads até o timeout.
+
+    `submit` devolve uma `concurrent.futures.Future` em vez de bloquear,
+    para que a sessão siga renderizando enquanto a predição é feita; a
+    chamada entra na fila do pool no próprio `submit`, sujeita aos mesmos
+    limites (e recusas) que as demais.
+    """
+
+    def __init__(self, client, max_concurrency=8, request_timeout=15.0, pool=None, cache=None,
+                 breaker=None):
+        self.client = client
+        self.cache = cache
+        self.breaker = breaker
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+        self.pool = pool or WorkerPool(max_workers=max_concurrency, name="sepsis-scoring")
+
+        # RLock: cancelar uma future executa os callbacks na mesma thread
+        self._lock = threading.RLock()
+        self._in_flight = {}
+        self._stats = {
+            "requests": 0,
+            "cache_hits": 0,
+            "api_calls": 0,
+            "coalesced": 0,
+            "abandoned": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "rejected": 0,
+            "backpressure": 0,
+            "expired": 0,
+        }
+
+    def predict_blocking(self, patient_data):
+        """Faz uma predição de forma síncrona, sem passar pelo asyncio"""
+        started = time.perf_counter()
+        try:
+            response = self.client.post("/predict", patient_data)
+            success, result = response.status_code == 200, response.json()
+            # Erros 4xx dizem respeito aos dados enviados, não à saúde da API
+            healthy = response.status_code < 500
+        except Exception as e:
+            logger.warning("Falha na predição via API: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            success, result, healthy = False, {"error": str(e)}, False
+        if self.breaker is not None:
+            self.breaker.record(healthy, time.perf_counter() - started)
+        return success, result
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _join(self, key, patient_data, session=None, priority=INTERACTIVE, deadline=None):
+        """
+        Entra na requisição em andamento para `key`, iniciando-a se não
+        houver; retorna None se o circuito não permitir uma nova chamada e
+        levanta `QueueFull` se o pool não aceitar
+        """
+        with self._lock:
+            flight = self._in_flight.get(key)
+            if flight is None:
+                admitted = self.breaker.allow() if self.breaker is not None else CLOSED
+                if not admitted:
+                    self._stats["rejected"] += 1
+                    return None
+                trial = admitted == HALF_OPEN
+                try:
+                    future = self.pool.submit(
+                        self.predict_blocking, patient_data,
+                        session=session, priority=priority, deadline=deadline
+                    )
+                except QueueFull:
+                    self._stats["backpressure"] += 1
+                    if trial:
+                        self.breaker.release()
+                    raise
+                flight = self._in_flight[key] = _Flight(future, priority, trial)
+                self._stats["api_calls"] += 1
+                flight.future.add_done_callback(lambda done: self._finish(key, flight))
+            else:
+                self._stats["coalesced"] += 1
+                if self.pool.promote(flight.future, priority, deadline) \
+                        and PRIORITIES.index(priority) < PRIORITIES.index(flight.priority):
+                    flight.priority = priority
+            flight.waiters += 1
+            return flight
+
+    def _leave(self, flight):
+        """Sai da requisição; sem ninguém aguardando, cancela se ainda estiver na fila"""
+        with self._lock:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.future.done() and flight.future.cancel():
+                self._stats["abandoned"] += 1
+
+    def _finish(self, key, flight):
+        """Guarda o resultado no cache e libera a chave (thread do executor)"""
+        future = flight.future
+        if future.cancelled() or future.exception() is not None:
+            # Cancelada ou descartada na fila por prazo vencido: se era a
+            # chamada de teste do circuito meio aberto, devolve a vaga
+            if flight.trial:
+                self.breaker.release()
+        else:
+            success, result = future.result()
+            if success and self.cache is not None:
+                self.cache.put(key, result)
+            elif not success:
+                self._count("failures")
+        with self._lock:
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+
+    def _start(self, patient_data, session, priority, max_wait):
+        """
+        Resultado imediato (cache, fila cheia ou circuito aberto) e a
+        requisição em que o chamador entrou; só um dos dois é diferente de None
+        """
+        key = canonical_key(patient_data)
+        self._count("requests")
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count("cache_hits")
+                return (True, cached), None
+
+        try:
+            deadline = time.monotonic() + max_wait if max_wait is not None else None
+            flight = self._join(key, patient_data, session, priority, deadline)
+        except QueueFull as e:
+            logger.debug("Predição recusada pelo pool de chamadas à API: %s", e)
+            return (False, {
+                "error": f"Muitas chamadas à API na fila ({e}); tente novamente em instantes",
+                "backpressure": True,
+            }), None
+        if flight is None:
+            retry_in = self.breaker.retry_in()
+            detail = f"nova tentativa em {retry_in:.0f}s" if retry_in else "reconexão em teste"
+            return (False, {"error": f"API de predição indisponível ({detail})", "circuit_open": True}), None
+        return None, flight
+
+    def _expired(self, error):
+        self._count("expired")
+        logger.debug("Predição descartada pelo pool de chamadas à API: %s", error)
+        return False, {"error": f"Predição descartada: {error}", "expired": True}
+
+    async def score_async(self, patient_data, session=None, priority=INTERACTIVE, max_wait=None):
+        """
+        Faz a predição de um paciente respeitando o timeout configurado; com
+        `max_wait`, desiste se a chamada não sair da fila do pool nesse tempo
+        """
+        outcome, flight = self._start(patient_data, session, priority, max_wait)
+        if flight is None:
+            return outcome
+        try:
+            success, result = await asyncio.wait_for(
+                _bridge(flight.future, asyncio.get_running_loop()),
+                timeout=self.request_timeout
+            )
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            logger.warning("Predição excedeu o tempo limite de %gs", self.request_timeout)
+            return False, {"error": f"Tempo limite de {self.request_timeout:g}s excedido"}
+        except DeadlineExpired as e:
+            return self._expired(e)
+        finally:
+            self._leave(flight)
+
+        # Cada chamador recebe a própria cópia do resultado compartilhado
+        return success, dict(result)
+
+    async def score_many_async(self, patients, on_result=None, max_concurrency=None, session=None,
+                               priority=BULK):
+        """
+        Faz a predição de vários pacientes com no máximo `max_concurrency`
+        requisições em andamento (e nunca mais que a cota da sessão no pool).
+
+        Um paciente recusado pelo pool (fila cheia) espera e tenta de novo,
+        com intervalos crescentes, até o timeout de uma predição: o lote
+        desacelera em vez de falhar quando o processo está sobrecarregado.
+
+        `on_result(posição, sucesso, resultado)` é chamado na ordem de
+        chegada das respostas. Retorna a lista de (sucesso, resultado) na
+        ordem de entrada. Se a execução for interrompida, as predições
+        pendentes são canceladas.
+        """
+        semaphore = asyncio.Semaphore(
+            min(max_concurrency or self.max_concurrency, self.pool.max_pending_per_session)
+        )
+
+        async def score_at(position, patient_data):
+            async with semaphore:
+                deadline = time.monotonic() + self.request_timeout
+                delay = BACKPRESSURE_RETRY_DELAY
+                while True:
+                    success, result = await self.score_async(patient_data, session, priority)
+                    if success or not result.get("backpressure") or time.monotonic() + delay > deadline:
+                        return position, (success, result)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, BACKPRESSURE_MAX_DELAY)
+
+        tasks = [
+            asyncio.ensure_future(score_at(position, patient_data))
+            for position, patient_data in enumerate(patients)
+        ]
+        results = [None] * len(tasks)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                position, (success, result) = await next_done
+                results[position] = (success, result)
+                if on_result is not None:
+                    on_result(position, success, result)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return results
+
+    def score_one(self, patient_data, session=None, priority=INTERACTIVE, max_wait=None):
+        """Versão síncrona de `score_async`, para uso no script do Streamlit"""
+        return asyncio.run(self.score_async(patient_data, session, priority, max_wait))
+
+    def submit(self, patient_data, session=None, priority=INTERACTIVE, max_wait=None):
+        """
+        Enfileira a predição no pool na hora, sob a sessão e a prioridade do
+        chamador, sem bloquear; a `concurrent.futures.Future` devolvida
+        resolve para (sucesso, resultado) quando a requisição terminar.
+
+        Cache, fila cheia e circuito aberto resolvem a future na hora. Sem
+        `max_wait`, a chamada que passar `request_timeout` na fila é
+        descartada, como a de quem desiste de esperar em `score_one`. A
+        future não pode ser cancelada: a requisição segue para os demais
+        chamadores e seu resultado vai para o cache.
+        """
+        waiter = Future()
+        waiter.set_running_or_notify_cancel()
+        outcome, flight = self._start(
+            patient_data, session, priority, self.request_timeout if max_wait is None else max_wait
+        )
+        if flight is None:
+            waiter.set_result(outcome)
+            return waiter
+
+        def transfer(done):
+            try:
+                if done.cancelled():
+                    waiter.set_result((False, {"error": "Predição cancelada"}))
+                elif isinstance(done.exception(), DeadlineExpired):
+                    waiter.set_result(self._expired(done.exception()))
+                elif done.exception() is not None:
+                    waiter.set_exception(done.exception())
+                else:
+                    success, result = done.result()
+                    # Cada chamador recebe a própria cópia do resultado compartilhado
+                    waiter.set_result((success, dict(result)))
+            finally:
+                self._leave(flight)
+
+        flight.future.add_done_callback(transfer)
+        return waiter
+
+    def score_many(self, patients, on_result=None, max_concurrency=None, session=None, priority=BULK):
+        """Versão síncrona de `score_many_async`, para uso no script do Streamlit"""
+        return asyncio.run(self.score_many_async(patients, on_result, max_concurrency, session, priority))
+
+    def stats(self):
+        """Predições pedidas, respondidas pelo cache, chamadas à API e chamadas compartilhadas"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._in_flight)
+        joined = stats["api_calls"] + stats["coalesced"]
+        stats["coalesced_rate"] = stats["coalesced"] / joined if joined else 0.0
+        return stats
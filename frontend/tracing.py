@@ -0,0 +1,170 @@
+"""
+Spans de tempo para o caminho crítico: chamadas HTTP, DataFrames, gráficos e páginas
+"""
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class _NoopSpan:
+    """Span usado com o rastreamento desligado: não mede nem grava nada"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("_tracer", "name", "attributes", "_wall", "_started")
+
+    def __init__(self, tracer, name, attributes):
+        self._tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self._wall = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        # Exceções de controle do Streamlit (st.rerun, st.stop) não são Exception
+        error = exc_type.__name__ if exc_type is not None and issubclass(exc_type, Exception) else None
+        self._tracer._record(self.name, self._wall, duration, error, self.attributes)
+        return False
+
+    def set(self, **attributes):
+        """Acrescenta atributos ao span (por exemplo, o status HTTP)"""
+        self.attributes.update(attributes)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Tracer:
+    """
+    Registra spans (nome, início, duração, erro e atributos) em um buffer
+    circular com os `capacity` mais recentes do processo.
+
+    Desligado, `span()` devolve sempre o mesmo objeto vazio, então
+    instrumentar o código custa apenas uma verificação de atributo por
+    bloco. Os percentis são calculados sobre os spans ainda no buffer.
+    """
+
+    def __init__(self, capacity=4096, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._spans = deque(maxlen=capacity)
+
+    @property
+    def capacity(self):
+        return self._spans.maxlen
+
+    def configure(self, enabled=None, capacity=None):
+        """Liga/desliga o rastreamento e ajusta o tamanho do buffer"""
+        if enabled is not None:
+            self.enabled = enabled
+        if capacity is not None and capacity != self.capacity:
+            with self._lock:
+                self._spans = deque(self._spans, maxlen=capacity)
+
+    def span(self, name, **attributes):
+        """Context manager que mede o bloco e o registra com o nome informado"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name, attributes)
+
+    def _record(self, name, wall, duration, error, attributes):
+        with self._lock:
+            self._spans.append((name, wall, duration, error, attributes))
+
+    def clear(self):
+        """Descarta os spans registrados"""
+        with self._lock:
+            self._spans.clear()
+
+    def spans(self):
+        """Spans no buffer, do mais antigo ao mais recente"""
+        with self._lock:
+            spans = list(self._spans)
+        return [
+            {
+                "name": name,
+                "start": datetime.fromtimestamp(wall).isoformat(timespec="microseconds"),
+                "duration_s": duration,
+                "error": error,
+                "attributes": attributes,
+            }
+            for name, wall, duration, error, attributes in spans
+        ]
+
+    def summary(self):
+        """Contagem, erros, média, máximo e p50/p95/p99 (s) por nome de span"""
+        with self._lock:
+            spans = list(self._spans)
+
+        grouped = {}
+        for name, _, duration, error, _ in spans:
+            durations, errors = grouped.setdefault(name, ([], [0]))
+            durations.append(duration)
+            errors[0] += error is not None
+
+        summary = {}
+        for name in sorted(grouped):
+            durations, errors = grouped[name]
+            values = np.asarray(durations)
+            percentiles = np.quantile(values, QUANTILES)
+            summary[name] = {
+                "count": len(values),
+                "errors": errors[0],
+                "sum_s": float(values.sum()),
+                "mean_s": float(values.mean()),
+                "max_s": float(values.max()),
+                **{f"p{int(q * 100)}_s": float(p) for q, p in zip(QUANTILES, percentiles)},
+            }
+        return summary
+
+    def to_prometheus(self, prefix="sepsis_span"):
+        """Resumo no formato de texto do Prometheus (métrica do tipo summary)"""
+        summary = self.summary()
+        lines = [
+            f"# HELP {prefix}_duration_seconds Duração dos spans ainda no buffer circular",
+            f"# TYPE {prefix}_duration_seconds summary",
+        ]
+        for name, stats in summary.items():
+            label = f'span="{_escape_label(name)}"'
+            for q in QUANTILES:
+                lines.append(f'{prefix}_duration_seconds{{{label},quantile="{q}"}} {stats[f"p{int(q * 100)}_s"]:.9f}')
+            lines.append(f"{prefix}_duration_seconds_sum{{{label}}} {stats['sum_s']:.9f}")
+            lines.append(f"{prefix}_duration_seconds_count{{{label}}} {stats['count']}")
+        lines.append(f"# HELP {prefix}_errors Spans terminados com exceção ainda no buffer circular")
+        lines.append(f"# TYPE {prefix}_errors gauge")
+        for name, stats in summary.items():
+            lines.append(f'{prefix}_errors{{span="{_escape_label(name)}"}} {stats["errors"]}')
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self):
+        """Spans no buffer, um objeto JSON por linha"""
+        return "".join(json.dumps(span, default=str) + "\n" for span in self.spans())
+
+
+# Rastreador do processo, configurado pelo app a partir de DEBUG/LOG_LEVEL
+tracer = Tracer()
+span = tracer.span
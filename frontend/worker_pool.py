@@ -0,0 +1,372 @@
+"""
+Pool de threads limitado para as chamadas à API, compartilhado por todas as sessões
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+from metrics import LATENCY_BUCKETS, Histogram
+
+
+# Classes de prioridade, da mais para a menos urgente
+INTERACTIVE = "interactive"
+MONITORING = "monitoring"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, MONITORING, BULK)
+
+# Peso de cada classe no escalonamento: com as três disputando as threads,
+# a cada 12 chamadas iniciadas 8 são interativas, 3 de monitoramento e 1 de lote
+DEFAULT_WEIGHTS = {INTERACTIVE: 8, MONITORING: 3, BULK: 1}
+
+
+class QueueFull(RuntimeError):
+    """A fila do pool (ou a cota da sessão) está cheia e a chamada não foi aceita"""
+
+
+class DeadlineExpired(RuntimeError):
+    """A tarefa passou do prazo enquanto aguardava na fila e foi descartada sem executar"""
+
+
+class _Task:
+    """Tarefa aguardando na fila de uma sessão, dentro de uma classe de prioridade"""
+
+    __slots__ = ("future", "fn", "args", "session", "priority", "deadline", "enqueued_at")
+
+    def __init__(self, future, fn, args, session, priority, deadline):
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.session = session
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+
+
+class _PriorityClass:
+    """Filas por sessão de uma classe, com o tempo virtual e os contadores dela"""
+
+    def __init__(self, weight):
+        self.weight = weight
+        # sessão -> tarefas aguardando, na ordem do rodízio
+        self.lanes = OrderedDict()
+        self.queued = 0
+        self.running = 0
+        # Tempo virtual de término da próxima tarefa da classe
+        self.finish = 0.0
+        self.wait = Histogram(LATENCY_BUCKETS)
+        self.stats = {"submitted": 0, "completed": 0, "cancelled": 0, "rejected": 0, "expired": 0}
+
+
+class WorkerPool:
+    """
+    Executor com no máximo `max_workers` threads e fila limitada, no lugar
+    de uma thread (ou executor) por sessão fazendo I/O por conta própria.
+
+    Cada tarefa pertence a uma classe de prioridade (`INTERACTIVE`,
+    `MONITORING` ou `BULK`) e entra na fila da sua sessão (`session`) dentro
+    da classe. Quando uma thread fica livre, a classe é escolhida por fila
+    justa ponderada (WFQ): cada tarefa iniciada avança o tempo virtual da
+    classe em 1/peso, e a classe com menor tempo virtual vai primeiro. Uma
+    classe que estava vazia entra no tempo virtual atual, sem crédito
+    acumulado. Dentro da classe, as sessões são atendidas em rodízio, uma
+    tarefa de cada vez. Assim o lote de uma sessão não passa à frente da
+    predição individual de outra, nem o lote de milhares de linhas enche as
+    threads que o formulário vai precisar.
+
+    Tarefas `BULK` nunca ocupam mais que `max_workers - reserved_workers`
+    threads: as restantes ficam livres para as outras classes, que não
+    esperam o fim de uma chamada de lote para começar.
+
+    Uma tarefa com `deadline` (instante de `time.monotonic()`) que ainda
+    está na fila quando o prazo vence é descartada sem executar: a future
+    falha com `DeadlineExpired`. Serve para leituras de monitoramento que,
+    depois de esperar demais, já foram superadas por leituras mais novas.
+
+    A pressão é sinalizada em vez de absorvida: `submit` levanta `QueueFull`
+    quando há `max_queue` tarefas aguardando da mesma classe ou de classes
+    mais prioritárias (o lote enfileirado não impede a entrada de uma
+    predição interativa) ou quando a sessão já tem `max_pending_per_session`
+    tarefas aguardando ou em execução.
+
+    As futures devolvidas podem ser canceladas enquanto aguardam; nesse caso
+    a tarefa sai da fila sem ocupar uma thread.
+    """
+
+    def __init__(self, max_workers=8, max_queue=256, max_pending_per_session=32, name="sepsis-api",
+                 weights=None, reserved_workers=1):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_pending_per_session = max_pending_per_session
+        self.name = name
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        # Pelo menos uma thread atende o lote, mesmo com a reserva mal configurada
+        self.bulk_workers = max(1, max_workers - reserved_workers)
+
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._classes = {priority: _PriorityClass(self.weights[priority]) for priority in PRIORITIES}
+        # future -> tarefa, enquanto aguarda na fila
+        self._tasks = {}
+        # sessão -> tarefas aguardando ou em execução
+        self._pending = {}
+        self._virtual = 0.0
+        self._queued = 0
+        self._running = 0
+        self._idle = 0
+        self._threads = []
+        self._shutdown = False
+        self._stats = {"submitted": 0, "completed": 0, "cancelled": 0, "rejected": 0, "expired": 0,
+                       "max_queued": 0}
+
+    def _queued_ahead(self, priority):
+        """Tarefas aguardando da classe `priority` e das mais prioritárias (com o lock)"""
+        ahead = 0
+        for other in PRIORITIES:
+            ahead += self._classes[other].queued
+            if other == priority:
+                return ahead
+
+    def _reject(self, priority, message):
+        self._stats["rejected"] += 1
+        self._classes[priority].stats["rejected"] += 1
+        raise QueueFull(message)
+
+    def submit(self, fn, *args, session=None, priority=INTERACTIVE, deadline=None):
+        """
+        Agenda `fn(*args)` na fila de `session` dentro da classe `priority`;
+        levanta `QueueFull` se não houver espaço
+        """
+        if priority not in self._classes:
+            raise ValueError(f"Classe de prioridade desconhecida: {priority}")
+        future = Future()
+        task = _Task(future, fn, args, session, priority, deadline)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("O pool de chamadas à API foi encerrado")
+            ahead = self._queued_ahead(priority)
+            if ahead >= self.max_queue:
+                self._reject(priority, f"{ahead} chamadas aguardando na fila")
+            if self._pending.get(session, 0) >= self.max_pending_per_session:
+                self._reject(priority, f"{self._pending[session]} chamadas desta sessão em andamento")
+
+            self._enqueue(task)
+            self._tasks[future] = task
+            self._pending[session] = self._pending.get(session, 0) + 1
+            self._stats["submitted"] += 1
+            self._classes[priority].stats["submitted"] += 1
+            self._stats["max_queued"] = max(self._stats["max_queued"], self._queued)
+            # Uma thread ociosa já notificada ainda conta como ociosa até
+            # acordar: só ela não basta para uma rajada de tarefas
+            if self._queued > self._idle and len(self._threads) < self.max_workers:
+                self._start_worker()
+            self._ready.notify()
+
+        future.add_done_callback(lambda done: self._discard(done) if done.cancelled() else None)
+        return future
+
+    def _enqueue(self, task):
+        """Coloca a tarefa no fim da fila da sessão, dentro da classe (com o lock)"""
+        cls = self._classes[task.priority]
+        if not cls.queued:
+            # Classe que volta a ter tarefas não acumula crédito do tempo ociosa
+            cls.finish = max(cls.finish, self._virtual)
+        cls.lanes.setdefault(task.session, deque()).append(task)
+        cls.queued += 1
+        self._queued += 1
+
+    def _remove(self, task):
+        """Tira da fila uma tarefa que ainda aguarda (com o lock)"""
+        cls = self._classes[task.priority]
+        lane = cls.lanes[task.session]
+        lane.remove(task)
+        if not lane:
+            del cls.lanes[task.session]
+        cls.queued -= 1
+        self._queued -= 1
+
+    def promote(self, future, priority, deadline=None):
+        """
+        Eleva a classe de uma tarefa que ainda aguarda, para quando outro
+        chamador passa a depender dela (chamadas compartilhadas). A tarefa
+        fica com o prazo mais cedo entre os informados: um chamador sem
+        prazo não remove o de quem já aguardava. Retorna False se a tarefa
+        já saiu da fila.
+        """
+        with self._lock:
+            task = self._tasks.get(future)
+            if task is None:
+                return False
+            if deadline is not None:
+                task.deadline = deadline if task.deadline is None else min(task.deadline, deadline)
+            if PRIORITIES.index(priority) < PRIORITIES.index(task.priority):
+                self._remove(task)
+                task.priority = priority
+                self._enqueue(task)
+                self._ready.notify()
+            return True
+
+    def _start_worker(self):
+        thread = threading.Thread(
+            target=self._work,
+            name=f"{self.name}-{len(self._threads)}",
+            daemon=True
+        )
+        self._threads.append(thread)
+        thread.start()
+
+    def _eligible(self):
+        """Classes com tarefas aguardando e thread disponível para elas (com o lock)"""
+        return [
+            priority for priority, cls in self._classes.items()
+            if cls.queued and (priority != BULK or cls.running < self.bulk_workers)
+        ]
+
+    def _next(self, eligible):
+        """
+        Próxima tarefa: classe de menor tempo virtual entre as elegíveis e,
+        dentro dela, a próxima sessão do rodízio (com o lock)
+        """
+        priority = min(eligible, key=lambda name: self._classes[name].finish)
+        cls = self._classes[priority]
+        session, lane = next(iter(cls.lanes.items()))
+        task = lane.popleft()
+        if lane:
+            cls.lanes.move_to_end(session)
+        else:
+            del cls.lanes[session]
+        cls.queued -= 1
+        self._queued -= 1
+        del self._tasks[task.future]
+
+        self._virtual = cls.finish
+        cls.finish += 1.0 / cls.weight
+        return task
+
+    def _release(self, session):
+        """Libera a cota da sessão (com o lock)"""
+        self._pending[session] -= 1
+        if not self._pending[session]:
+            del self._pending[session]
+
+    def _discard(self, future):
+        """Tira da fila uma tarefa cancelada antes de começar"""
+        with self._lock:
+            task = self._tasks.pop(future, None)
+            if task is None:
+                # Já retirada por uma thread, que trata o cancelamento
+                return
+            self._remove(task)
+            self._release(task.session)
+            self._stats["cancelled"] += 1
+            self._classes[task.priority].stats["cancelled"] += 1
+
+    def _expire(self, task, waited):
+        """Falha a future de uma tarefa vencida, fora do lock (os callbacks rodam aqui)"""
+        if task.future.set_running_or_notify_cancel():
+            task.future.set_exception(
+                DeadlineExpired(f"ficou {waited:.1f}s na fila, além do prazo")
+            )
+
+    def _work(self):
+        while True:
+            expired = []
+            with self._lock:
+                self._idle += 1
+                while True:
+                    eligible = self._eligible()
+                    if eligible or (self._shutdown and not self._queued):
+                        break
+                    self._ready.wait()
+                self._idle -= 1
+                if not eligible:
+                    return
+                # Tarefas vencidas são descartadas até surgir uma dentro do prazo
+                now = time.monotonic()
+                while eligible:
+                    task = self._next(eligible)
+                    cls = self._classes[task.priority]
+                    if task.deadline is None or now <= task.deadline:
+                        break
+                    self._release(task.session)
+                    self._stats["expired"] += 1
+                    cls.stats["expired"] += 1
+                    expired.append(task)
+                    task = None
+                    eligible = self._eligible()
+                if task is not None:
+                    self._running += 1
+                    cls.running += 1
+
+            for stale in expired:
+                self._expire(stale, now - stale.enqueued_at)
+            if task is None:
+                continue
+
+            cls.wait.observe(now - task.enqueued_at)
+            future = task.future
+            started = future.set_running_or_notify_cancel()
+            if started:
+                try:
+                    result = task.fn(*task.args)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+
+            with self._lock:
+                self._running -= 1
+                cls.running -= 1
+                self._release(task.session)
+                self._stats["completed" if started else "cancelled"] += 1
+                cls.stats["completed" if started else "cancelled"] += 1
+
+    def pressure(self, priority=BULK):
+        """
+        Ocupação da fila vista pela classe `priority`, de 0 (vazia) a 1
+        (novas chamadas dessa classe recusadas)
+        """
+        with self._lock:
+            ahead = self._queued_ahead(priority)
+        return min(1.0, ahead / self.max_queue) if self.max_queue else 1.0
+
+    def pending(self, session=None):
+        """Tarefas da sessão aguardando ou em execução"""
+        with self._lock:
+            return self._pending.get(session, 0)
+
+    def stats(self):
+        """Threads, tarefas em execução e na fila, sessões aguardando e contadores, no total e por classe"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["workers"] = len(self._threads)
+            stats["running"] = self._running
+            stats["queued"] = self._queued
+            stats["waiting_sessions"] = len({
+                session for cls in self._classes.values() for session in cls.lanes
+            })
+            classes = {
+                priority: dict(
+                    cls.stats,
+                    weight=cls.weight,
+                    queued=cls.queued,
+                    running=cls.running,
+                    waiting_sessions=len(cls.lanes),
+                )
+                for priority, cls in self._classes.items()
+            }
+        for priority, cls in self._classes.items():
+            classes[priority]["wait"] = cls.wait.snapshot()
+        stats["classes"] = classes
+        stats["pressure"] = min(1.0, stats["queued"] / self.max_queue) if self.max_queue else 1.0
+        return stats
+
+    def shutdown(self, wait=True):
+        """Recusa novas tarefas e encerra as threads depois de esvaziar a fila"""
+        with self._lock:
+            self._shutdown = True
+            self._ready.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
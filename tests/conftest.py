@@ -0,0 +1,78 @@
+"""
+Configuração comum dos testes: os módulos do frontend são importados pelo
+nome, como no app, e as fixtures para relógio, espera e pools ocupados
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "frontend"))
+
+from worker_pool import INTERACTIVE, WorkerPool  # noqa: E402
+
+
+class FakeClock:
+    """Relógio controlado pelo teste, no lugar de `time.monotonic`"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def wait_until():
+    """Espera (até `timeout` segundos) uma condição que outra thread vai satisfazer"""
+
+    def wait(condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "condição não satisfeita dentro do prazo"
+            time.sleep(0.01)
+
+    return wait
+
+
+@pytest.fixture
+def block():
+    """
+    Ocupa uma thread de um pool até o evento devolvido ser acionado (ou o
+    teste terminar): as próximas tarefas ficam na fila
+    """
+    releases = []
+
+    def occupy(pool, priority=INTERACTIVE, session="blocker"):
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocker():
+            started.set()
+            release.wait(5)
+
+        pool.submit(blocker, session=session, priority=priority)
+        assert started.wait(5)
+        releases.append(release)
+        return release
+
+    yield occupy
+    for release in releases:
+        release.set()
+
+
+@pytest.fixture
+def blocked_pool(block):
+    """Pool de uma thread, ocupada até `release.set()`"""
+    pool = WorkerPool(max_workers=1, reserved_workers=0)
+    release = block(pool)
+    yield pool, release
+    release.set()
+    pool.shutdown(wait=True)
@@ -0,0 +1,114 @@
+"""
+Testes do `BedMonitor`: envio concorrente das predições dos leitos
+"""
+from concurrent.futures import Future
+
+from bed_monitor import PATIENT_FIELDS, BedMonitor
+
+
+class FakeFeed:
+    def __init__(self, updates=()):
+        self.updates = list(updates)
+
+    def read_new(self):
+        updates, self.updates = self.updates, []
+        return updates
+
+
+def reading(bed, hr=80):
+    update = {field: 1 for field in PATIENT_FIELDS}
+    update.update(bed=bed, hr=hr)
+    return update
+
+
+class PendingSubmit:
+    """`submit` cujas futures só resolvem quando o teste decide"""
+
+    def __init__(self):
+        self.futures = []
+
+    def __call__(self, patient_data):
+        future = Future()
+        self.futures.append((patient_data, future))
+        return future
+
+
+def test_due_beds_are_submitted_together_without_waiting():
+    submit = PendingSubmit()
+    monitor = BedMonitor(FakeFeed([reading(f"L{i}") for i in range(40)]), submit, debounce=0)
+
+    monitor.poll()
+    assert len(submit.futures) == 40
+
+    for _, future in submit.futures:
+        future.set_result((True, {"prediction": 0.2, "risk_level": "Baixo"}))
+    assert monitor.stats()["scores"] == 40
+    assert all(bed["result"] is not None for bed in monitor.snapshot())
+
+
+def test_bed_with_prediction_in_flight_is_not_submitted_again():
+    submit = PendingSubmit()
+    feed = FakeFeed([reading("L1")])
+    monitor = BedMonitor(feed, submit, debounce=0)
+
+    monitor.poll()
+    feed.updates.append(reading("L1", hr=120))
+    monitor.poll()
+    assert len(submit.futures) == 1
+
+    submit.futures[0][1].set_result((True, {"prediction": 0.2, "risk_level": "Baixo"}))
+    monitor.poll()
+    assert len(submit.futures) == 2
+    assert submit.futures[1][0]["hr"] == 120
+
+
+def test_failed_submit_is_retried():
+    calls = []
+
+    def submit(patient_data):
+        calls.append(patient_data)
+        if len(calls) == 1:
+            raise RuntimeError("pool encerrado")
+        future = Future()
+        future.set_result((True, {"prediction": 0.9, "risk_level": "Alto"}))
+        return future
+
+    monitor = BedMonitor(FakeFeed([reading("L1")]), submit, debounce=0)
+    monitor.poll()
+    assert monitor.snapshot()[0]["error"] == "pool encerrado"
+
+    monitor.poll()
+    assert len(calls) == 2
+    bed = monitor.snapshot()[0]
+    assert bed["error"] is None and bed["result"]["prediction"] == 0.9
+
+
+def test_failed_future_is_retried_and_other_beds_are_kept():
+    submit = PendingSubmit()
+    monitor = BedMonitor(FakeFeed([reading("L1"), reading("L2")]), submit, debounce=0)
+    monitor.poll()
+
+    (_, failed), (_, scored) = submit.futures
+    failed.set_exception(RuntimeError("falha inesperada"))
+    scored.set_result((True, {"prediction": 0.2, "risk_level": "Baixo"}))
+    beds = {bed["bed"]: bed for bed in monitor.snapshot()}
+    assert beds["L1"]["error"] == "falha inesperada"
+    assert beds["L2"]["result"] is not None
+
+    monitor.poll()
+    assert len(submit.futures) == 3
+    assert submit.futures[2][0] == submit.futures[0][0]
+
+
+def test_expired_and_backpressure_are_retried_without_error():
+    submit = PendingSubmit()
+    monitor = BedMonitor(FakeFeed([reading("L1"), reading("L2")]), submit, debounce=0)
+    monitor.poll()
+    submit.futures[0][1].set_result((False, {"error": "descartada", "expired": True}))
+    submit.futures[1][1].set_result((False, {"error": "fila cheia", "backpressure": True}))
+
+    stats = monitor.stats()
+    assert (stats["expired"], stats["backpressure"], stats["failures"]) == (1, 1, 0)
+    assert all(bed["error"] is None for bed in monitor.snapshot())
+    monitor.poll()
+    assert len(submit.futures) == 4
@@ -0,0 +1,120 @@
+"""
+Testes das transições de estado e das chamadas de teste do `CircuitBreaker`
+"""
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def make_breaker(clock, **kwargs):
+    settings = dict(window=4, min_calls=4, failure_rate=0.5, slow_call_duration=1.0,
+                    slow_call_rate=0.75, open_duration=10.0, half_open_calls=2, clock=clock)
+    settings.update(kwargs)
+    return CircuitBreaker(**settings)
+
+
+def trip(breaker):
+    """Abre o circuito com falhas suficientes na janela"""
+    for _ in range(breaker.min_calls):
+        assert breaker.allow() == CLOSED
+        breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+
+def test_closed_allows_calls_and_stays_closed_below_thresholds(clock):
+    breaker = make_breaker(clock)
+    for success in (True, False, True, True, True, True):
+        assert breaker.allow() == CLOSED
+        breaker.record(success, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_opens_on_failure_rate_and_rejects(clock):
+    breaker = make_breaker(clock)
+    trip(breaker)
+    assert breaker.allow() is False
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["opened"] == 1
+    assert breaker.retry_in() == pytest.approx(10.0)
+
+
+def test_opens_on_slow_call_rate(clock):
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.allow()
+        breaker.record(True, 2.0)
+    assert breaker.state == OPEN
+
+
+def test_half_open_after_open_duration(clock):
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now = 9.9
+    assert breaker.state == OPEN
+    clock.now = 10.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.retry_in() == 0.0
+
+
+def test_half_open_closes_after_all_trials_succeed(clock):
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now = 10.0
+    assert breaker.allow() == HALF_OPEN
+    assert breaker.allow() == HALF_OPEN
+    breaker.record(True, 0.1)
+    assert breaker.state == HALF_OPEN
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.allow() == CLOSED
+
+
+def test_half_open_reopens_on_failed_or_slow_trial(clock):
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now = 10.0
+    assert breaker.allow() == HALF_OPEN
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+    assert breaker.stats()["opened"] == 2
+
+    clock.now = 20.0
+    assert breaker.allow() == HALF_OPEN
+    breaker.record(True, 5.0)
+    assert breaker.state == OPEN
+
+
+def test_half_open_limits_trials(clock):
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now = 10.0
+    assert breaker.allow() == HALF_OPEN
+    assert breaker.allow() == HALF_OPEN
+    assert breaker.allow() is False
+
+
+def test_release_returns_trial_slot(clock):
+    breaker = make_breaker(clock, half_open_calls=1)
+    trip(breaker)
+    clock.now = 10.0
+    assert breaker.allow() == HALF_OPEN
+    assert breaker.allow() is False
+    breaker.release()
+    assert breaker.allow() == HALF_OPEN
+
+
+def test_release_outside_half_open_is_ignored(clock):
+    breaker = make_breaker(clock, half_open_calls=1)
+    breaker.release()
+    trip(breaker)
+    clock.now = 10.0
+    assert breaker.allow() == HALF_OPEN
+    assert breaker.allow() is False
+
+
+def test_calls_started_before_opening_are_ignored(clock):
+    breaker = make_breaker(clock)
+    trip(breaker)
+    breaker.record(True, 0.1)
+    assert breaker.state == OPEN
+    assert breaker.stats()["window_calls"] == 0
@@ -0,0 +1,134 @@
+"""
+Testes dos escores clínicos locais (SIRS, qSOFA e NEWS2) nos limites de cada faixa
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from clinical_scores import (
+    NEWS2_RISKS,
+    SCORE_FIELDS,
+    news2_component,
+    news2_risk,
+    patient_scores,
+    qsofa_flags,
+    score_arrays,
+    sirs_flags,
+)
+
+# Paciente sem nenhum ponto em nenhum dos três escores
+NORMAL = {"hr": 70, "resp": 16, "temp": 37.0, "sbp": 120, "o2sat": 98}
+
+
+# Pontos do NEWS2 (escala 1 da SpO2, ar ambiente) de cada lado dos limites da tabela
+@pytest.mark.parametrize("field, value, points", [
+    ("resp", 0, 3), ("resp", 8, 3), ("resp", 9, 1), ("resp", 11, 1), ("resp", 12, 0),
+    ("resp", 20, 0), ("resp", 21, 2), ("resp", 24, 2), ("resp", 25, 3), ("resp", 60, 3),
+    ("o2sat", 80, 3), ("o2sat", 91, 3), ("o2sat", 92, 2), ("o2sat", 93, 2), ("o2sat", 94, 1),
+    ("o2sat", 95, 1), ("o2sat", 96, 0), ("o2sat", 100, 0),
+    ("sbp", 60, 3), ("sbp", 90, 3), ("sbp", 91, 2), ("sbp", 100, 2), ("sbp", 101, 1),
+    ("sbp", 110, 1), ("sbp", 111, 0), ("sbp", 219, 0), ("sbp", 220, 3),
+    ("hr", 30, 3), ("hr", 40, 3), ("hr", 41, 1), ("hr", 50, 1), ("hr", 51, 0), ("hr", 90, 0),
+    ("hr", 91, 1), ("hr", 110, 1), ("hr", 111, 2), ("hr", 130, 2), ("hr", 131, 3),
+    ("temp", 34.0, 3), ("temp", 35.0, 3), ("temp", 35.1, 1), ("temp", 36.0, 1), ("temp", 36.1, 0),
+    ("temp", 38.0, 0), ("temp", 38.1, 1), ("temp", 39.0, 1), ("temp", 39.1, 2), ("temp", 41.0, 2),
+])
+def test_news2_component_band_edges(field, value, points):
+    assert int(news2_component(field, value)) == points
+    assert int(news2_component(field, np.array([value]))[0]) == points
+
+
+def test_news2_component_is_vectorized_and_ignores_nan():
+    values = np.array([8, 9, np.nan, 21, 25])
+    assert news2_component("resp", values).tolist() == [3, 1, 0, 2, 3]
+
+
+@pytest.mark.parametrize("temp, expected", [
+    (35.9, True), (36.0, False), (37.0, False), (38.0, False), (38.1, True),
+])
+def test_sirs_temperature_edges(temp, expected):
+    assert bool(sirs_flags(np.float64(temp), 70.0, 16.0)[0]) is expected
+
+
+@pytest.mark.parametrize("hr, resp, expected", [
+    (90, 20, (False, False)), (91, 20, (True, False)), (90, 21, (False, True)), (91, 21, (True, True)),
+])
+def test_sirs_heart_rate_and_resp_edges(hr, resp, expected):
+    _, hr_flag, resp_flag = sirs_flags(37.0, np.float64(hr), np.float64(resp))
+    assert (bool(hr_flag), bool(resp_flag)) == expected
+
+
+@pytest.mark.parametrize("resp, sbp, expected", [
+    (21, 101, (False, False)), (22, 101, (True, False)), (21, 100, (False, True)), (22, 100, (True, True)),
+])
+def test_qsofa_edges(resp, sbp, expected):
+    resp_flag, sbp_flag = qsofa_flags(np.float64(resp), np.float64(sbp))
+    assert (bool(resp_flag), bool(sbp_flag)) == expected
+
+
+@pytest.mark.parametrize("total, max_component, risk", [
+    (0, 0, "Baixo"), (4, 2, "Baixo"), (3, 3, "Baixo-médio"), (4, 3, "Baixo-médio"),
+    (5, 2, "Médio"), (6, 3, "Médio"), (7, 2, "Alto"), (12, 3, "Alto"),
+])
+def test_news2_risk_boundaries(total, max_component, risk):
+    assert NEWS2_RISKS[int(news2_risk(total, max_component))] == risk
+
+
+def test_normal_patient_scores_zero():
+    scores = patient_scores(NORMAL)
+    assert (scores["sirs"], scores["qsofa"], scores["news2"]) == (0, 0, 0)
+    assert scores["news2_risk"] == "Baixo"
+    assert not scores["alert"]
+
+
+def test_missing_and_nan_inputs_do_not_score():
+    scores = patient_scores({"hr": None, "resp": np.nan, "temp": 37.0})
+    assert (scores["sirs"], scores["qsofa"], scores["news2"]) == (0, 0, 0)
+    assert not scores["alert"]
+
+    arrays = score_arrays({"hr": [np.nan, 131], "resp": [np.nan, 16]})
+    assert arrays["news2"].tolist() == [0, 3]
+    assert arrays["sirs"].tolist() == [0, 1]
+    assert arrays["news2_risk"].tolist() == [0, 1]
+
+
+@pytest.mark.parametrize("patient, alert", [
+    # Dois critérios de SIRS (FC > 90 e FR > 20), NEWS2 = 1 + 2 = 3
+    (dict(NORMAL, hr=91, resp=21), True),
+    # Um critério de SIRS e um de qSOFA, NEWS2 = 2 + 2 = 4: sem alerta
+    (dict(NORMAL, resp=21, sbp=100), False),
+    # Dois critérios de qSOFA (FR ≥ 22 e PAS ≤ 100)
+    (dict(NORMAL, resp=22, sbp=100), True),
+    # NEWS2 = 4 (SpO2 2 + PAS 1 + temperatura 1), sem critérios de SIRS ou qSOFA
+    (dict(NORMAL, o2sat=93, sbp=101, temp=36.0), False),
+    # NEWS2 = 5 (SpO2 2 + PAS 2 + temperatura 1), com um único critério de qSOFA
+    (dict(NORMAL, o2sat=93, sbp=100, temp=36.0), True),
+])
+def test_alert_boundaries(patient, alert):
+    assert patient_scores(patient)["alert"] is alert
+    assert bool(score_arrays(patient)["alert"]) is alert
+
+
+def test_single_parameter_with_three_points_is_low_medium():
+    scores = patient_scores(dict(NORMAL, resp=25))
+    assert scores["news2"] == 3
+    assert scores["news2_risk"] == "Baixo-médio"
+
+
+def test_score_arrays_matches_patient_scores_for_a_batch():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        "hr": rng.integers(30, 160, 200),
+        "resp": rng.integers(5, 35, 200),
+        "temp": rng.uniform(34.0, 41.0, 200).round(1),
+        "sbp": rng.integers(70, 230, 200),
+        "o2sat": rng.integers(85, 101, 200),
+    })
+    arrays = score_arrays(frame)
+    for i, row in enumerate(frame[list(SCORE_FIELDS)].to_dict("records")):
+        scores = patient_scores(row)
+        assert arrays["sirs"][i] == scores["sirs"]
+        assert arrays["qsofa"][i] == scores["qsofa"]
+        assert arrays["news2"][i] == scores["news2"]
+        assert NEWS2_RISKS[arrays["news2_risk"][i]] == scores["news2_risk"]
+        assert bool(arrays["alert"][i]) is scores["alert"]
@@ -0,0 +1,68 @@
+"""
+Testes do `PredictionHistory` com inclusões vindas de várias threads
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from history import PATIENT_COLUMNS, PredictionHistory
+
+
+def patient(i):
+    return {field: i % 50 for field in PATIENT_COLUMNS}
+
+
+def test_concurrent_appends_keep_every_row_and_ordered_timestamps():
+    history = PredictionHistory(capacity=1)
+    threads_count, appends = 4, 2000
+    start = threading.Barrier(threads_count)
+
+    def append_many(offset):
+        start.wait()
+        for i in range(appends):
+            probability = ((offset * appends + i) % 100) / 100
+            history.append(patient(i), {"prediction": probability, "risk_level": "Baixo"})
+
+    threads = [threading.Thread(target=append_many, args=(n,)) for n in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = history.summary()
+    assert len(history) == summary["count"] == threads_count * appends
+    assert summary["sum_probability"] == pytest.approx(history.probabilities.sum())
+    assert sum(summary["risks"].values()) == threads_count * appends
+    assert np.all(np.diff(history.timestamps.astype(np.int64)) >= 0)
+
+
+def test_reads_while_appending_see_consistent_rows():
+    history = PredictionHistory(capacity=1)
+    stop = threading.Event()
+    errors = []
+
+    def append_many():
+        for i in range(5000):
+            history.append(patient(i), {"prediction": 0.5, "risk_level": "Moderado"})
+        stop.set()
+
+    def read_many():
+        while not stop.is_set():
+            try:
+                timestamps, probabilities, risks = history.series()
+                assert len(timestamps) == len(probabilities) == len(risks)
+                if len(history):
+                    history.last()
+            except Exception as e:
+                errors.append(e)
+                return
+
+    writer = threading.Thread(target=append_many)
+    reader = threading.Thread(target=read_many)
+    writer.start()
+    reader.start()
+    writer.join()
+    reader.join()
+    assert errors == []
+    assert len(history) == 5000
@@ -0,0 +1,201 @@
+"""
+Testes do `ScoringEngine`: vagas de teste do circuito, envio em segundo plano
+e chamadas compartilhadas (single-flight)
+"""
+import threading
+
+import pytest
+
+from circuit_breaker import HALF_OPEN, CircuitBreaker
+from prediction_cache import canonical_key
+from scoring_engine import ScoringEngine
+from worker_pool import BULK, INTERACTIVE, DeadlineExpired, WorkerPool
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, patient_data):
+        self.patient_data = patient_data
+
+    def json(self):
+        return {"probability": 0.5, "patient": self.patient_data["iculos"]}
+
+
+class FakeClient:
+    """Cliente da API que conta as chamadas a /predict"""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def post(self, path, patient_data):
+        with self.lock:
+            self.calls += 1
+        return FakeResponse(patient_data)
+
+
+def half_open_breaker(clock):
+    """Disjuntor fechado que abre com uma falha e fica meio aberto ao avançar o relógio"""
+    return CircuitBreaker(window=1, min_calls=1, open_duration=10.0, half_open_calls=1, clock=clock)
+
+
+def open_then_half_open(breaker, clock):
+    breaker.record(False, 0.1)
+    clock.now += 10.0
+
+
+def test_abandoning_closed_flight_does_not_release_trial(blocked_pool, clock):
+    pool, _ = blocked_pool
+    breaker = half_open_breaker(clock)
+    engine = ScoringEngine(FakeClient(), pool=pool, breaker=breaker)
+
+    # Liberada com o circuito fechado e ainda na fila quando ele abre
+    flight = engine._join("closed", {"iculos": 1}, session="a")
+    assert flight is not None and not flight.trial
+    open_then_half_open(breaker, clock)
+
+    assert breaker.allow() == HALF_OPEN
+    engine._leave(flight)
+    assert flight.future.cancelled()
+    # A vaga de teste continua com quem a reservou
+    assert breaker.allow() is False
+
+
+def test_abandoning_trial_flight_releases_slot(blocked_pool, clock):
+    pool, _ = blocked_pool
+    breaker = half_open_breaker(clock)
+    engine = ScoringEngine(FakeClient(), pool=pool, breaker=breaker)
+    open_then_half_open(breaker, clock)
+
+    flight = engine._join("trial", {"iculos": 2}, session="a")
+    assert flight.trial
+    assert engine._join("other", {"iculos": 3}, session="b") is None
+
+    engine._leave(flight)
+    assert flight.future.cancelled()
+    assert breaker.allow() == HALF_OPEN
+
+
+def test_expired_closed_flight_does_not_release_trial(blocked_pool, clock):
+    pool, release = blocked_pool
+    breaker = half_open_breaker(clock)
+    engine = ScoringEngine(FakeClient(), pool=pool, breaker=breaker)
+
+    # Prazo já vencido: descartada ao sair da fila
+    flight = engine._join("closed", {"iculos": 1}, session="a", deadline=0.0)
+    open_then_half_open(breaker, clock)
+    assert breaker.allow() == HALF_OPEN
+
+    release.set()
+    with pytest.raises(DeadlineExpired):
+        flight.future.result(timeout=5)
+    assert breaker.allow() is False
+
+
+class BlockingClient(FakeClient):
+    """Cliente cujas chamadas só terminam após `release.set()`"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def post(self, path, patient_data):
+        self.release.wait(5)
+        return super().post(path, patient_data)
+
+
+def test_submit_enqueues_in_pool_and_reports_backpressure(wait_until):
+    pool = WorkerPool(max_workers=2, max_queue=3)
+    client = BlockingClient()
+    engine = ScoringEngine(client, pool=pool)
+    try:
+        futures = [engine.submit({"iculos": i}, session=f"s{i}") for i in range(2)]
+        wait_until(lambda: pool.stats()["running"] == 2)
+        futures += [engine.submit({"iculos": i}, session=f"s{i}") for i in range(2, 12)]
+
+        # Duas em andamento, três na fila e o restante recusado na hora
+        rejected = [future.result(timeout=0) for future in futures if future.done()]
+        assert len(rejected) == 7
+        assert all(result.get("backpressure") for success, result in rejected if not success)
+        stats = pool.stats()
+        assert stats["queued"] == 3
+        assert stats["rejected"] == 7
+
+        client.release.set()
+        results = [future.result(timeout=5) for future in futures]
+        assert sum(success for success, _ in results) == 5
+        assert client.calls == 5
+    finally:
+        client.release.set()
+        pool.shutdown(wait=True)
+
+
+def test_submit_resolves_expired_queue_wait():
+    pool = WorkerPool(max_workers=1, reserved_workers=0)
+    client = BlockingClient()
+    engine = ScoringEngine(client, pool=pool)
+    try:
+        first = engine.submit({"iculos": 1}, session="a")
+        late = engine.submit({"iculos": 2}, session="b", max_wait=0.0)
+        client.release.set()
+        assert first.result(timeout=5)[0]
+        success, result = late.result(timeout=5)
+        assert not success and result["expired"]
+        assert client.calls == 1
+        assert engine.stats()["in_flight"] == 0
+    finally:
+        client.release.set()
+        pool.shutdown(wait=True)
+
+
+def test_identical_submits_share_one_api_call():
+    pool = WorkerPool(max_workers=4)
+    client = BlockingClient()
+    engine = ScoringEngine(client, pool=pool)
+    try:
+        futures = [engine.submit({"iculos": 7}, session=f"s{i}") for i in range(10)]
+        client.release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+        assert client.calls == 1
+        assert all(result == (True, {"probability": 0.5, "patient": 7}) for result in results)
+        # Cada chamador recebe a própria cópia do resultado
+        assert len({id(result) for _, result in results}) == 10
+        stats = engine.stats()
+        assert (stats["api_calls"], stats["coalesced"], stats["in_flight"]) == (1, 9, 0)
+    finally:
+        client.release.set()
+        pool.shutdown(wait=True)
+
+
+def test_interactive_caller_promotes_coalesced_bulk_flight(blocked_pool):
+    pool, release = blocked_pool
+    engine = ScoringEngine(FakeClient(), pool=pool)
+
+    bulk = engine.submit({"iculos": 1}, session="lote", priority=BULK)
+    interactive = engine.submit({"iculos": 1}, session="form", priority=INTERACTIVE)
+    classes = pool.stats()["classes"]
+    assert (classes[INTERACTIVE]["queued"], classes[BULK]["queued"]) == (1, 0)
+
+    release.set()
+    assert bulk.result(timeout=5) == interactive.result(timeout=5)
+    assert engine.client.calls == 1
+
+
+def test_coalesced_caller_without_deadline_keeps_flight_deadline(blocked_pool):
+    pool, release = blocked_pool
+    client = FakeClient()
+    engine = ScoringEngine(client, pool=pool)
+
+    monitored = engine.submit({"iculos": 1}, session="monitor", max_wait=0.0)
+    flight = engine._join(canonical_key({"iculos": 1}), {"iculos": 1}, session="form")
+    assert flight is not None
+
+    release.set()
+    success, result = monitored.result(timeout=5)
+    assert not success and result["expired"]
+    with pytest.raises(DeadlineExpired):
+        flight.future.result(timeout=5)
+    engine._leave(flight)
+    assert client.calls == 0
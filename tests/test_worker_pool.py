@@ -0,0 +1,217 @@
+"""
+Testes do `WorkerPool`: reserva de threads, fila justa ponderada, promoção,
+prazos e limites da fila
+"""
+import threading
+import time
+
+import pytest
+
+from worker_pool import BULK, INTERACTIVE, MONITORING, DeadlineExpired, QueueFull, WorkerPool
+
+
+@pytest.fixture
+def pools():
+    created = []
+
+    def make(**kwargs):
+        pool = WorkerPool(**kwargs)
+        created.append(pool)
+        return pool
+
+    yield make
+    for pool in created:
+        pool.shutdown(wait=False)
+
+
+def test_bulk_never_takes_reserved_workers(pools, wait_until):
+    pool = pools(max_workers=3, reserved_workers=1)
+    release = threading.Event()
+    running = []
+    lock = threading.Lock()
+    peak = [0]
+
+    def bulk_call():
+        with lock:
+            running.append(1)
+            peak[0] = max(peak[0], len(running))
+        release.wait(5)
+        with lock:
+            running.pop()
+
+    futures = [pool.submit(bulk_call, session=f"lote-{i}", priority=BULK) for i in range(6)]
+    wait_until(lambda: pool.stats()["classes"][BULK]["running"] == 2)
+    time.sleep(0.05)
+    assert pool.stats()["classes"][BULK]["running"] == 2
+    assert pool.stats()["classes"][BULK]["queued"] == 4
+
+    # A thread reservada atende a chamada interativa sem esperar o lote
+    assert pool.submit(lambda: "ok", session="form", priority=INTERACTIVE).result(timeout=1) == "ok"
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert peak[0] == 2
+
+
+def test_burst_runs_concurrently_up_to_max_workers(pools, wait_until):
+    pool = pools(max_workers=4)
+    pool.submit(lambda: None, session="aquecimento").result(timeout=5)
+    wait_until(lambda: pool.stats()["running"] == 0)
+    assert pool.stats()["workers"] == 1
+
+    # Cada tarefa só termina quando as quatro estiverem rodando ao mesmo tempo
+    barrier = threading.Barrier(4, timeout=2)
+    futures = [pool.submit(barrier.wait, session=f"s{i}") for i in range(4)]
+    for future in futures:
+        future.result(timeout=5)
+    assert pool.stats()["workers"] == 4
+
+
+def test_priority_classes_get_weighted_share(pools, wait_until, block):
+    pool = pools(max_workers=1, reserved_workers=0)
+    release = block(pool, priority=BULK)
+    order = []
+
+    for i in range(48):
+        for priority in (INTERACTIVE, MONITORING, BULK):
+            pool.submit(order.append, priority, session=f"{priority}-{i}", priority=priority)
+    release.set()
+    wait_until(lambda: len(order) == 144)
+
+    # Com as três classes disputando, a cada 12 chamadas: 8, 3 e 1 (a menos
+    # de uma chamada, conforme a classe em que cada uma começou)
+    first = order[:36]
+    assert abs(first.count(INTERACTIVE) - 24) <= 1
+    assert abs(first.count(MONITORING) - 9) <= 1
+    assert abs(first.count(BULK) - 3) <= 1
+
+
+def test_sessions_take_turns_within_a_class(pools, wait_until, block):
+    pool = pools(max_workers=1, reserved_workers=0)
+    release = block(pool)
+    order = []
+
+    for _ in range(3):
+        pool.submit(order.append, "lote", session="lote")
+    pool.submit(order.append, "form", session="form")
+    release.set()
+    wait_until(lambda: len(order) == 4)
+    assert order.index("form") == 1
+
+
+def test_promote_moves_queued_task_to_more_urgent_class(pools, wait_until, block):
+    pool = pools(max_workers=1, reserved_workers=0)
+    release = block(pool, priority=BULK)
+    order = []
+
+    for i in range(3):
+        pool.submit(order.append, f"lote-{i}", session="lote", priority=BULK)
+    promoted = pool.submit(order.append, "promovida", session="outra", priority=BULK)
+    assert pool.promote(promoted, INTERACTIVE)
+    stats = pool.stats()["classes"]
+    assert (stats[INTERACTIVE]["queued"], stats[BULK]["queued"]) == (1, 3)
+
+    release.set()
+    wait_until(lambda: len(order) == 4)
+    assert order[0] == "promovida"
+    # Já executada: não há mais o que promover
+    assert not pool.promote(promoted, INTERACTIVE)
+
+
+def test_promote_without_deadline_keeps_existing_deadline(pools, block):
+    pool = pools(max_workers=1, reserved_workers=0)
+    release = block(pool)
+    future = pool.submit(lambda: "ok", session="a", priority=MONITORING, deadline=time.monotonic() - 1)
+    assert pool.promote(future, INTERACTIVE)
+    release.set()
+    with pytest.raises(DeadlineExpired):
+        future.result(timeout=5)
+
+
+def test_promote_keeps_earliest_deadline(pools, block):
+    pool = pools(max_workers=1, reserved_workers=0)
+    release = block(pool)
+    calls = []
+    later = pool.submit(calls.append, "mais tarde", session="a", priority=MONITORING,
+                        deadline=time.monotonic() + 5)
+    assert pool.promote(later, MONITORING, deadline=time.monotonic() - 1)
+    unbounded = pool.submit(calls.append, "sem prazo", session="b", priority=MONITORING)
+    assert pool.promote(unbounded, MONITORING, deadline=time.monotonic() - 1)
+    release.set()
+
+    for future in (later, unbounded):
+        with pytest.raises(DeadlineExpired):
+            future.result(timeout=5)
+    assert calls == []
+
+
+def test_expired_task_raises_without_calling_fn(pools, block):
+    pool = pools(max_workers=1, reserved_workers=0)
+    release = block(pool)
+    calls = []
+
+    expired = pool.submit(calls.append, "vencida", session="a", priority=MONITORING,
+                          deadline=time.monotonic() + 0.01)
+    on_time = pool.submit(calls.append, "no prazo", session="b", priority=MONITORING,
+                          deadline=time.monotonic() + 5)
+    time.sleep(0.05)
+    release.set()
+
+    with pytest.raises(DeadlineExpired):
+        expired.result(timeout=5)
+    on_time.result(timeout=5)
+    assert calls == ["no prazo"]
+    stats = pool.stats()
+    assert stats["expired"] == 1
+    assert stats["classes"][MONITORING]["expired"] == 1
+    assert pool.pending("a") == 0
+
+
+def test_session_cap_raises_queue_full(pools, block):
+    pool = pools(max_workers=1, reserved_workers=0, max_pending_per_session=2)
+    release = block(pool)
+
+    pool.submit(time.sleep, 0, session="a")
+    pool.submit(time.sleep, 0, session="a")
+    with pytest.raises(QueueFull):
+        pool.submit(time.sleep, 0, session="a")
+    # As outras sessões continuam sendo aceitas
+    pool.submit(time.sleep, 0, session="b")
+    assert pool.stats()["rejected"] == 1
+    release.set()
+
+
+def test_global_cap_raises_queue_full(pools, block):
+    pool = pools(max_workers=1, reserved_workers=0, max_queue=2)
+    release = block(pool)
+
+    pool.submit(time.sleep, 0, session="a", priority=BULK)
+    pool.submit(time.sleep, 0, session="b", priority=BULK)
+    with pytest.raises(QueueFull):
+        pool.submit(time.sleep, 0, session="c", priority=BULK)
+    assert pool.pressure(BULK) == 1.0
+
+    # O lote enfileirado não impede a entrada de uma chamada interativa
+    pool.submit(time.sleep, 0, session="d", priority=INTERACTIVE)
+    pool.submit(time.sleep, 0, session="e", priority=INTERACTIVE)
+    with pytest.raises(QueueFull):
+        pool.submit(time.sleep, 0, session="f", priority=INTERACTIVE)
+    stats = pool.stats()
+    assert stats["rejected"] == 2
+    assert stats["classes"][BULK]["rejected"] == 1
+    release.set()
+
+
+def test_cancelled_task_leaves_queue(pools, block):
+    pool = pools(max_workers=1, reserved_workers=0)
+    release = block(pool)
+    calls = []
+
+    future = pool.submit(calls.append, "cancelada", session="a")
+    assert future.cancel()
+    assert pool.stats()["queued"] == 0
+    assert pool.pending("a") == 0
+    release.set()
+    pool.submit(calls.append, "seguinte", session="a").result(timeout=5)
+    assert calls == ["seguinte"]